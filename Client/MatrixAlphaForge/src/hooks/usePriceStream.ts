@@ -11,7 +11,22 @@ export interface PriceUpdate {
   positive: boolean
 }
 
-export const usePriceStream = (initialTickers: string[] = []) => {
+export interface PriceStreamOptions {
+  // Ask the server for changed tickers only (plus a snapshot on subscribe)
+  delta?: boolean
+}
+
+// Delta frames carry only changed tickers, so merge them into the last known set
+const mergeUpdates = (prev: PriceUpdate[], next: PriceUpdate[]) => {
+  const byTicker = new Map(prev.map((u) => [u.ticker, u]))
+  next.forEach((u) => byTicker.set(u.ticker, u))
+  return Array.from(byTicker.values())
+}
+
+export const usePriceStream = (
+  initialTickers: string[] = [],
+  { delta = false }: PriceStreamOptions = {},
+) => {
   const [priceUpdates, setPriceUpdates] = useState<PriceUpdate[]>([])
   const [isConnected, setIsConnected] = useState(false)
   const ws = useRef<WebSocket | null>(null)
@@ -36,8 +51,9 @@ export const usePriceStream = (initialTickers: string[] = []) => {
   const connect = useCallback(() => {
     if (ws.current?.readyState === WebSocket.OPEN) return
 
-    console.log(`Connecting to Price Stream at ${WS_URL}...`)
-    const socket = new WebSocket(WS_URL)
+    const url = delta ? `${WS_URL}?mode=delta` : WS_URL
+    console.log(`Connecting to Price Stream at ${url}...`)
+    const socket = new WebSocket(url)
 
     socket.onopen = () => {
       console.log("Price Stream Connected")
@@ -58,7 +74,11 @@ export const usePriceStream = (initialTickers: string[] = []) => {
       try {
         const message = JSON.parse(event.data)
         if (message.type === "PRICE_UPDATE") {
-          setPriceUpdates(message.data)
+          if (delta) {
+            setPriceUpdates((prev) => mergeUpdates(prev, message.data))
+          } else {
+            setPriceUpdates(message.data)
+          }
         }
       } catch (error) {
         console.error("Error parsing price update:", error)
@@ -80,7 +100,7 @@ export const usePriceStream = (initialTickers: string[] = []) => {
     }
 
     ws.current = socket
-  }, [])
+  }, [delta])
 
   useEffect(() => {
     connect()
@@ -14,6 +14,87 @@ class Settings(BaseSettings):
     OPEN_AI_API: str = ""
     HF_TOKEN: str = ""
     
+    # Price Stream
+    QUOTE_STALE_SECONDS: int = 60
+    WS_SEND_QUEUE_SIZE: int = 32
+    WS_OVERFLOW_POLICY: str = "drop_oldest"  # drop_oldest | coalesce | disconnect
+    STREAM_BASE_INTERVAL: float = 5.0
+    STREAM_MIN_INTERVAL: float = 2.0
+    STREAM_MAX_INTERVAL: float = 60.0
+    STREAM_OFF_HOURS_INTERVAL: float = 300.0
+    NSE_HOLIDAYS_FILE: str = ""
+    # local: single worker polls; unix: one elected poller feeds all workers
+    STREAM_BACKPLANE: str = "local"
+    STREAM_LOCK_FILE: str = ""    # defaults to the system temp dir
+    STREAM_SOCKET_PATH: str = ""  # defaults to the system temp dir
+    QUOTE_SHM_NAME: str = ""  # e.g. "matrix_forge_quotes" to share quotes between workers; empty disables
+    QUOTE_SHM_CAPACITY: int = 4096
+    TICK_LOG_DIR: str = ""          # record streamed quotes here; empty disables
+    STREAM_REPLAY_PATH: str = ""    # tick log dir or segment to replay instead of polling
+    STREAM_REPLAY_SPEED: str = "1"  # 1, 10, ... or max
+    CANDLE_BUFFER_BARS: int = 750   # live bars kept per ticker and interval (two sessions of 1m)
+    ALERT_SYNC_SECONDS: float = 2.0  # how often each worker picks up alert changes from SQLite
+
+    # Analytics
+    HISTORY_DATASET_DIR: str = "data/history"  # daily bars written by backfill.py
+    PRICE_MATRIX_DIR: str = "data/matrix"      # memory-mapped closes rebuilt from the dataset
+    PRICE_MATRIX_MAX_AGE_DAYS: int = 5         # older matrices fall back to live downloads
+    FUNDAMENTALS_MAX_AGE_HOURS: float = 24.0
+    FUNDAMENTALS_BATCH_SIZE: int = 20
+    FUNDAMENTALS_LOCK_FILE: str = ""  # defaults to the system temp dir
+    ANALYSIS_DEADLINE_SECONDS: float = 12.0  # total budget for /{ticker}/analysis
+    ANALYSIS_LLM_MIN_SECONDS: float = 3.0    # below this remaining budget the LLM stage is skipped
+    ANALYSIS_BATCH_CONCURRENCY: int = 10     # analyses running at once per batch request
+    ANALYSIS_BATCH_MAX_TICKERS: int = 50
+
+    # Signal rule (used by analysis, signals, chat and as backtest defaults)
+    SIGNAL_RSI_WINDOW: int = 14
+    SIGNAL_RSI_OVERSOLD: float = 30.0
+    SIGNAL_RSI_OVERBOUGHT: float = 70.0
+    SIGNAL_SMA_WINDOW: int = 50
+    SWEEP_WORKERS: int = 0           # parameter sweep processes; 0 uses every CPU
+    SWEEP_MAX_COMBINATIONS: int = 2000
+
+    # Stale-while-revalidate: past the soft TTL the last result is served while
+    # one background refresh runs; only past the hard TTL do requests wait
+    ANALYSIS_SOFT_TTL_SECONDS: float = 300.0
+    ANALYSIS_HARD_TTL_SECONDS: float = 3600.0
+    ANALYSIS_DEGRADED_TTL_SECONDS: float = 60.0  # analyses without an LLM answer (no token, HF outage)
+    SIGNALS_SOFT_TTL_SECONDS: float = 300.0
+    SIGNALS_HARD_TTL_SECONDS: float = 1800.0
+    MARKET_ANALYSIS_SOFT_TTL_SECONDS: float = 60.0
+    MARKET_ANALYSIS_HARD_TTL_SECONDS: float = 600.0
+
+    # Upstream resilience (per process): request rates, circuit breakers
+    YF_RATE_PER_SECOND: float = 5.0
+    YF_BURST: int = 10
+    HF_RATE_PER_SECOND: float = 1.0
+    HF_BURST: int = 3
+    NEWS_RATE_PER_SECOND: float = 2.0
+    NEWS_BURST: int = 5
+    UPSTREAM_MAX_WAIT_SECONDS: float = 2.0      # longer rate-limit queues fail fast instead
+    BREAKER_ERROR_RATE: float = 0.5             # share of failed calls in the window that opens a circuit
+    BREAKER_MIN_CALLS: int = 5
+    BREAKER_WINDOW_SECONDS: float = 60.0
+    BREAKER_COOLDOWN_SECONDS: float = 15.0      # first open period, doubled (with jitter) on each failed probe
+    BREAKER_MAX_COOLDOWN_SECONDS: float = 300.0
+
+    # HTTP
+    COMPRESSION_MIN_BYTES: int = 1024
+
+    # Admission control (per worker): per-client token buckets per route class,
+    # and a cap on concurrent expensive (LLM / scan / heavy compute) requests
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_READ_PER_MINUTE: float = 300.0
+    RATE_LIMIT_READ_BURST: int = 60
+    RATE_LIMIT_EXPENSIVE_PER_MINUTE: float = 12.0
+    RATE_LIMIT_EXPENSIVE_BURST: int = 5
+    RATE_LIMIT_MAX_CLIENTS: int = 10000
+    RATE_LIMIT_TRUST_FORWARDED_FOR: bool = False  # only behind a proxy that sets X-Forwarded-For
+    EXPENSIVE_MAX_CONCURRENCY: int = 8
+    EXPENSIVE_MAX_QUEUE: int = 16
+    EXPENSIVE_QUEUE_TIMEOUT_SECONDS: float = 5.0
+
     # Server
     HOST: str = "127.0.0.1"
     PORT: int = 8000
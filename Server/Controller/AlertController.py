@@ -0,0 +1,99 @@
+from fastapi import APIRouter
+import math
+from typing import Optional
+import logging
+from Utils.ResponseHelper import make_response
+from Utils.ResponseHelperModels import HTTPStatusCode, APICode
+from Database.AlertStore import create_alert, list_alerts, deactivate_alert
+from Services.Market.AlertIndex import ALERT_METRICS, ALERT_DIRECTIONS
+from Models.StockModels import AlertCreate
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+@router.post("")
+async def add_alert(alert: AlertCreate):
+    """
+    Create a one-shot alert, e.g. TCS.NS price above 4000 or RSI below 30.
+    It fires as an ALERT event on /api/ws/prices the first time the value crosses the threshold.
+    """
+    if alert.metric not in ALERT_METRICS or alert.direction not in ALERT_DIRECTIONS:
+        return make_response(
+            status=HTTPStatusCode.BAD_REQUEST,
+            code=APICode.VALIDATION,
+            message=f"metric must be one of {', '.join(ALERT_METRICS)} and direction one of {', '.join(ALERT_DIRECTIONS)}"
+        )
+    if alert.metric == "price" and not (math.isfinite(alert.threshold) and alert.threshold > 0):
+        return make_response(
+            status=HTTPStatusCode.BAD_REQUEST,
+            code=APICode.VALIDATION,
+            message="Price thresholds must be finite and positive"
+        )
+    if alert.metric == "rsi" and not 0 <= alert.threshold <= 100:
+        return make_response(
+            status=HTTPStatusCode.BAD_REQUEST,
+            code=APICode.VALIDATION,
+            message="RSI thresholds must be between 0 and 100"
+        )
+    try:
+        row = create_alert(alert.ticker.upper(), alert.metric, alert.direction, alert.threshold)
+        return make_response(
+            status=HTTPStatusCode.CREATED,
+            code=APICode.CREATED,
+            message=f"Alert created for {row['ticker']}",
+            data=row
+        )
+    except Exception as e:
+        return make_response(
+            status=HTTPStatusCode.INTERNAL_SERVER_ERROR,
+            code=APICode.INTERNAL_SERVER_ERROR,
+            message="Failed to create alert",
+            error=str(e),
+            location="add_alert"
+        )
+
+@router.get("")
+async def get_alerts(ticker: Optional[str] = None, active: bool = False):
+    """List alerts, optionally for one ticker or only those still armed."""
+    try:
+        data = list_alerts(ticker.upper() if ticker else None, active_only=active)
+        return make_response(
+            status=HTTPStatusCode.OK,
+            code=APICode.OK,
+            message="Alerts fetched successfully",
+            data=data
+        )
+    except Exception as e:
+        return make_response(
+            status=HTTPStatusCode.INTERNAL_SERVER_ERROR,
+            code=APICode.INTERNAL_SERVER_ERROR,
+            message="Failed to fetch alerts",
+            error=str(e),
+            location="get_alerts"
+        )
+
+@router.delete("/{alert_id}")
+async def remove_alert(alert_id: int):
+    """Disarm an alert"""
+    try:
+        if not deactivate_alert(alert_id):
+            return make_response(
+                status=HTTPStatusCode.NOT_FOUND,
+                code=APICode.DATA_NOT_FOUND,
+                message=f"No active alert {alert_id}"
+            )
+        return make_response(
+            status=HTTPStatusCode.OK,
+            code=APICode.OK,
+            message=f"Removed alert {alert_id}",
+            data={"id": alert_id}
+        )
+    except Exception as e:
+        return make_response(
+            status=HTTPStatusCode.INTERNAL_SERVER_ERROR,
+            code=APICode.INTERNAL_SERVER_ERROR,
+            message="Failed to remove alert",
+            error=str(e),
+            location="remove_alert"
+        )
@@ -1,6 +1,7 @@
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 from typing import List, Optional
+import asyncio
 import logging
 from huggingface_hub import InferenceClient
 from Config.SystemConfig import get_settings
@@ -9,6 +10,8 @@ import json
 import re
 from Utils.ResponseHelper import make_response
 from Utils.ResponseHelperModels import HTTPStatusCode, APICode
+from Services.Analytics.Indicators import rsi_series
+import Utils.Resilience as upstreams
 
 # Configure Logging
 logging.basicConfig(level=logging.INFO)
@@ -39,7 +42,7 @@ def get_stock_price(ticker: str):
              ticker += ".NS"
         
         stock = yf.Ticker(ticker)
-        data = stock.history(period="1d")
+        data = upstreams.yfinance.call(stock.history, period="1d")
         if not data.empty:
             price = data["Close"].iloc[-1]
             return f"The current price of {ticker} is ₹{price:.2f}"
@@ -72,7 +75,7 @@ def analyze_stock(ticker: str):
              ticker += ".NS"
         
         stock = yf.Ticker(ticker)
-        history = stock.history(period="6mo")
+        history = upstreams.yfinance.call(stock.history, period="6mo")
         
         if history.empty:
             return f"No data found for {ticker}."
@@ -81,26 +84,22 @@ def analyze_stock(ticker: str):
         current_price = closes.iloc[-1]
         
         # RSI
-        delta = closes.diff()
-        gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
-        rs = gain / loss
-        rsi = 100 - (100 / (1 + rs))
-        current_rsi = rsi.iloc[-1]
+        current_rsi = rsi_series(closes, settings.SIGNAL_RSI_WINDOW).iloc[-1]
         
         # SMA
-        sma_50 = closes.rolling(window=50).mean().iloc[-1]
+        sma_window = settings.SIGNAL_SMA_WINDOW
+        sma = closes.rolling(window=sma_window).mean().iloc[-1]
         
         # Signal
         signal = "HOLD"
-        if current_rsi < 30 and current_price > sma_50: signal = "BUY"
-        elif current_rsi > 70 and current_price < sma_50: signal = "SELL"
+        if current_rsi < settings.SIGNAL_RSI_OVERSOLD and current_price > sma: signal = "BUY"
+        elif current_rsi > settings.SIGNAL_RSI_OVERBOUGHT and current_price < sma: signal = "SELL"
         
         return json.dumps({
             "ticker": ticker,
             "price": round(current_price, 2),
             "rsi": round(current_rsi, 2),
-            "sma_50": round(sma_50, 2),
+            f"sma_{sma_window}": round(sma, 2),
             "signal": signal
         })
     except Exception as e:
@@ -185,7 +184,8 @@ async def chat(request: ChatRequest):
 
         # Call LLM logic
         try:
-            initial_response = client.chat_completion(
+            initial_response = await upstreams.huggingface.acall(
+                client.chat_completion,
                 model="mistralai/Mistral-7B-Instruct-v0.2",
                 messages=messages,
                 max_tokens=200,
@@ -217,7 +217,8 @@ async def chat(request: ChatRequest):
                 if tool_name in TOOLS:
                     logger.info(f"Executing tool: {tool_name} with {args}")
                     try:
-                        tool_result = TOOLS[tool_name](**args)
+                        # Tools block on upstream I/O (and rate-limit waits): keep them off the event loop
+                        tool_result = await asyncio.to_thread(TOOLS[tool_name], **args)
                         results.append(f"Tool '{tool_name}' output: {tool_result}")
                         executed_tools.append({"name": tool_name, "args": args, "result": tool_result})
                     except Exception as e:
@@ -236,7 +237,8 @@ async def chat(request: ChatRequest):
                 ]
                 
                 try:
-                    final_response = client.chat_completion(
+                    final_response = await upstreams.huggingface.acall(
+                        client.chat_completion,
                         # model="mistralai/Mistral-7B-Instruct-v0.2",
                         model="mistralai/Mixtral-8x7B-Instruct-v0.1", # Using a slightly larger/smarter model for synthesis if available
                         messages=follow_up_messages,
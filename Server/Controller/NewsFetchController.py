@@ -1,11 +1,15 @@
 
 from fastapi import APIRouter
+import asyncio
 import requests
 from bs4 import BeautifulSoup, XMLParsedAsHTMLWarning
 import time
 from typing import List, Dict
 from Utils.ResponseHelper import make_response
 from Utils.ResponseHelperModels import HTTPStatusCode, APICode
+import Utils.Resilience as upstreams
+from Utils.Resilience import UpstreamUnavailable
+from Services.Analytics.Sentiment import aggregate_sentiment, headline_text, score_headlines
 import logging
 import warnings
 
@@ -18,46 +22,59 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+def get_feed(url: str) -> requests.Response:
+    response = requests.get(url, timeout=10)
+    # Surface 429/5xx as errors so the news circuit breaker sees them
+    response.raise_for_status()
+    return response
+
 def fetch_google_news(query: str = "Finance"):
     """
     Fetch news from Google News RSS feed.
+    Fetch failures (including UpstreamUnavailable) propagate: an outage must
+    not be served, and cached, as an empty news list.
     """
     url = f"https://news.google.com/rss/search?q={query}&hl=en-US&gl=US&ceid=US:en"
-    try:
-        response = requests.get(url, timeout=10)
-        if response.status_code == 200:
-            # Fallback to html.parser if lxml is missing, handling lowercase tags
-            soup = BeautifulSoup(response.content, "html.parser")
-            items = soup.find_all(["item", "ITEM"])
-            news_list = []
-            
-            for item in items[:10]:
-                try:
-                    # distinct check for mixed case tags caused by html.parser lowercasing
-                    title = item.find("title").text if item.find("title") else "No Title"
-                    link = item.find("link").text if item.find("link") else "#"
-                    
-                    pubDate = item.find("pubdate") or item.find("pubDate")
-                    pubDate = pubDate.text if pubDate else ""
-                    
-                    # Source extraction
-                    source_tag = item.find("source")
-                    source = source_tag.text if source_tag else "Unknown"
-                    
-                    news_list.append({
-                        "title": title,
-                        "link": link,
-                        "pubDate": pubDate,
-                        "source": source
-                    })
-                except Exception:
-                    continue
-                    
-            return news_list
-    except Exception as e:
-        logger.error(f"Error fetching news: {e}")
-        return []
-    return []
+    response = upstreams.news.call(get_feed, url)
+    # Fallback to html.parser if lxml is missing, handling lowercase tags
+    soup = BeautifulSoup(response.content, "html.parser")
+    items = soup.find_all(["item", "ITEM"])
+    news_list = []
+
+    for item in items[:10]:
+        try:
+            # distinct check for mixed case tags caused by html.parser lowercasing
+            title = item.find("title").text if item.find("title") else "No Title"
+            link = item.find("link").text if item.find("link") else "#"
+
+            pubDate = item.find("pubdate") or item.find("pubDate")
+            pubDate = pubDate.text if pubDate else ""
+
+            # Source extraction
+            source_tag = item.find("source")
+            source = source_tag.text if source_tag else "Unknown"
+
+            news_list.append({
+                "title": title,
+                "link": link,
+                "pubDate": pubDate,
+                "source": source
+            })
+        except Exception:
+            continue
+
+    return news_list
+
+def news_unavailable_response(e: UpstreamUnavailable, location: str):
+    retry_after = str(int(e.retry_after) + 1)
+    return make_response(
+        status=HTTPStatusCode.SERVICE_UNAVAILABLE,
+        code=APICode.UPSTREAM_UNAVAILABLE,
+        message=f"News provider unavailable, retry in {retry_after}s",
+        error=str(e),
+        location=location,
+        headers={"Retry-After": retry_after, "Cache-Control": "no-store"}
+    )
 
 @router.get("/latest")
 async def get_latest_news():
@@ -65,13 +82,15 @@ async def get_latest_news():
     Get general market news.
     """
     try:
-        data = fetch_google_news("Stock Market")
+        data = await asyncio.to_thread(fetch_google_news, "Stock Market")
         return make_response(
             status=HTTPStatusCode.OK,
             code=APICode.OK,
             message="News fetched successfully",
             data=data,
         )
+    except UpstreamUnavailable as e:
+        return news_unavailable_response(e, "get_latest_news")
     except Exception as e:
         logger.error(f"Failed to fetch news: {e}")
         return make_response(
@@ -88,13 +107,15 @@ async def get_stock_news(ticker: str):
     Get news specific to a ticker.
     """
     try:
-        data = fetch_google_news(f"{ticker} stock news")
+        data = await asyncio.to_thread(fetch_google_news, f"{ticker} stock news")
         return make_response(
             status=HTTPStatusCode.OK,
             code=APICode.OK,
             message="News fetched successfully",
             data=data
         )
+    except UpstreamUnavailable as e:
+        return news_unavailable_response(e, "get_stock_news")
     except Exception as e:
         logger.error(f"Failed to fetch news for {ticker}: {e}")
         return make_response(
@@ -103,4 +124,36 @@ async def get_stock_news(ticker: str):
             message="Failed to fetch news",
             error=str(e),
             location = "get_stock_news"
-        )
\ No newline at end of file
+        )
+
+@router.get("/{ticker}/sentiment")
+async def get_stock_news_sentiment(ticker: str):
+    """
+    Lexicon-based sentiment of a ticker's latest headlines (0-100, same scale as the AI analysis).
+    """
+    try:
+        news_items = await asyncio.to_thread(fetch_google_news, f"{ticker} stock news")
+        scores = score_headlines([headline_text(item) for item in news_items])
+        data = aggregate_sentiment(scores)
+        data["ticker"] = ticker
+        data["items"] = [
+            {"title": item["title"], "source": item["source"], "pubDate": item["pubDate"], "score": round(float(score), 3)}
+            for item, score in zip(news_items, scores)
+        ]
+        return make_response(
+            status=HTTPStatusCode.OK,
+            code=APICode.OK,
+            message="News sentiment calculated successfully",
+            data=data
+        )
+    except UpstreamUnavailable as e:
+        return news_unavailable_response(e, "get_stock_news_sentiment")
+    except Exception as e:
+        logger.error(f"Failed to score news for {ticker}: {e}")
+        return make_response(
+            status=HTTPStatusCode.INTERNAL_SERVER_ERROR,
+            code=APICode.INTERNAL_SERVER_ERROR,
+            message="Failed to calculate news sentiment",
+            error=str(e),
+            location = "get_stock_news_sentiment"
+        )
@@ -1,124 +1,529 @@
 import asyncio
 import logging
+import time
 import yfinance as yf
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect
-from typing import List, Dict
+from typing import List, Dict, NamedTuple, Optional, Set
 import json
+import orjson
+import struct
+from collections import deque
+from Config.SystemConfig import get_settings
+from Database.QuoteStore import upsert_latest_quotes, get_watchlist_tickers
+from Services.Market.CandleAggregator import CandleAggregator, ClosedBar
+from Services.Market.AlertEngine import AlertEngine, RSI_INTERVAL
+from Services.Market.AlertIndex import FiredAlert
+from Services.Market.Backplane import Backplane, create_backplane, stream_lock_path
+from Services.Market.LeaderElection import FileLeaderLock
+from Services.Market.PollScheduler import PollScheduler
+from Services.Market.SharedQuoteTable import SharedQuoteTable
+from Services.Market.TickLog import TickRecorder, replay_ticks
+from Services.Market.TradingCalendar import in_session, market_phase
+import Utils.Resilience as upstreams
+from Utils.Resilience import UpstreamUnavailable
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
+settings = get_settings()
+
+BROAD_INDICES = frozenset({"^NSEI", "^BSESN", "^NSEBANK", "^INDIAVIX"})
+
+OVERFLOW_POLICIES = ("drop_oldest", "coalesce", "disconnect")
+
+# Protocol options negotiated on connect: /ws/prices?mode=delta&encoding=binary
+STREAM_MODES = ("full", "delta")
+STREAM_ENCODINGS = ("json", "binary")
+
+# Binary PRICE_UPDATE frame (little-endian):
+#   header: uint8 frame type (1), uint16 record count
+#   record: uint32 symbol id, float64 price, float32 change %
+# Symbol ids are announced in a JSON {"type": "SYMBOLS"} text frame before first use.
+# Ids are never reused for the life of the process, hence 32 bits rather than 16.
+BINARY_PRICE_UPDATE = 1
+BINARY_HEADER = struct.Struct("<BH")
+BINARY_RECORD = struct.Struct("<Idf")
+
+
+class StreamUpdate(NamedTuple):
+    """One ticker's update for a cycle, encoded once and shared by every socket."""
+    ticker: str
+    price: float
+    symbol_id: int
+    fragment: str   # JSON object, for text clients
+    record: bytes   # BINARY_RECORD, for binary clients
+
+
+def encode_fragment(update: dict) -> str:
+    """Serialize one update; done once per ticker per cycle and shared by all sockets."""
+    return orjson.dumps(update).decode()
+
+def assemble_price_update(fragments: List[str]) -> str:
+    """Build a PRICE_UPDATE frame from pre-serialized update fragments."""
+    return '{"type":"PRICE_UPDATE","data":[' + ",".join(fragments) + "]}"
+
+def assemble_binary_update(items: List[StreamUpdate]) -> bytes:
+    return BINARY_HEADER.pack(BINARY_PRICE_UPDATE, len(items)) + b"".join(u.record for u in items)
+
+
+class ClientChannel:
+    """
+    Outbound side of a single socket: a bounded queue drained by its own writer task,
+    so a slow client only ever delays itself.
+    Queue items are ready text frames or lists of StreamUpdate assembled at send time.
+    """
+    def __init__(self, websocket: WebSocket, max_queue: int, policy: str, on_dead,
+                 delta: bool = False, binary: bool = False):
+        self.websocket = websocket
+        self.subs: set = set()
+        self.max_queue = max_queue
+        self.policy = policy
+        self.delta = delta
+        self.binary = binary
+        self.queue: deque = deque()
+        # coalesce policy (and delta mode): latest update per ticker, flushed as one frame
+        self.pending: Dict[str, StreamUpdate] = {}
+        # delta mode: last price sent per ticker
+        self.last_sent: Dict[str, float] = {}
+        # binary mode: symbol ids already announced to this client
+        self.known_ids: Set[int] = set()
+        self.wakeup = asyncio.Event()
+        self.on_dead = on_dead
+        self.writer = asyncio.create_task(self._run())
+
+    def offer_updates(self, items: List[StreamUpdate], message: Optional[str] = None) -> bool:
+        """
+        Queue a cycle's updates without awaiting.
+        `message` is the already-assembled JSON frame when the caller can share one across sockets.
+        Returns False if the client must be dropped.
+        """
+        if self.delta:
+            items = [u for u in items if self.last_sent.get(u.ticker) != u.price]
+            if not items:
+                return True
+            for u in items:
+                self.last_sent[u.ticker] = u.price
+            message = None
+        # A delta that is dropped would never be resent, so delta clients always coalesce
+        if self.policy == "coalesce" or self.delta:
+            for u in items:
+                self.pending[u.ticker] = u
+            self.wakeup.set()
+            return True
+        if message is not None and not self.binary:
+            return self.offer(message)
+        return self.offer(items)
+
+    def offer(self, item) -> bool:
+        if len(self.queue) >= self.max_queue:
+            if self.policy == "disconnect":
+                return False
+            self.queue.popleft()
+        self.queue.append(item)
+        self.wakeup.set()
+        return True
+
+    def _next_item(self):
+        if self.queue:
+            return self.queue.popleft()
+        if self.pending:
+            items = list(self.pending.values())
+            self.pending.clear()
+            return items
+        return None
+
+    async def _send(self, item):
+        if isinstance(item, str):
+            await self.websocket.send_text(item)
+        elif not self.binary:
+            await self.websocket.send_text(assemble_price_update([u.fragment for u in item]))
+        else:
+            unknown = {u.symbol_id: u.ticker for u in item if u.symbol_id not in self.known_ids}
+            if unknown:
+                await self.websocket.send_text(json.dumps({"type": "SYMBOLS", "data": unknown}))
+                self.known_ids.update(unknown)
+            await self.websocket.send_bytes(assemble_binary_update(item))
+
+    async def _run(self):
+        try:
+            while True:
+                await self.wakeup.wait()
+                self.wakeup.clear()
+                item = self._next_item()
+                while item is not None:
+                    await self._send(item)
+                    item = self._next_item()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Send error, dropping client: {e}")
+            self.on_dead(self.websocket)
+
+    def close(self):
+        self.writer.cancel()
+
 
 class ConnectionManager:
-    def __init__(self):
-        self.active_connections: Dict[WebSocket, set] = {}
+    def __init__(self, max_queue: int = 32, policy: str = "drop_oldest"):
+        if policy not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown overflow policy '{policy}'")
+        self.active_connections: Dict[WebSocket, ClientChannel] = {}
+        # Inverted index ticker -> sockets, kept in step with each channel's subs
+        self.subscribers: Dict[str, Set[WebSocket]] = {}
+        # Last update per ticker, used for snapshot-on-subscribe in delta mode
+        self.latest: Dict[str, StreamUpdate] = {}
+        self.symbol_ids: Dict[str, int] = {}
         self.lock = asyncio.Lock()
+        self.max_queue = max_queue
+        self.policy = policy
 
-    async def connect(self, websocket: WebSocket):
+    async def connect(self, websocket: WebSocket, mode: str = "full", encoding: str = "json"):
         await websocket.accept()
         async with self.lock:
             # Default indices for everyone
-            self.active_connections[websocket] = set()
+            channel = ClientChannel(
+                websocket, self.max_queue, self.policy, self.disconnect,
+                delta=mode == "delta", binary=encoding == "binary"
+            )
+            self.active_connections[websocket] = channel
+            if mode != "full" or encoding != "json":
+                channel.offer(json.dumps({"type": "HELLO", "data": {"mode": mode, "encoding": encoding}}))
+            if channel.delta:
+                self._snapshot(channel, BROAD_INDICES)
         logger.info(f"New connection. Total: {len(self.active_connections)}")
 
     def disconnect(self, websocket: WebSocket):
-        if websocket in self.active_connections:
-            del self.active_connections[websocket]
+        channel = self.active_connections.pop(websocket, None)
+        if channel is not None:
+            self._unindex(websocket, channel.subs)
+            channel.close()
             logger.info(f"Connection closed. Total: {len(self.active_connections)}")
 
+    def _unindex(self, websocket: WebSocket, tickers):
+        for ticker in tickers:
+            sockets = self.subscribers.get(ticker)
+            if sockets is not None:
+                sockets.discard(websocket)
+                if not sockets:
+                    del self.subscribers[ticker]
+
+    def _snapshot(self, channel: ClientChannel, tickers):
+        """Send the current value of `tickers` to a delta client regardless of last_sent."""
+        items = [self.latest[t] for t in tickers if t in self.latest]
+        for u in items:
+            channel.last_sent.pop(u.ticker, None)
+        if items:
+            channel.offer_updates(items)
+
     async def subscribe(self, websocket: WebSocket, tickers: List[str]):
         async with self.lock:
             if websocket in self.active_connections:
+                channel = self.active_connections[websocket]
                 for ticker in tickers:
-                    self.active_connections[websocket].add(ticker)
+                    channel.subs.add(ticker)
+                    self.subscribers.setdefault(ticker, set()).add(websocket)
+                if channel.delta:
+                    self._snapshot(channel, tickers)
                 logger.info(f"Socket subscribed to: {tickers}")
 
     async def unsubscribe(self, websocket: WebSocket, tickers: List[str]):
         async with self.lock:
             if websocket in self.active_connections:
+                channel = self.active_connections[websocket]
                 for ticker in tickers:
-                    self.active_connections[websocket].discard(ticker)
+                    channel.subs.discard(ticker)
+                    channel.last_sent.pop(ticker, None)
+                self._unindex(websocket, tickers)
                 logger.info(f"Socket unsubscribed from: {tickers}")
 
     def get_all_tickers(self) -> set:
-        all_tickers = {"^NSEI", "^BSESN", "^NSEBANK", "^INDIAVIX"}
-        for tickers in self.active_connections.values():
-            all_tickers.update(tickers)
-        return all_tickers
+        return BROAD_INDICES.union(self.subscribers)
+
+    def subscriber_count(self, ticker: str) -> int:
+        # Broad indices go to every socket
+        if ticker in BROAD_INDICES:
+            return len(self.active_connections)
+        return len(self.subscribers.get(ticker, ()))
+
+    def _symbol_id(self, ticker: str) -> int:
+        symbol_id = self.symbol_ids.get(ticker)
+        if symbol_id is None:
+            symbol_id = self.symbol_ids[ticker] = len(self.symbol_ids)
+        return symbol_id
+
+    def _encode(self, update: dict) -> StreamUpdate:
+        ticker = update["ticker"]
+        symbol_id = self._symbol_id(ticker)
+        change_pct = float(str(update["change"]).rstrip("%"))
+        return StreamUpdate(
+            ticker=ticker,
+            price=update["price"],
+            symbol_id=symbol_id,
+            fragment=encode_fragment(update),
+            record=BINARY_RECORD.pack(symbol_id, update["price"], change_pct)
+        )
+
+    def _drop_slow(self, websocket: WebSocket):
+        logger.warning("Send queue overflow, disconnecting slow client")
+        self.disconnect(websocket)
+        asyncio.create_task(self._close_quietly(websocket))
+
+    async def _close_quietly(self, websocket: WebSocket):
+        try:
+            await websocket.close(code=1013)  # Try Again Later
+        except Exception:
+            pass
 
     async def broadcast(self, updates: List[dict]):
-        async with self.lock:
-            for websocket, subs in self.active_connections.items():
-                # Filter updates based on what this socket is interested in
-                # Everyone gets the broad indices + their specific subs
-                broad_indices = {"^NSEI", "^BSESN", "^NSEBANK", "^INDIAVIX"}
-                socket_tickers = broad_indices.union(subs)
-                filtered_updates = [u for u in updates if u["ticker"] in socket_tickers]
-                
-                if filtered_updates:
-                    try:
-                        await websocket.send_text(json.dumps({
-                            "type": "PRICE_UPDATE",
-                            "data": filtered_updates
-                        }))
-                    except Exception as e:
-                        logger.error(f"Broadcast error: {e}")
-                        # We'll handle cleanup in the disconnect logic called by the loop if it fails
+        """
+        Enqueue updates on every interested socket; never awaits a send.
+        Each update is encoded once, and per-socket work is proportional to the
+        (ticker, subscriber) pairs that actually changed.
+        """
+        # Everyone gets the broad indices + their specific subs
+        broad: List[StreamUpdate] = []
+        per_socket: Dict[WebSocket, List[StreamUpdate]] = {}
+        for update in updates:
+            item = self._encode(update)
+            self.latest[item.ticker] = item
+            if item.ticker in BROAD_INDICES:
+                broad.append(item)
+                continue
+            for websocket in self.subscribers.get(item.ticker, ()):
+                per_socket.setdefault(websocket, []).append(item)
+
+        broad_message = assemble_price_update([u.fragment for u in broad]) if broad else None
+        # Without index updates only the sockets found through the index need visiting
+        targets = list(self.active_connections) if broad else list(per_socket)
+        for websocket in targets:
+            channel = self.active_connections.get(websocket)
+            if channel is None:
+                continue
+            own = per_socket.get(websocket)
+            if own:
+                ok = channel.offer_updates(broad + own)
+            elif broad:
+                ok = channel.offer_updates(broad, broad_message)
+            else:
+                continue
+            if not ok:
+                self._drop_slow(websocket)
 
-manager = ConnectionManager()
+    async def broadcast_bars(self, bars: List[ClosedBar]):
+        """Push BAR_CLOSE events to the sockets subscribed to each bar's ticker."""
+        for bar in bars:
+            message = orjson.dumps({"type": "BAR_CLOSE", "data": {
+                "ticker": bar.ticker, "interval": bar.interval, "t": bar.t,
+                "o": round(bar.o, 2), "h": round(bar.h, 2), "l": round(bar.l, 2), "c": round(bar.c, 2)
+            }}).decode()
+            if bar.ticker in BROAD_INDICES:
+                targets = list(self.active_connections)
+            else:
+                targets = list(self.subscribers.get(bar.ticker, ()))
+            for websocket in targets:
+                channel = self.active_connections.get(websocket)
+                if channel is not None and not channel.offer(message):
+                    self._drop_slow(websocket)
+
+    async def broadcast_alerts(self, fired: List[FiredAlert]):
+        """Alerts are app-wide (like the watchlist), so every socket gets one ALERT frame per cycle."""
+        message = orjson.dumps({"type": "ALERT", "data": [
+            {
+                "id": a.id, "ticker": a.ticker, "metric": a.metric, "direction": a.direction,
+                "threshold": a.threshold, "value": round(a.value, 2)
+            }
+            for a in fired
+        ]}).decode()
+        for websocket, channel in list(self.active_connections.items()):
+            if not channel.offer(message):
+                self._drop_slow(websocket)
+
+manager = ConnectionManager(
+    max_queue=settings.WS_SEND_QUEUE_SIZE,
+    policy=settings.WS_OVERFLOW_POLICY
+)
+
+scheduler = PollScheduler(
+    base_interval=settings.STREAM_BASE_INTERVAL,
+    min_interval=settings.STREAM_MIN_INTERVAL,
+    max_interval=settings.STREAM_MAX_INTERVAL,
+    off_hours_interval=settings.STREAM_OFF_HOURS_INTERVAL
+)
+
+# Live intraday bars, built in every worker from the quotes it dispatches
+candles = CandleAggregator(capacity=settings.CANDLE_BUFFER_BARS)
+
+alerts = AlertEngine(sync_seconds=settings.ALERT_SYNC_SECONDS)
 
 # Background task state
 streaming_task = None
 
-async def stream_prices():
+def fetch_quote(ticker_symbol: str) -> dict:
+    """
+    Fetch the latest quote for a ticker.
+    Raw (unrounded) values are kept so they can be persisted and reformatted.
+    """
+    # Optimized fetch using fast_info
+    ticker = yf.Ticker(ticker_symbol)
+    info = ticker.fast_info
+    current = info.last_price
+    prev_close = info.previous_close
+
+    if prev_close and prev_close != 0:
+        change_pct = ((current - prev_close) / prev_close) * 100
+    else:
+        change_pct = 0
+
+    return {
+        "ticker": ticker_symbol,
+        "price": float(current),
+        "prev_close": float(prev_close) if prev_close else None,
+        "change_pct": float(change_pct),
+        "ts": time.time()
+    }
+
+def format_update(quote: dict) -> dict:
+    """Shape a quote into the PRICE_UPDATE wire format."""
+    return {
+        "ticker": quote["ticker"],
+        "price": round(quote["price"], 2),
+        "change": f"{round(quote['change_pct'], 2)}%",
+        "positive": quote["change_pct"] >= 0
+    }
+
+def local_interest() -> Dict[str, int]:
+    """This worker's subscriber count per ticker, as announced to the leader."""
+    if not manager.active_connections:
+        return {}
+    return {t: manager.subscriber_count(t) for t in manager.get_all_tickers()}
+
+async def dispatch_quotes(quotes: List[dict]):
+    """Per-worker fan-in for a cycle's quotes, whether polled here or received from the leader."""
+    # Off-hours heartbeat polls repeat the last price; they must not become flat bars
+    closed = candles.update([q for q in quotes if in_session(q["ts"])])
+    fired = alerts.evaluate(quotes, lambda t: candles.closes(t, RSI_INTERVAL))
+    if manager.active_connections:
+        await manager.broadcast([format_update(q) for q in quotes])
+        if closed:
+            await manager.broadcast_bars(closed)
+        if fired:
+            await manager.broadcast_alerts(fired)
+
+async def stream_prices(backplane: Backplane):
     """
-    Background loop to fetch prices and broadcast to all connected clients.
+    Leader loop: fetch prices, persist them to quotes_latest and publish
+    them to this worker's clients and every follower worker.
+    Each ticker is polled on its own schedule (see PollScheduler).
     """
     logger.info("Starting price stream background task")
-    while True:
-        if not manager.active_connections:
-            await asyncio.sleep(5)
-            continue
+    quote_table = None
+    if settings.QUOTE_SHM_NAME:
+        try:
+            quote_table = SharedQuoteTable.create(settings.QUOTE_SHM_NAME, settings.QUOTE_SHM_CAPACITY)
+        except Exception as e:
+            logger.error(f"Shared quote table unavailable: {e}")
+    recorder = TickRecorder(settings.TICK_LOG_DIR) if settings.TICK_LOG_DIR else None
+    try:
+        await _poll_loop(backplane, quote_table, recorder)
+    finally:
+        # Shutdown cancels the loop: take the table out of /dev/shm with it
+        if quote_table is not None:
+            quote_table.close(unlink=True)
 
+async def _poll_loop(backplane: Backplane, quote_table: Optional[SharedQuoteTable], recorder: Optional[TickRecorder]):
+    while True:
         try:
-            all_tickers = manager.get_all_tickers()
-            updates = []
-            
-            # Fetch for all unique tickers currently requested
-            for ticker_symbol in all_tickers:
+            # Watchlist and alert symbols are kept fresh even without sockets
+            alerts.sync()
+            watchlist_tickers = set(get_watchlist_tickers()) | alerts.tickers()
+            interest = backplane.remote_interest()
+            for ticker, count in local_interest().items():
+                interest[ticker] = interest.get(ticker, 0) + count
+            if not interest and not watchlist_tickers:
+                await asyncio.sleep(5)
+                continue
+
+            all_tickers = watchlist_tickers.union(interest)
+
+            phase = market_phase()
+            now = time.monotonic()
+            quotes = []
+
+            # Fetch only the tickers whose poll is due
+            for ticker_symbol in scheduler.due(all_tickers, now):
+                price = None
                 try:
-                    # Optimized fetch using fast_info
-                    ticker = yf.Ticker(ticker_symbol)
-                    info = ticker.fast_info
-                    current = info.last_price
-                    prev_close = info.previous_close
-                    
-                    if prev_close and prev_close != 0:
-                        change_pct = ((current - prev_close) / prev_close) * 100
-                    else:
-                        change_pct = 0
-
-                    updates.append({
-                        "ticker": ticker_symbol,
-                        "price": round(current, 2),
-                        "change": f"{round(change_pct, 2)}%",
-                        "positive": change_pct >= 0
-                    })
+                    # Never queue for rate-limit tokens here: a slow ticker would delay every other poll
+                    quote = await upstreams.yfinance.acall(fetch_quote, ticker_symbol, max_wait=0)
+                    quotes.append(quote)
+                    price = quote["price"]
+                except UpstreamUnavailable:
+                    pass  # circuit open or over budget: keep serving the last quotes, retry next interval
                 except Exception as e:
                     logger.error(f"Error fetching {ticker_symbol}: {e}")
+                scheduler.record(ticker_symbol, price, time.monotonic(), interest.get(ticker_symbol, 0), phase)
+
+            if quotes:
+                if quote_table is not None:
+                    quote_table.write_many(quotes)
+                if recorder is not None:
+                    try:
+                        recorder.append(quotes)
+                    except Exception as e:
+                        logger.error(f"Tick recording failed: {e}")
+                try:
+                    upsert_latest_quotes(quotes)
+                except Exception as e:
+                    logger.error(f"Quote persistence failed: {e}")
+                await backplane.publish(quotes)
+                await dispatch_quotes(quotes)
+
+            # Sleep until the next ticker is due, re-checking subscriptions at least every few seconds
+            wakeup = scheduler.next_wakeup()
+            delay = 5.0 if wakeup is None else wakeup - time.monotonic()
+            await asyncio.sleep(min(max(delay, 0.2), 5.0))
 
-            if updates:
-                await manager.broadcast(updates)
-            
-            await asyncio.sleep(5)
-            
         except Exception as e:
             logger.error(f"Price stream loop error: {e}")
             await asyncio.sleep(10)
 
+async def run_price_stream():
+    """
+    Elect a single poller across worker processes. The leader polls upstream and
+    publishes over the backplane; every other worker follows it and only fans out.
+    A follower retries the election whenever it loses the leader.
+    """
+    if settings.STREAM_REPLAY_PATH:
+        # Offline mode: recorded ticks stand in for yfinance
+        logger.info(f"Replaying ticks from {settings.STREAM_REPLAY_PATH} at {settings.STREAM_REPLAY_SPEED}x")
+        await replay_ticks(settings.STREAM_REPLAY_PATH, dispatch_quotes, settings.STREAM_REPLAY_SPEED)
+        return
+
+    backplane = create_backplane()
+    if not backplane.needs_election:
+        await backplane.serve()
+        await stream_prices(backplane)
+        return
+
+    lock = FileLeaderLock(stream_lock_path())
+    while True:
+        try:
+            if lock.try_acquire():
+                await backplane.serve()
+                await stream_prices(backplane)
+            await backplane.follow(dispatch_quotes, local_interest)
+        except Exception as e:
+            logger.error(f"Price stream election error: {e}")
+        await asyncio.sleep(1)
+
 @router.websocket("/ws/prices")
 async def websocket_endpoint(websocket: WebSocket):
-    await manager.connect(websocket)
+    mode = websocket.query_params.get("mode", "full")
+    encoding = websocket.query_params.get("encoding", "json")
+    if mode not in STREAM_MODES or encoding not in STREAM_ENCODINGS:
+        await websocket.close(code=1003)  # Unsupported Data
+        return
+    await manager.connect(websocket, mode=mode, encoding=encoding)
     try:
         while True:
             data = await websocket.receive_text()
@@ -148,5 +553,5 @@ async def websocket_endpoint(websocket: WebSocket):
 def start_background_stream():
     global streaming_task
     if streaming_task is None:
-        streaming_task = asyncio.create_task(stream_prices())
+        streaming_task = asyncio.create_task(run_price_stream())
         logger.info("Price stream task initialized")
@@ -1,13 +1,35 @@
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Response
+from fastapi.responses import StreamingResponse
 import yfinance as yf
-from typing import List, Dict, Optional
+from typing import Awaitable, Callable, List, Dict, Optional
+import asyncio
 import logging
-from Utils.ResponseHelper import make_response
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from Utils.ResponseHelper import make_response, etag_for, dumps
 from Utils.ResponseHelperModels import HTTPStatusCode, APICode
+from Utils.HistoryDownsampler import RESAMPLE_RULES, DOWNSAMPLE_METHODS, downsample_history, lttb_indices
+from Utils.StaleCache import CacheResult, StaleWhileRevalidateCache
+import Utils.Resilience as upstreams
+from Utils.Resilience import UpstreamUnavailable
+from Utils.HistorySerializer import HISTORY_FORMATS, history_to_records, history_to_columns, history_to_packed
 from Config.SystemConfig import get_settings
 from Database.DatabaseConnection import get_db_connection
-from Models.StockModels import TickerInput, RiskAnalysisRequest
+from Database.QuoteStore import get_watchlist_quotes
+from Database.FundamentalsStore import get_sector_changes
+from Services.Market.SharedQuoteTable import read_fresh_quotes
+from Services.Market.CandleAggregator import INTRADAY_INTERVALS, INTRADAY_PERIOD_SESSIONS, merge_intraday, session_window
+from Controller.PriceStreamController import candles, fetch_quote
+from Models.StockModels import TickerInput, RiskAnalysisRequest, BacktestRequest, SweepRequest, AnalysisBatchRequest
+from Services.Analytics.ParameterSweep import parameter_grid, run_sweep
+from Services.Analytics.PriceMatrix import get_price_matrix, is_supported_period, period_start
+from Database.SweepJobStore import create_sweep_job, update_sweep_job, get_sweep_job
+from Services.Analytics.Backtest import SignalParams, run_backtest
+from Services.Analytics.Indicators import rsi_series, technical_signal
+from Services.Analytics.AnalysisPipeline import AnalysisTimeout, analyze_batch, analyze_ticker
 import pandas as pd
 import numpy as np
 from openai import OpenAI
@@ -19,6 +41,30 @@ logger = logging.getLogger(__name__)
 router = APIRouter()
 settings = get_settings()
 
+# While an upstream circuit is open, even hard-expired results are better than an error
+analysis_cache = StaleWhileRevalidateCache(
+    settings.ANALYSIS_SOFT_TTL_SECONDS, settings.ANALYSIS_HARD_TTL_SECONDS, serve_expired_on=(UpstreamUnavailable,),
+    degraded_ttl=settings.ANALYSIS_DEGRADED_TTL_SECONDS
+)
+signals_cache = StaleWhileRevalidateCache(
+    settings.SIGNALS_SOFT_TTL_SECONDS, settings.SIGNALS_HARD_TTL_SECONDS, serve_expired_on=(UpstreamUnavailable,)
+)
+market_analysis_cache = StaleWhileRevalidateCache(
+    settings.MARKET_ANALYSIS_SOFT_TTL_SECONDS, settings.MARKET_ANALYSIS_HARD_TTL_SECONDS
+)
+
+def upstream_unavailable_response(e: UpstreamUnavailable, location: str):
+    """Fast 503 while an upstream's circuit is open (or its rate limit is saturated)."""
+    logger.warning(f"{location}: {e}")
+    return make_response(
+        status=HTTPStatusCode.SERVICE_UNAVAILABLE,
+        code=APICode.UPSTREAM_UNAVAILABLE,
+        message=f"Market data provider unavailable, retry in {int(e.retry_after) + 1}s",
+        error=str(e),
+        location=location,
+        headers={"Retry-After": str(int(e.retry_after) + 1)}
+    )
+
 @router.get("/market/summary")
 async def get_market_summary():
     """
@@ -34,13 +80,16 @@ async def get_market_summary():
         }
         
         summary_data = []
+        # Live values published by the price stream, shared across workers
+        shared = read_fresh_quotes(list(indices.values()), settings.QUOTE_STALE_SECONDS)
         
         for name, ticker in indices.items():
             try:
-                stock = yf.Ticker(ticker)
-                # Optimization: use fast_info
-                current = stock.fast_info.last_price
-                prev_close = stock.fast_info.previous_close
+                if ticker in shared:
+                    current, prev_close, _ = shared[ticker]
+                else:
+                    quote = await upstreams.yfinance.acall(fetch_quote, ticker)
+                    current, prev_close = quote["price"], quote["prev_close"]
                 
                 if prev_close and prev_close != 0:
                     change_pct = ((current - prev_close) / prev_close) * 100
@@ -76,35 +125,27 @@ async def get_market_summary():
 async def get_watchlist():
     """Get all stocks in the watchlist"""
     try:
+        # Quotes are materialized by the price stream, so this is a local read only
+        now = time.time()
         results = []
-        with get_db_connection() as conn:
-            watchlist = conn.execute("SELECT * FROM watchlist").fetchall()
-            
-            for item in watchlist:
-                ticker = item['ticker']
-                try:
-                    stock = yf.Ticker(ticker)
-                    info = stock.fast_info
-                    current = info.last_price
-                    prev = info.previous_close
-                    change = ((current - prev) / prev) * 100 if prev else 0
-                    
-                    results.append({
-                        "id": item['id'],
-                        "symbol": ticker,
-                        "price": round(current, 2),
-                        "change": round(change, 2)
-                    })
-                except Exception:
-                    # Log as warning only if needed, or silently fail for delisted/invalid stocks to avoid noise
-                    # logger.warning(f"Could not fetch data for {ticker}")
-                    results.append({
-                        "id": item['id'],
-                        "symbol": ticker,
-                        "price": 0,
-                        "change": 0
-                    })
-                    
+        rows = get_watchlist_quotes()
+        shared = read_fresh_quotes([row["ticker"] for row in rows], settings.QUOTE_STALE_SECONDS)
+        for row in rows:
+            if row["ticker"] in shared:
+                # Same cycle as the database row or newer, without touching SQLite's page cache
+                price, prev_close, row["updated_at"] = shared[row["ticker"]]
+                row["price"] = price
+                row["change_pct"] = ((price - prev_close) / prev_close) * 100 if prev_close else 0
+            updated_at = row["updated_at"]
+            results.append({
+                "id": row["id"],
+                "symbol": row["ticker"],
+                "price": round(row["price"], 2) if row["price"] is not None else 0,
+                "change": round(row["change_pct"], 2) if row["change_pct"] is not None else 0,
+                "updated_at": datetime.fromtimestamp(updated_at, tz=timezone.utc).isoformat() if updated_at else None,
+                "stale": updated_at is None or (now - updated_at) > settings.QUOTE_STALE_SECONDS
+            })
+
         return make_response(
             status=HTTPStatusCode.OK,
             code=APICode.OK,
@@ -175,13 +216,26 @@ async def remove_from_watchlist(ticker: str):
 
 
 # mock 
-@router.get("/market/analysis")
-async def get_market_analysis():
-    """
-    Get top gainers/losers and sector performance.
-    """
-    try:
-        # Mocking Sector Performance for reliability
+def sector_performance(change: float) -> str:
+    if change > 0.25:
+        return "Bullish"
+    if change < -0.25:
+        return "Bearish"
+    return "Neutral"
+
+def build_market_analysis() -> dict:
+    # Sector performance from stored sectors and the latest streamed quotes
+    sectors = [
+        {
+            "name": row["name"],
+            "change": round(row["change"], 2),
+            "performance": sector_performance(row["change"]),
+            "constituents": row["constituents"]
+        }
+        for row in get_sector_changes()
+    ]
+    if not sectors:
+        # Mocked until fundamentals and quotes have been collected
         sectors = [
             {"name": "Nifty Bank", "change": 1.2, "performance": "Bullish"},
             {"name": "Nifty IT", "change": -0.5, "performance": "Bearish"},
@@ -189,26 +243,37 @@ async def get_market_analysis():
             {"name": "Nifty Pharma", "change": -0.2, "performance": "Neutral"},
             {"name": "Nifty FMCG", "change": 0.1, "performance": "Neutral"},
         ]
-        
-        # Simulated Top Movers
-        movers = {
-            "gainers": [
-                 {"symbol": "RELIANCE.NS", "price": 2500, "change": 2.5},
-                 {"symbol": "TCS.NS", "price": 3400, "change": 1.8},
-                 {"symbol": "HDFCBANK.NS", "price": 1600, "change": 1.5},
-            ],
-            "losers": [
-                 {"symbol": "INFY.NS", "price": 1400, "change": -1.2},
-                 {"symbol": "WIPRO.NS", "price": 400, "change": -2.0},
-                 {"symbol": "TATAMOTORS.NS", "price": 600, "change": -0.8},
-            ]
-        }
-        
+
+    # Simulated Top Movers
+    movers = {
+        "gainers": [
+             {"symbol": "RELIANCE.NS", "price": 2500, "change": 2.5},
+             {"symbol": "TCS.NS", "price": 3400, "change": 1.8},
+             {"symbol": "HDFCBANK.NS", "price": 1600, "change": 1.5},
+        ],
+        "losers": [
+             {"symbol": "INFY.NS", "price": 1400, "change": -1.2},
+             {"symbol": "WIPRO.NS", "price": 400, "change": -2.0},
+             {"symbol": "TATAMOTORS.NS", "price": 600, "change": -0.8},
+        ]
+    }
+    return {"sectors": sectors, "movers": movers}
+
+@router.get("/market/analysis")
+async def get_market_analysis():
+    """
+    Get top gainers/losers and sector performance.
+    """
+    try:
+        cached = await market_analysis_cache.get(
+            "market", lambda: asyncio.to_thread(build_market_analysis)
+        )
         return make_response(
             status=HTTPStatusCode.OK,
             code=APICode.OK,
             message="Market analysis fetched successfully",
-            data={"sectors": sectors, "movers": movers}
+            data=cached.value,
+            headers=cached.headers()
         )
     except Exception as e:
         logger.error(f"Market analysis error: {e}")
@@ -220,6 +285,31 @@ async def get_market_analysis():
             location="get_market_analysis"
         )
 
+def matrix_closes(tickers: List[str], period: str) -> Optional[pd.DataFrame]:
+    """Closes from the memory-mapped price matrix, or None if it lacks a ticker or is stale."""
+    matrix = get_price_matrix(settings.PRICE_MATRIX_DIR)
+    if matrix is None or not matrix.rows or not matrix.has(tickers):
+        return None
+    last = pd.Timestamp(int(matrix.dates[-1]), unit="s")
+    if pd.Timestamp.now() - last > pd.Timedelta(days=settings.PRICE_MATRIX_MAX_AGE_DAYS):
+        return None
+    return matrix.frame(tickers, start=period_start(period, last)).dropna(how="all")
+
+def load_close_matrix(tickers: List[str], period: str) -> pd.DataFrame:
+    """
+    Daily closes as a dates x tickers frame (naive date index), NaN where a ticker
+    has no bar. Served from the price matrix when it covers the request.
+    """
+    data = matrix_closes(tickers, period)
+    if data is not None:
+        return data
+    data = upstreams.yfinance.call(yf.download, tickers, period=period, progress=False)['Close']
+    if isinstance(data, pd.Series):
+        data = data.to_frame(name=tickers[0])
+    if data.index.tz is not None:
+        data.index = data.index.tz_localize(None).normalize()
+    return data.dropna(how="all")
+
 @router.post("/risk/calculate")
 async def calculate_risk(request: RiskAnalysisRequest):
     """
@@ -252,12 +342,8 @@ async def calculate_risk(request: RiskAnalysisRequest):
              )
         weights = [w / total_weight for w in weights]
         
-        # Download data (silently)
-        data = yf.download(tickers, period="6mo", progress=False)['Close']
-        
-        # Handle single ticker case (Series vs DataFrame)
-        if isinstance(data, pd.Series):
-            data = data.to_frame(name=tickers[0])
+        # Price matrix when it covers the portfolio, otherwise a live download
+        data = await asyncio.to_thread(load_close_matrix, tickers, "6mo")
             
         # Align data
         data = data.dropna()
@@ -276,7 +362,7 @@ async def calculate_risk(request: RiskAnalysisRequest):
         port_volatility = np.sqrt(port_variance)
         
         # Benchmark (Nifty 50) for Beta
-        nifty = yf.download("^NSEI", period="6mo", progress=False)['Close']
+        nifty = (await asyncio.to_thread(load_close_matrix, ["^NSEI"], "6mo"))["^NSEI"]
         nifty_returns = nifty.pct_change().dropna()
         
         # Align indices
@@ -329,61 +415,251 @@ async def calculate_risk(request: RiskAnalysisRequest):
             location="calculate_risk"
         )
 
+BACKTEST_MAX_TICKERS = 500
+EQUITY_CURVE_POINTS = 500
+
+def signal_params(rsi_window=None, oversold=None, overbought=None, sma_window=None) -> SignalParams:
+    """Rule parameters, falling back to the configured SIGNAL_* settings."""
+    return SignalParams(
+        rsi_window or settings.SIGNAL_RSI_WINDOW,
+        settings.SIGNAL_RSI_OVERSOLD if oversold is None else oversold,
+        settings.SIGNAL_RSI_OVERBOUGHT if overbought is None else overbought,
+        sma_window or settings.SIGNAL_SMA_WINDOW
+    )
+
+@router.post("/backtest")
+async def backtest_signals(request: BacktestRequest):
+    """
+    Backtest the RSI/SMA signal rule (or a variant of its parameters) on an
+    equal-weight portfolio of the requested tickers.
+    """
+    if not request.tickers or len(request.tickers) > BACKTEST_MAX_TICKERS:
+        return make_response(
+            status=HTTPStatusCode.BAD_REQUEST,
+            code=APICode.VALIDATION,
+            message=f"Provide between 1 and {BACKTEST_MAX_TICKERS} tickers"
+        )
+    if not is_supported_period(request.period):
+        return make_response(
+            status=HTTPStatusCode.BAD_REQUEST,
+            code=APICode.VALIDATION,
+            message=f"Unsupported period '{request.period}' (use e.g. 5d, 6mo, 10y, ytd or max)"
+        )
+    params = signal_params(request.rsi_window, request.oversold, request.overbought, request.sma_window)
+    if not 0 <= params.oversold < params.overbought <= 100:
+        return make_response(
+            status=HTTPStatusCode.BAD_REQUEST,
+            code=APICode.VALIDATION,
+            message="Thresholds must satisfy 0 <= oversold < overbought <= 100"
+        )
+    try:
+        data = await asyncio.to_thread(load_close_matrix, [t.upper() for t in request.tickers], request.period)
+        if len(data) <= params.sma_window:
+            return make_response(
+                status=HTTPStatusCode.BAD_REQUEST,
+                code=APICode.DATA_NOT_FOUND,
+                message="Not enough history for the requested windows"
+            )
+
+        started = time.perf_counter()
+        result = run_backtest(
+            data.to_numpy(dtype=np.float64), params,
+            allow_short=request.allow_short, cost_bps=request.cost_bps
+        )
+        elapsed_ms = (time.perf_counter() - started) * 1000
+
+        # Equity curve for charting, bounded with LTTB
+        equity = np.cumprod(1 + result.returns)
+        t = data.index[1:].as_unit("s").asi8
+        keep = lttb_indices(t, equity, EQUITY_CURVE_POINTS) if len(equity) > EQUITY_CURVE_POINTS else slice(None)
+
+        return make_response(
+            status=HTTPStatusCode.OK,
+            code=APICode.OK,
+            message="Backtest completed successfully",
+            data={
+                "params": params._asdict(),
+                "tickers": list(data.columns),
+                "start": data.index[0].strftime('%Y-%m-%d'),
+                "end": data.index[-1].strftime('%Y-%m-%d'),
+                "metrics": {k: round(v, 4) for k, v in result.metrics.items()},
+                "benchmark": {k: round(v, 4) for k, v in result.benchmark.items()},
+                "equity": {"t": t[keep].tolist(), "v": np.round(equity[keep], 4).tolist()},
+                "compute_ms": round(elapsed_ms, 2)
+            }
+        )
+    except Exception as e:
+        logger.error(f"Backtest error: {e}")
+        return make_response(
+            status=HTTPStatusCode.INTERNAL_SERVER_ERROR,
+            code=APICode.INTERNAL_SERVER_ERROR,
+            message="Backtest failed",
+            error=str(e),
+            location="backtest_signals"
+        )
+
+# Sweeps are CPU-bound and already use every core, so run one at a time per process
+sweep_slots = threading.BoundedSemaphore(1)
+
+def _run_sweep_job(job_id: str, request: SweepRequest, grid):
+    with sweep_slots:
+        try:
+            update_sweep_job(job_id, status="running")
+            data = load_close_matrix([t.upper() for t in request.tickers], request.period)
+            if len(data) <= max(p.sma_window for p in grid) + 1:
+                raise ValueError("Not enough history for the requested windows")
+            result = run_sweep(
+                data.to_numpy(dtype=np.float64), grid,
+                folds=request.folds, allow_short=request.allow_short, cost_bps=request.cost_bps,
+                workers=settings.SWEEP_WORKERS,
+                on_progress=lambda done, total: update_sweep_job(job_id, done=done)
+            )
+            # Return i is earned on bar i + 1
+            dates = data.index[1:].strftime('%Y-%m-%d')
+            for fold in result["walk_forward"]["folds"]:
+                for key in ("train", "test"):
+                    lo, hi = fold[key]
+                    fold[key] = {"start": dates[lo], "end": dates[hi - 1]}
+            result["tickers"] = list(data.columns)
+            update_sweep_job(job_id, status="done", result=result)
+            logger.info(f"Sweep {job_id} finished in {result['elapsed_ms']}ms")
+        except Exception as e:
+            logger.error(f"Sweep {job_id} failed: {e}")
+            update_sweep_job(job_id, status="failed", error=str(e))
+
+@router.post("/backtest/sweep")
+async def start_parameter_sweep(request: SweepRequest):
+    """
+    Queue a grid search over the signal rule's parameters with walk-forward validation.
+    Poll /backtest/sweep/{job_id} for progress and results.
+    """
+    grid = parameter_grid(request.rsi_windows, request.oversold_levels, request.overbought_levels, request.sma_windows)
+    if not request.tickers or len(request.tickers) > BACKTEST_MAX_TICKERS:
+        return make_response(
+            status=HTTPStatusCode.BAD_REQUEST,
+            code=APICode.VALIDATION,
+            message=f"Provide between 1 and {BACKTEST_MAX_TICKERS} tickers"
+        )
+    if not is_supported_period(request.period):
+        return make_response(
+            status=HTTPStatusCode.BAD_REQUEST,
+            code=APICode.VALIDATION,
+            message=f"Unsupported period '{request.period}' (use e.g. 5d, 6mo, 10y, ytd or max)"
+        )
+    if (
+        not grid
+        or len(grid) > settings.SWEEP_MAX_COMBINATIONS
+        or min(p.rsi_window for p in grid) < 2
+        or min(p.sma_window for p in grid) < 2
+        or not all(0 <= p.oversold and p.overbought <= 100 for p in grid)
+    ):
+        return make_response(
+            status=HTTPStatusCode.BAD_REQUEST,
+            code=APICode.VALIDATION,
+            message=f"Grid must have 1 to {settings.SWEEP_MAX_COMBINATIONS} combinations, windows >= 2 and levels within 0-100"
+        )
+    try:
+        job_id = uuid.uuid4().hex
+        create_sweep_job(job_id, request.model_dump(), len(grid))
+        threading.Thread(target=_run_sweep_job, args=(job_id, request, grid), daemon=True).start()
+        return make_response(
+            status=HTTPStatusCode.CREATED,
+            code=APICode.CREATED,
+            message="Parameter sweep queued",
+            data={"job_id": job_id, "total": len(grid)}
+        )
+    except Exception as e:
+        return make_response(
+            status=HTTPStatusCode.INTERNAL_SERVER_ERROR,
+            code=APICode.INTERNAL_SERVER_ERROR,
+            message="Failed to start parameter sweep",
+            error=str(e),
+            location="start_parameter_sweep"
+        )
+
+@router.get("/backtest/sweep/{job_id}")
+async def get_parameter_sweep(job_id: str):
+    """Progress of a sweep job, with its results once done."""
+    try:
+        job = get_sweep_job(job_id)
+        if job is None:
+            return make_response(
+                status=HTTPStatusCode.NOT_FOUND,
+                code=APICode.DATA_NOT_FOUND,
+                message=f"No sweep job {job_id}"
+            )
+        job["progress"] = round(job["done"] / job["total"], 4) if job["total"] else 1.0
+        return make_response(
+            status=HTTPStatusCode.OK,
+            code=APICode.OK,
+            message=f"Sweep job is {job['status']}",
+            data=job
+        )
+    except Exception as e:
+        return make_response(
+            status=HTTPStatusCode.INTERNAL_SERVER_ERROR,
+            code=APICode.INTERNAL_SERVER_ERROR,
+            message="Failed to fetch sweep job",
+            error=str(e),
+            location="get_parameter_sweep"
+        )
+
+# Predefined scan list (Top liquid stocks)
+SIGNAL_SCAN_LIST = ["RELIANCE.NS", "TCS.NS", "INFY.NS", "HDFCBANK.NS", "ICICIBANK.NS", "SBIN.NS", "BHARTIARTL.NS", "ITC.NS", "LICI.NS", "HINDUNILVR.NS"]
+
+def scan_signals() -> List[dict]:
+    results = []
+    unavailable = None
+    # Batch fetching would be better, but loop is okay for 10 items
+    for ticker in SIGNAL_SCAN_LIST:
+        try:
+            stock = yf.Ticker(ticker)
+            history = upstreams.yfinance.call(stock.history, period="6mo")
+            if history.empty: continue
+
+            closes = history['Close']
+            current_rsi = rsi_series(closes, settings.SIGNAL_RSI_WINDOW).iloc[-1]
+            sma = closes.rolling(window=settings.SIGNAL_SMA_WINDOW).mean().iloc[-1]
+            current_price = closes.iloc[-1]
+
+            signal = technical_signal(
+                current_rsi, current_price, sma,
+                settings.SIGNAL_RSI_OVERSOLD, settings.SIGNAL_RSI_OVERBOUGHT
+            )
+
+            results.append({
+                "ticker": ticker,
+                "signal": signal,
+                "rsi": round(current_rsi, 2),
+                "price": round(current_price, 2)
+            })
+        except UpstreamUnavailable as e:
+            unavailable = e
+        except:
+            continue
+    if not results and unavailable is not None:
+        raise unavailable
+    return results
+
 @router.get("/ai/signals")
 async def get_ai_signals():
     """
     Scan market for Buy/Sell signals based on Technicals.
     """
     try:
-        # Predefined scan list (Top liquid stocks)
-        scan_list = ["RELIANCE.NS", "TCS.NS", "INFY.NS", "HDFCBANK.NS", "ICICIBANK.NS", "SBIN.NS", "BHARTIARTL.NS", "ITC.NS", "LICI.NS", "HINDUNILVR.NS"]
-        results = []
-        
-        # Batch fetching would be better, but loop is okay for 10 items
-        for ticker in scan_list:
-            try:
-                stock = yf.Ticker(ticker)
-                history = stock.history(period="6mo")
-                if history.empty: continue
-
-                closes = history['Close']
-                delta = closes.diff()
-                gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
-                loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
-                rs = gain / loss
-                rsi = 100 - (100 / (1 + rs))
-                current_rsi = rsi.iloc[-1]
-                
-                sma_50 = closes.rolling(window=50).mean().iloc[-1]
-                current_price = closes.iloc[-1]
-                
-                signal = "HOLD"
-                signal_score = 0
-                
-                if current_rsi < 30: signal_score += 1
-                elif current_rsi > 70: signal_score -= 1
-                
-                if current_price > sma_50: signal_score += 1
-                else: signal_score -= 1
-                
-                if signal_score >= 1: signal = "BUY"
-                elif signal_score <= -1: signal = "SELL"
-                
-                results.append({
-                    "ticker": ticker,
-                    "signal": signal,
-                    "rsi": round(current_rsi, 2),
-                    "price": round(current_price, 2)
-                })
-            except:
-                continue
-                
+        # An empty scan means upstream failed across the board; don't keep it
+        cached = await signals_cache.get(
+            "scan", lambda: asyncio.to_thread(scan_signals), cacheable=bool
+        )
         return make_response(
             status=HTTPStatusCode.OK,
             code=APICode.OK,
             message="AI signals generated successfully",
-            data=results
+            data=cached.value,
+            headers=cached.headers()
         )
+    except UpstreamUnavailable as e:
+        return upstream_unavailable_response(e, "get_ai_signals")
     except Exception as e:
          logger.error(f"AI Signal error: {e}")
          return make_response(
@@ -394,32 +670,91 @@ async def get_ai_signals():
             location="get_ai_signals"
         )
 
+async def intraday_history(ticker: str, interval: str, period: str) -> pd.DataFrame:
+    """
+    Intraday bars for `period` (1d or 5d, anything else means 1d). Served from the
+    live candle ring when it covers the period; otherwise upstream bars are fetched
+    and the live bars replace the tail they overlap.
+    """
+    period = period if period in INTRADAY_PERIOD_SESSIONS else "1d"
+    live = candles.history(ticker, interval)
+    window = session_window(live, INTRADAY_PERIOD_SESSIONS[period])
+    if window is not None:
+        return window
+    try:
+        upstream = await upstreams.yfinance.acall(yf.Ticker(ticker).history, period=period, interval=interval)
+    except Exception as e:
+        if live.empty:
+            raise
+        logger.warning(f"Intraday history for {ticker} limited to live bars: {e}")
+        return live
+    return merge_intraday(upstream, live)
+
 @router.get("/{ticker}/history")
-async def get_stock_history(ticker: str, period: str = "1mo"):
+async def get_stock_history(
+    ticker: str,
+    period: str = "1mo",
+    format: str = "json",
+    interval: Optional[str] = None,
+    points: Optional[int] = None,
+    method: str = "lttb"
+):
     """
     Fetch historical data for charts.
+    format: json (row objects), columnar (parallel t/o/h/l/c/v arrays) or binary (packed arrays).
+    interval: resample to calendar bars (1wk, 1mo, 3mo), or intraday bars (1m, 5m, 15m)
+    served from the live stream when the ticker is being streamed.
+    points: cap the number of bars, downsampled with lttb or ohlc buckets.
     """
+    if format not in HISTORY_FORMATS:
+        return make_response(
+            status=HTTPStatusCode.BAD_REQUEST,
+            code=APICode.VALIDATION,
+            message=f"Unsupported format '{format}', expected one of {', '.join(HISTORY_FORMATS)}"
+        )
+    if interval is not None and interval not in RESAMPLE_RULES and interval not in INTRADAY_INTERVALS:
+        return make_response(
+            status=HTTPStatusCode.BAD_REQUEST,
+            code=APICode.VALIDATION,
+            message=f"Unsupported interval '{interval}', expected one of {', '.join([*RESAMPLE_RULES, *INTRADAY_INTERVALS])}"
+        )
+    if method not in DOWNSAMPLE_METHODS or (points is not None and points < 3):
+        return make_response(
+            status=HTTPStatusCode.BAD_REQUEST,
+            code=APICode.VALIDATION,
+            message=f"points must be >= 3 and method one of {', '.join(DOWNSAMPLE_METHODS)}"
+        )
     try:
-        stock = yf.Ticker(ticker)
-        # valid periods: 1d,5d,1mo,3mo,6mo,1y,2y,5y,10y,ytd,max
-        history = stock.history(period=period)
-        
-        data = []
-        for index, row in history.iterrows():
-            data.append({
-                "date": index.strftime('%Y-%m-%d'),
-                "open": round(row['Open'], 2),
-                "high": round(row['High'], 2),
-                "low": round(row['Low'], 2),
-                "close": round(row['Close'], 2),
-                "volume": int(row['Volume'])
-            })
+        intraday = interval in INTRADAY_INTERVALS
+        if intraday:
+            history = await intraday_history(ticker, interval, period)
+            history = downsample_history(history, points=points, method=method)
+        else:
+            stock = yf.Ticker(ticker)
+            # valid periods: 1d,5d,1mo,3mo,6mo,1y,2y,5y,10y,ytd,max
+            history = await upstreams.yfinance.acall(stock.history, period=period)
+            history = downsample_history(history, points=points, interval=interval, method=method)
+
+        if format == "binary":
+            payload = history_to_packed(history)
+            return Response(
+                content=payload,
+                media_type="application/octet-stream",
+                headers={"X-Row-Count": str(len(history)), "ETag": etag_for(payload)}
+            )
+
+        if format == "columnar":
+            data = history_to_columns(history)
+        else:
+            data = history_to_records(history, date_format='%Y-%m-%dT%H:%M:%S%z' if intraday else '%Y-%m-%d')
         return make_response(
             status=HTTPStatusCode.OK,
             code=APICode.OK,
             message=f"History for {ticker} fetched successfully",
             data=data
         )
+    except UpstreamUnavailable as e:
+        return upstream_unavailable_response(e, "get_stock_history")
     except Exception as e:
         return make_response(
             status=HTTPStatusCode.INTERNAL_SERVER_ERROR,
@@ -429,205 +764,58 @@ async def get_stock_history(ticker: str, period: str = "1mo"):
             location="get_stock_history"
         )
 
+def analysis_is_degraded(result: dict) -> bool:
+    """Analyses where the LLM stage did not answer are cached briefly, then retried."""
+    return result["timings"].get("llm", {}).get("status") != "ok"
+
+async def cached_analysis(ticker: str, history: Optional[Callable[[], Awaitable]] = None) -> CacheResult:
+    """Analysis through analysis_cache, shared by the single-ticker and batch routes."""
+    return await analysis_cache.get(
+        ticker, lambda: analyze_ticker(ticker, history=history() if history is not None else None),
+        cacheable=lambda result: result is not None, degraded=analysis_is_degraded
+    )
+
 @router.get("/{ticker}/analysis")
 async def get_stock_analysis(ticker: str):
     """
-    Perform AI Analysis (RSI, SMA, Signal) using OpenAI.
+    AI Analysis (RSI, SMA, Signal, news-aware LLM reasoning) within a fixed deadline.
     """
+    ticker = ticker.strip().upper()
     logger.info(f"Analyzing ticker: {ticker}")
     try:
-        stock = yf.Ticker(ticker)
-        # Fetch enough data for calculations (at least 50 days for SMA50)
-        history = stock.history(period="6mo")
-        
-        if history.empty:
-             logger.warning(f"No history found for {ticker}")
-             return make_response(
+        cached = await cached_analysis(ticker)
+        result = cached.value
+        if result is None:
+            logger.warning(f"No history found for {ticker}")
+            return make_response(
                 status=HTTPStatusCode.NOT_FOUND,
                 code=APICode.DATA_NOT_FOUND,
                 message=f"No data found for symbol {ticker}"
-             )
-
-        closes = history['Close']
-        
-        # Calculate RSI (14)
-        delta = closes.diff()
-        gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
-        rs = gain / loss
-        rsi = 100 - (100 / (1 + rs))
-        current_rsi = rsi.iloc[-1]
-        
-        # Calculate SMA (Simple Moving Average)
-        sma_50 = closes.rolling(window=50).mean().iloc[-1]
-        current_price = closes.iloc[-1]
-
-        # Calculate Technical Signal
-        signal_score = 0
-        technical_signal = "HOLD"
-        
-        if current_rsi < 30: signal_score += 1
-        elif current_rsi > 70: signal_score -= 1
-        
-        if current_price > sma_50: signal_score += 1
-        else: signal_score -= 1
-        
-        if signal_score >= 1: technical_signal = "BUY"
-        elif signal_score <= -1: technical_signal = "SELL"
-        
-        logger.info(f"Technicals calculated: Price={current_price}, RSI={current_rsi}, SMA={sma_50}, Tech Signal={technical_signal}")
-
-        # Fetch News for Context
-        news_summary = ""
-        try:
-            from Controller.NewsFetchController import fetch_google_news
-            # Clean ticker for better news search (e.g., RELIANCE.NS -> RELIANCE)
-            clean_ticker = ticker.split('.')[0]
-            query = f"{clean_ticker} share price news"
-            news_items = fetch_google_news(query)
-            
-            for item in news_items[:3]:
-                news_summary += f"- {item['title']} ({item['source']})\n"
-            logger.info(f"News fetched successfully for {clean_ticker}")
-        except Exception as e:
-            logger.error(f"News fetch failed: {e}")
-            news_summary = "No recent news available."
-
-        # Hugging Face Analysis
-        try:
-            hf_token = settings.HF_TOKEN
-            if not hf_token:
-                logger.error("HF_TOKEN key missing")
-                raise ValueError("Missing HF Token")
-
-            from huggingface_hub import InferenceClient
-            client = InferenceClient(api_key=hf_token)
-
-            # System prompt to enforce persona and JSON format
-            system_prompt = """
-                You are a Senior Financial Markets Analyst AI specializing in technical and sentiment-based stock evaluation.
-
-                Your objective:
-                Analyze structured stock data and return a trading decision.
-
-                CRITICAL OUTPUT RULES:
-                - Output MUST be strictly valid JSON.
-                - Do NOT include markdown, backticks, commentary, or explanations outside JSON.
-                - Do NOT add extra fields.
-                - Do NOT change field names.
-                - Response must be a single JSON object.
-
-                Required JSON Schema:
-                {
-                    "signal": "BUY" | "SELL" | "HOLD",
-                    "reasoning": ["reason 1", "reason 2", "reason 3", "reason 4", "reason 5"],
-                    "sentiment_score": integer (0-100)
-                }
-
-                Decision Rules:
-                - Heavily prioritize the provided Technical Indicator Signal.
-                - Only override it if news sentiment is strongly contradictory.
-                - reasoning must contain EXACTLY 5 concise, professional statements.
-                - sentiment_score:
-                    0–40  = Bearish
-                    41–60 = Neutral
-                    61–100 = Bullish
-                """
-
-
-            user_prompt = f"""
-                Stock: {ticker}
-
-                Technical Data:
-                - Current Price: {round(current_price, 2)}
-                - RSI (14): {round(current_rsi, 2)}
-                - SMA (50): {round(sma_50, 2)}
-                - Precomputed Technical Signal: {technical_signal}
-
-                News Summary:
-                {news_summary}
-
-                Analysis Instructions:
-                1. Base your primary decision on the Precomputed Technical Signal.
-                2. Adjust only if news sentiment strongly conflicts.
-                3. Provide EXACTLY 5 concise reasons.
-                4. Assign a sentiment score between 0 and 100.
-                5. Return strictly valid JSON.
-                """
-            
-            logger.info("Sending request to Hugging Face (mistralai/Mistral-7B-Instruct-v0.2)")
-            
-            messages = [
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt}
-            ]
-            
-            response = client.chat_completion(
-                model="mistralai/Mistral-7B-Instruct-v0.2",
-                messages=messages,
-                max_tokens=500,
-                temperature=0.7
             )
-            
-            content_str = response.choices[0].message.content
-            
-            # Clean possible markdown code blocks if the model ignores instruction
-            if "```json" in content_str:
-                content_str = content_str.split("```json")[1].split("```")[0].strip()
-            elif "```" in content_str:
-                content_str = content_str.split("```")[1].strip()
-                
-            import json
-            ai_content = json.loads(content_str)
-            
-            signal = ai_content.get("signal", technical_signal) # Fallback to technical signal
-            reasoning = ai_content.get("reasoning", ["AI analysis unavailable."])
-            sentiment_score = ai_content.get("sentiment_score", 50) 
-            logger.info("Hugging Face analysis complete")
-
-        except Exception as e:
-            logger.error(f"Hugging Face Analysis failed: {e}")
-            # Fallback Logic
-            signal = technical_signal
-            reasoning = ["AI connection failed, using fallback technicals."]
-            if technical_signal == "BUY":
-                reasoning.append("Technical indicators suggest upside momentum.")
-            elif technical_signal == "SELL":
-                reasoning.append("Technical indicators suggest downside risk.")
-            else:
-                reasoning.append("Market conditions encompass mixed signals.")
-            
-
-        # Fetch Fundamental Data
-        try:
-            info = stock.info
-            fundamentals = {
-                "market_cap": info.get("marketCap", "N/A"),
-                "pe_ratio": info.get("trailingPE", "N/A"),
-                "fifty_two_week_high": info.get("fiftyTwoWeekHigh", "N/A"),
-                "fifty_two_week_low": info.get("fiftyTwoWeekLow", "N/A"),
-                "sector": info.get("sector", "N/A"),
-                "industry": info.get("industry", "N/A"),
-            }
-        except Exception as e:
-            logger.error(f"Fundamentals fetch failed: {e}")
-            fundamentals = {}
+        logger.info(f"Analysis timings for {ticker}: {result['timings']}")
 
         return make_response(
             status=HTTPStatusCode.OK,
             code=APICode.OK,
             message=f"Analysis for {ticker} completed",
-            data={
-                "ticker": ticker,
-                "signal": signal,
-                "rsi": round(current_rsi, 2),
-                "sma_50": round(sma_50, 2),
-                "current_price": round(current_price, 2),
-                "reasoning": reasoning,
-                "fundamentals": fundamentals
-            }
+            data=result,
+            headers=(
+                {**cached.headers(), "Cache-Control": f"public, max-age={int(settings.ANALYSIS_DEGRADED_TTL_SECONDS)}"}
+                if analysis_is_degraded(result) else cached.headers()
+            )
+        )
+
+    except UpstreamUnavailable as e:
+        return upstream_unavailable_response(e, "get_stock_analysis")
+    except AnalysisTimeout as e:
+        logger.error(f"Analysis deadline exceeded: {e}")
+        return make_response(
+            status=HTTPStatusCode.GATEWAY_TIMEOUT,
+            code=APICode.TIMEOUT,
+            message="Price history did not arrive in time",
+            error=str(e),
+            location="get_stock_analysis"
         )
-        
     except Exception as e:
         logger.error(f"General error in analysis: {e}")
         return make_response(
@@ -636,4 +824,39 @@ async def get_stock_analysis(ticker: str):
             message="Stock analysis failed",
             error=str(e),
             location="get_stock_analysis"
-        )
\ No newline at end of file
+        )
+
+
+@router.post("/analysis/batch")
+async def analyze_stock_batch(request: AnalysisBatchRequest):
+    """
+    Analysis for many tickers, streamed as newline-delimited JSON: one
+    {ticker, status, data, error} line per ticker, in completion order.
+    Reads and fills the same cache as /{ticker}/analysis.
+    """
+    tickers = list(dict.fromkeys(t.strip().upper() for t in request.tickers if t.strip()))
+    if not tickers:
+        return make_response(
+            status=HTTPStatusCode.BAD_REQUEST,
+            code=APICode.VALIDATION,
+            message="At least one ticker is required",
+            location="analyze_stock_batch"
+        )
+    if len(tickers) > settings.ANALYSIS_BATCH_MAX_TICKERS:
+        return make_response(
+            status=HTTPStatusCode.BAD_REQUEST,
+            code=APICode.VALIDATION,
+            message=f"At most {settings.ANALYSIS_BATCH_MAX_TICKERS} tickers per batch",
+            location="analyze_stock_batch"
+        )
+    logger.info(f"Batch analysis for {len(tickers)} tickers")
+
+    async def analyze(ticker: str, history: Callable[[], Awaitable]) -> Optional[dict]:
+        return (await cached_analysis(ticker, history)).value
+
+    async def lines():
+        async for outcome in analyze_batch(tickers, analyze=analyze):
+            yield dumps(outcome) + b"\n"
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
@@ -0,0 +1,66 @@
+import time
+from typing import Iterable, List, Optional, Tuple
+from Database.DatabaseConnection import get_db_connection
+
+ALERT_COLUMNS = "id, ticker, metric, direction, threshold, active, created_at, triggered_at, triggered_value"
+
+
+def create_alert(ticker: str, metric: str, direction: str, threshold: float) -> dict:
+    now = time.time()
+    with get_db_connection() as conn:
+        cursor = conn.execute(
+            "INSERT INTO alerts (ticker, metric, direction, threshold, updated_at) VALUES (?, ?, ?, ?, ?)",
+            (ticker, metric, direction, threshold, now)
+        )
+        conn.commit()
+        row = conn.execute(f"SELECT {ALERT_COLUMNS} FROM alerts WHERE id = ?", (cursor.lastrowid,)).fetchone()
+    return dict(row)
+
+
+def list_alerts(ticker: Optional[str] = None, active_only: bool = False) -> List[dict]:
+    query = f"SELECT {ALERT_COLUMNS} FROM alerts WHERE 1 = 1"
+    params: list = []
+    if ticker:
+        query += " AND ticker = ?"
+        params.append(ticker)
+    if active_only:
+        query += " AND active = 1"
+    with get_db_connection() as conn:
+        return [dict(row) for row in conn.execute(query + " ORDER BY id", params)]
+
+
+def deactivate_alert(alert_id: int) -> bool:
+    """Soft delete, so workers syncing by updated_at see the removal."""
+    with get_db_connection() as conn:
+        cursor = conn.execute(
+            "UPDATE alerts SET active = 0, updated_at = ? WHERE id = ? AND active = 1",
+            (time.time(), alert_id)
+        )
+        conn.commit()
+        return cursor.rowcount > 0
+
+
+def mark_triggered(fired: Iterable[Tuple[int, float, float]]):
+    """Record (id, value, ts) for fired one-shot alerts; the first worker to fire wins."""
+    rows = [(ts, value, ts, alert_id) for alert_id, value, ts in fired]
+    if not rows:
+        return
+    with get_db_connection() as conn:
+        conn.executemany(
+            """
+            UPDATE alerts SET active = 0, triggered_at = ?, triggered_value = ?, updated_at = ?
+            WHERE id = ? AND active = 1
+            """,
+            rows
+        )
+        conn.commit()
+
+
+def get_alert_changes(since: float) -> List[dict]:
+    """Rows created, fired or deleted after `since` (updated_at is a wall-clock timestamp)."""
+    with get_db_connection() as conn:
+        rows = conn.execute(
+            "SELECT id, ticker, metric, direction, threshold, active, updated_at FROM alerts WHERE updated_at > ?",
+            (since,)
+        ).fetchall()
+    return [dict(row) for row in rows]
@@ -46,6 +46,14 @@ def init_db():
                 print(f"Database initialization failed: {e}")
     else:
         print(f"Database {settings.DB_FILE} already exists.")
+        # Schema is idempotent (IF NOT EXISTS), so apply it to pick up new tables
+        with get_db_connection() as conn:
+            try:
+                with open(SCHEMA_FILE, 'r') as f:
+                    conn.executescript(f.read())
+                conn.commit()
+            except Exception as e:
+                print(f"Schema migration failed: {e}")
 
 if __name__ == "__main__":
     init_db()
\ No newline at end of file
@@ -0,0 +1,76 @@
+from typing import Iterable, List, Optional
+from Database.DatabaseConnection import get_db_connection
+
+FUNDAMENTAL_FIELDS = ("market_cap", "pe_ratio", "fifty_two_week_high", "fifty_two_week_low", "sector", "industry")
+
+
+def upsert_fundamentals(rows: Iterable[dict]):
+    """Rows carry `ticker`, `updated_at` and the FUNDAMENTAL_FIELDS; one batched upsert."""
+    values = [(r["ticker"], *(r.get(f) for f in FUNDAMENTAL_FIELDS), r["updated_at"]) for r in rows]
+    if not values:
+        return
+    columns = ", ".join(FUNDAMENTAL_FIELDS)
+    updates = ", ".join(f"{f} = excluded.{f}" for f in FUNDAMENTAL_FIELDS)
+    with get_db_connection() as conn:
+        conn.executemany(
+            f"""
+            INSERT INTO fundamentals (ticker, {columns}, updated_at)
+            VALUES (?, {", ".join("?" for _ in FUNDAMENTAL_FIELDS)}, ?)
+            ON CONFLICT(ticker) DO UPDATE SET {updates}, updated_at = excluded.updated_at
+            """,
+            values
+        )
+        conn.commit()
+
+
+def delete_fundamentals(tickers: Iterable[str]):
+    with get_db_connection() as conn:
+        conn.executemany("DELETE FROM fundamentals WHERE ticker = ?", [(t,) for t in tickers])
+        conn.commit()
+
+
+def get_fundamentals(ticker: str) -> Optional[dict]:
+    with get_db_connection() as conn:
+        row = conn.execute("SELECT * FROM fundamentals WHERE ticker = ?", (ticker,)).fetchone()
+    return dict(row) if row else None
+
+
+def get_fundamentals_due(max_age_seconds: float, now: float, limit: int) -> List[str]:
+    """
+    Tickers the app knows about (watchlist, streamed quotes, previously analysed)
+    whose fundamentals are missing or older than `max_age_seconds`, oldest first.
+    Indices (^...) have no fundamentals and are skipped.
+    """
+    with get_db_connection() as conn:
+        rows = conn.execute(
+            """
+            SELECT u.ticker
+            FROM (
+                SELECT ticker FROM watchlist
+                UNION SELECT ticker FROM quotes_latest
+                UNION SELECT ticker FROM fundamentals
+            ) u
+            LEFT JOIN fundamentals f ON f.ticker = u.ticker
+            WHERE u.ticker NOT LIKE '^%' AND (f.updated_at IS NULL OR f.updated_at < ?)
+            ORDER BY f.updated_at IS NOT NULL, f.updated_at
+            LIMIT ?
+            """,
+            (now - max_age_seconds, limit)
+        ).fetchall()
+    return [row["ticker"] for row in rows]
+
+
+def get_sector_changes() -> List[dict]:
+    """Average day change per sector over every ticker with both a sector and a stored quote."""
+    with get_db_connection() as conn:
+        rows = conn.execute(
+            """
+            SELECT f.sector AS name, AVG(q.change_pct) AS change, COUNT(*) AS constituents
+            FROM fundamentals f
+            JOIN quotes_latest q ON q.ticker = f.ticker
+            WHERE f.sector IS NOT NULL AND f.sector != ''
+            GROUP BY f.sector
+            ORDER BY change DESC
+            """
+        ).fetchall()
+    return [dict(row) for row in rows]
@@ -0,0 +1,49 @@
+from typing import Iterable, List
+from Database.DatabaseConnection import get_db_connection
+
+
+def upsert_latest_quotes(quotes: Iterable[dict]):
+    """
+    Persist the latest quote per ticker in a single batched upsert.
+    Called once per price stream cycle.
+    """
+    rows = [
+        (q["ticker"], q["price"], q["prev_close"], q["change_pct"], q["ts"])
+        for q in quotes
+    ]
+    if not rows:
+        return
+    with get_db_connection() as conn:
+        conn.executemany(
+            """
+            INSERT INTO quotes_latest (ticker, price, prev_close, change_pct, updated_at)
+            VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT(ticker) DO UPDATE SET
+                price = excluded.price,
+                prev_close = excluded.prev_close,
+                change_pct = excluded.change_pct,
+                updated_at = excluded.updated_at
+            """,
+            rows
+        )
+        conn.commit()
+
+
+def get_watchlist_tickers() -> List[str]:
+    """Tickers the stream must keep fresh even when no socket is connected."""
+    with get_db_connection() as conn:
+        return [row["ticker"] for row in conn.execute("SELECT ticker FROM watchlist")]
+
+
+def get_watchlist_quotes() -> List[dict]:
+    """Watchlist rows joined against the materialized last-quote table."""
+    with get_db_connection() as conn:
+        rows = conn.execute(
+            """
+            SELECT w.id, w.ticker, q.price, q.change_pct, q.updated_at
+            FROM watchlist w
+            LEFT JOIN quotes_latest q ON q.ticker = w.ticker
+            ORDER BY w.id
+            """
+        ).fetchall()
+    return [dict(row) for row in rows]
@@ -0,0 +1,43 @@
+import json
+import time
+from typing import Optional
+from Database.DatabaseConnection import get_db_connection
+
+
+def create_sweep_job(job_id: str, request: dict, total: int):
+    now = time.time()
+    with get_db_connection() as conn:
+        conn.execute(
+            "INSERT INTO sweep_jobs (id, status, total, request, created_at, updated_at) VALUES (?, 'queued', ?, ?, ?, ?)",
+            (job_id, total, json.dumps(request), now, now)
+        )
+        conn.commit()
+
+
+def update_sweep_job(job_id: str, status: Optional[str] = None, done: Optional[int] = None,
+                     result: Optional[dict] = None, error: Optional[str] = None):
+    """Set whichever fields are given; kept in SQLite so any worker can report progress."""
+    fields = {"updated_at": time.time()}
+    if status is not None:
+        fields["status"] = status
+    if done is not None:
+        fields["done"] = done
+    if result is not None:
+        fields["result"] = json.dumps(result)
+    if error is not None:
+        fields["error"] = error
+    assignments = ", ".join(f"{name} = ?" for name in fields)
+    with get_db_connection() as conn:
+        conn.execute(f"UPDATE sweep_jobs SET {assignments} WHERE id = ?", (*fields.values(), job_id))
+        conn.commit()
+
+
+def get_sweep_job(job_id: str) -> Optional[dict]:
+    with get_db_connection() as conn:
+        row = conn.execute("SELECT * FROM sweep_jobs WHERE id = ?", (job_id,)).fetchone()
+    if row is None:
+        return None
+    job = dict(row)
+    job["request"] = json.loads(job["request"])
+    job["result"] = json.loads(job["result"]) if job["result"] else None
+    return job
@@ -3,3 +3,49 @@ CREATE TABLE IF NOT EXISTS watchlist (
     ticker TEXT NOT NULL UNIQUE,
     added_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
+
+CREATE TABLE IF NOT EXISTS quotes_latest (
+    ticker TEXT PRIMARY KEY,
+    price REAL NOT NULL,
+    prev_close REAL,
+    change_pct REAL NOT NULL DEFAULT 0,
+    updated_at REAL NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS alerts (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    ticker TEXT NOT NULL,
+    metric TEXT NOT NULL DEFAULT 'price',     -- price | rsi
+    direction TEXT NOT NULL,                  -- above | below
+    threshold REAL NOT NULL,
+    active INTEGER NOT NULL DEFAULT 1,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    triggered_at REAL,
+    triggered_value REAL,
+    updated_at REAL NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_alerts_updated_at ON alerts (updated_at);
+
+CREATE TABLE IF NOT EXISTS sweep_jobs (
+    id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,                     -- queued | running | done | failed
+    total INTEGER NOT NULL,
+    done INTEGER NOT NULL DEFAULT 0,
+    request TEXT NOT NULL,                    -- JSON
+    result TEXT,                              -- JSON
+    error TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS fundamentals (
+    ticker TEXT PRIMARY KEY,
+    market_cap REAL,
+    pe_ratio REAL,
+    fifty_two_week_high REAL,
+    fifty_two_week_low REAL,
+    sector TEXT,
+    industry TEXT,
+    updated_at REAL NOT NULL
+);
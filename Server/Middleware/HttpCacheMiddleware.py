@@ -0,0 +1,145 @@
+import gzip
+import re
+from typing import Optional
+from fastapi import Request
+from fastapi.responses import Response
+from Config.SystemConfig import get_settings
+from Services.Market.CandleAggregator import INTRADAY_INTERVALS
+
+try:
+    import brotli
+except ImportError:  # brotli is optional, gzip is always available
+    brotli = None
+
+settings = get_settings()
+
+# Freshness per route: live quotes expire in seconds, daily bars and news in minutes.
+# First match wins; routes not listed get no Cache-Control header.
+CACHE_RULES = [
+    (re.compile(r"^/api/stock/market/summary$"), "public, max-age=5"),
+    (re.compile(r"^/api/stock/market/analysis$"), "public, max-age=60"),
+    (re.compile(r"^/api/stock/watchlist"), "no-cache"),
+    (re.compile(r"^/api/stock/ai/signals$"), "public, max-age=300"),
+    (re.compile(r"^/api/stock/[^/]+/history$"), "public, max-age=300"),
+    (re.compile(r"^/api/stock/[^/]+/analysis$"), "public, max-age=300"),
+    (re.compile(r"^/api/news/"), "public, max-age=300"),
+]
+
+# History for intraday periods still contains a live bar
+INTRADAY_PERIODS = {"1d", "5d"}
+INTRADAY_CACHE_CONTROL = "public, max-age=30"
+
+COMPRESSIBLE_TYPES = ("application/json", "application/octet-stream", "text/")
+
+
+def cache_control_for(request: Request) -> Optional[str]:
+    path = request.url.path
+    for pattern, value in CACHE_RULES:
+        if pattern.match(path):
+            if path.endswith("/history") and (
+                request.query_params.get("period") in INTRADAY_PERIODS
+                or request.query_params.get("interval") in INTRADAY_INTERVALS
+            ):
+                return INTRADAY_CACHE_CONTROL
+            return value
+    return None
+
+
+def _opaque_tag(tag: str) -> str:
+    """Strip weak prefix and the content-coding suffix we add to compressed variants."""
+    tag = tag.strip()
+    if tag.startswith("W/"):
+        tag = tag[2:]
+    for suffix in ("-gzip\"", "-br\""):
+        if tag.endswith(suffix):
+            return tag[:-len(suffix)] + "\""
+    return tag
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    target = _opaque_tag(etag)
+    return any(_opaque_tag(tag) == target for tag in if_none_match.split(","))
+
+
+def negotiate_encoding(accept_encoding: str) -> Optional[str]:
+    """Pick br or gzip from Accept-Encoding, honouring q=0 exclusions."""
+    accepted = {}
+    for part in accept_encoding.lower().split(","):
+        name, _, params = part.strip().partition(";")
+        q = 1.0
+        if params.strip().startswith("q="):
+            try:
+                q = float(params.strip()[2:])
+            except ValueError:
+                q = 0.0
+        if name:
+            accepted[name] = q
+    if brotli is not None and accepted.get("br", 0) > 0:
+        return "br"
+    if accepted.get("gzip", 0) > 0:
+        return "gzip"
+    return None
+
+
+def _compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=5)
+    return gzip.compress(body, compresslevel=6)
+
+
+def _vary_on_encoding(headers: dict) -> dict:
+    vary = headers.get("vary")
+    if not vary:
+        headers["vary"] = "Accept-Encoding"
+    elif "accept-encoding" not in vary.lower():
+        headers["vary"] = f"{vary}, Accept-Encoding"
+    return headers
+
+
+async def http_cache_middleware(request: Request, call_next):
+    """
+    Conditional GETs, Cache-Control and response compression.
+    ETags are emitted by make_response over the data payload (weak) or by the
+    binary history route over the whole body (strong), so a matching
+    If-None-Match short-circuits to 304 without sending the body.
+    """
+    response = await call_next(request)
+    if request.method not in ("GET", "HEAD") or response.status_code != 200:
+        return response
+
+    cache_control = cache_control_for(request)
+    if cache_control and "cache-control" not in response.headers:
+        response.headers["Cache-Control"] = cache_control
+
+    etag = response.headers.get("etag")
+    if etag and etag_matches(request.headers.get("if-none-match"), etag):
+        # Keep CORS/Vary/Cache-Control headers, drop the ones describing the body
+        headers = {
+            k: v for k, v in response.headers.items()
+            if k not in ("content-length", "content-type", "content-encoding")
+        }
+        return Response(status_code=304, headers=_vary_on_encoding(headers))
+
+    content_type = response.headers.get("content-type", "")
+    if not content_type.startswith(COMPRESSIBLE_TYPES) or "content-encoding" in response.headers:
+        return response
+    encoding = negotiate_encoding(request.headers.get("accept-encoding", ""))
+    if encoding is None:
+        return response
+
+    body = b"".join([chunk async for chunk in response.body_iterator])
+    headers = dict(response.headers)
+    if len(body) >= settings.COMPRESSION_MIN_BYTES:
+        body = _compress(body, encoding)
+        headers["content-encoding"] = encoding
+        headers["content-length"] = str(len(body))
+        _vary_on_encoding(headers)
+        if etag:
+            # Tags must differ per representation (strong ones by definition);
+            # etag_matches strips the suffix again for If-None-Match
+            headers["etag"] = f'{etag[:-1]}-{encoding}"'
+    return Response(content=body, status_code=response.status_code, headers=headers)
@@ -0,0 +1,165 @@
+import asyncio
+import math
+import re
+import time
+from collections import OrderedDict
+from typing import Callable, Optional
+from Config.SystemConfig import get_settings
+from Utils.ResponseHelper import make_response
+from Utils.ResponseHelperModels import HTTPStatusCode, APICode
+from Utils.Resilience import TokenBucket
+
+settings = get_settings()
+
+# Routes that cost LLM quota, upstream scans or heavy compute; everything else under /api is a cheap read.
+# GET /backtest/sweep/{job_id} only polls a stored job and /market/analysis is the
+# SWR-cached dashboard, so both stay cheap.
+EXPENSIVE_ROUTES = [
+    re.compile(r"^/api/stock/(?!market/)[^/]+/analysis$"),
+    re.compile(r"^/api/stock/analysis/batch$"),
+    re.compile(r"^/api/stock/ai/signals$"),
+    re.compile(r"^/api/stock/backtest(/sweep)?$"),
+    re.compile(r"^/api/stock/risk/calculate$"),
+    re.compile(r"^/api/chat"),
+]
+READ, EXPENSIVE = "read", "expensive"
+
+
+def route_class(path: str) -> Optional[str]:
+    """Limit class for a path; None for routes that are not limited (root, docs)."""
+    if not path.startswith("/api/"):
+        return None
+    return EXPENSIVE if any(p.match(path) for p in EXPENSIVE_ROUTES) else READ
+
+
+class ClientBuckets:
+    """
+    One token bucket per client, kept only while the client is active: a bucket
+    that has refilled completely is indistinguishable from a new one, so it is
+    dropped. Least recently used clients beyond `max_clients` are evicted too.
+    """
+    def __init__(self, per_minute: float, burst: int, max_clients: int,
+                 clock: Callable[[], float] = time.monotonic):
+        self.rate = per_minute / 60.0
+        self.burst = burst
+        self.max_clients = max_clients
+        self.clock = clock
+        self.idle_after = burst / self.rate
+        self.buckets: "OrderedDict[str, TokenBucket]" = OrderedDict()
+
+    def take(self, client: str) -> float:
+        """0 if the request may proceed, otherwise seconds until the client has a token."""
+        self._evict()
+        bucket = self.buckets.get(client)
+        if bucket is None:
+            bucket = self.buckets[client] = TokenBucket(self.rate, self.burst, clock=self.clock)
+        else:
+            self.buckets.move_to_end(client)
+        wait = bucket.reserve()
+        if wait:
+            bucket.refund()
+        return wait
+
+    def _evict(self):
+        now = self.clock()
+        while self.buckets:
+            client, bucket = next(iter(self.buckets.items()))
+            if now - bucket.updated < self.idle_after and len(self.buckets) < self.max_clients:
+                break
+            del self.buckets[client]
+
+
+class ConcurrencyGate:
+    """
+    Global cap on in-flight expensive requests. Up to `max_queue` callers wait
+    (at most `queue_timeout` seconds) for a slot; beyond that they are turned
+    away at once instead of piling up.
+    """
+    def __init__(self, limit: int, max_queue: int, queue_timeout: float):
+        self.semaphore = asyncio.Semaphore(limit)
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.waiting = 0
+
+    async def acquire(self) -> bool:
+        if self.semaphore.locked() and self.waiting >= self.max_queue:
+            return False
+        self.waiting += 1
+        try:
+            await asyncio.wait_for(self.semaphore.acquire(), self.queue_timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            self.waiting -= 1
+
+    def release(self):
+        self.semaphore.release()
+
+
+def client_id(scope) -> str:
+    if settings.RATE_LIMIT_TRUST_FORWARDED_FOR:
+        for name, value in scope.get("headers", ()):
+            if name == b"x-forwarded-for":
+                return value.decode("latin-1").split(",")[0].strip()
+    client = scope.get("client")
+    return client[0] if client else "unknown"
+
+
+def too_many_requests(message: str, retry_after: float, location: str):
+    seconds = str(max(1, math.ceil(retry_after)))
+    return make_response(
+        status=HTTPStatusCode.TOO_MANY_REQUESTS,
+        code=APICode.TOO_MANY_REQUESTS,
+        message=message,
+        error=f"Retry after {seconds}s",
+        location=location,
+        headers={"Retry-After": seconds}
+    )
+
+
+class RateLimitMiddleware:
+    """
+    Per-client token buckets per route class, plus a global concurrency cap for
+    expensive routes. Plain ASGI rather than an @app.middleware("http") function
+    so the concurrency slot is held until a streamed body (the NDJSON batch) has
+    been sent, not just until its headers are ready.
+    """
+    def __init__(self, app):
+        self.app = app
+        self.buckets = {
+            READ: ClientBuckets(
+                settings.RATE_LIMIT_READ_PER_MINUTE, settings.RATE_LIMIT_READ_BURST, settings.RATE_LIMIT_MAX_CLIENTS
+            ),
+            EXPENSIVE: ClientBuckets(
+                settings.RATE_LIMIT_EXPENSIVE_PER_MINUTE, settings.RATE_LIMIT_EXPENSIVE_BURST,
+                settings.RATE_LIMIT_MAX_CLIENTS
+            ),
+        }
+        self.gate = ConcurrencyGate(
+            settings.EXPENSIVE_MAX_CONCURRENCY, settings.EXPENSIVE_MAX_QUEUE, settings.EXPENSIVE_QUEUE_TIMEOUT_SECONDS
+        )
+
+    async def __call__(self, scope, receive, send):
+        limit = route_class(scope["path"]) if scope["type"] == "http" and settings.RATE_LIMIT_ENABLED else None
+        if limit is None or scope["method"] == "OPTIONS":
+            await self.app(scope, receive, send)
+            return
+
+        retry_after = self.buckets[limit].take(client_id(scope))
+        if retry_after:
+            response = too_many_requests("Rate limit exceeded", retry_after, f"rate_limit:{limit}")
+            await response(scope, receive, send)
+            return
+        if limit == READ:
+            await self.app(scope, receive, send)
+            return
+
+        if not await self.gate.acquire():
+            response = too_many_requests("Server busy, try again shortly", self.gate.queue_timeout, "rate_limit:concurrency")
+            await response(scope, receive, send)
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.gate.release()
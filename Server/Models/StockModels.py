@@ -1,5 +1,5 @@
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import List, Optional
 
 class TickerInput(BaseModel):
@@ -11,3 +11,34 @@ class PortfolioItem(BaseModel):
 
 class RiskAnalysisRequest(BaseModel):
     portfolio: List[PortfolioItem]
+
+class AnalysisBatchRequest(BaseModel):
+    tickers: List[str]
+
+class BacktestRequest(BaseModel):
+    tickers: List[str]
+    period: str = "10y"
+    # Unset rule parameters default to the configured SIGNAL_* settings
+    rsi_window: Optional[int] = Field(None, ge=2)
+    oversold: Optional[float] = None
+    overbought: Optional[float] = None
+    sma_window: Optional[int] = Field(None, ge=2)
+    allow_short: bool = False
+    cost_bps: float = Field(10, ge=0)
+
+class SweepRequest(BaseModel):
+    tickers: List[str]
+    period: str = "10y"
+    rsi_windows: List[int] = [7, 14, 21]
+    oversold_levels: List[float] = [20, 25, 30, 35]
+    overbought_levels: List[float] = [65, 70, 75, 80]
+    sma_windows: List[int] = [20, 50, 100, 200]
+    folds: int = Field(4, ge=0, le=10)
+    allow_short: bool = False
+    cost_bps: float = Field(10, ge=0)
+
+class AlertCreate(BaseModel):
+    ticker: str
+    metric: str = "price"       # price | rsi
+    direction: str              # above | below
+    threshold: float
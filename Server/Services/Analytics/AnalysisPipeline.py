@@ -0,0 +1,387 @@
+import asyncio
+import json
+import logging
+import time
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Optional
+import pandas as pd
+import yfinance as yf
+from Config.SystemConfig import get_settings
+from Database.FundamentalsStore import FUNDAMENTAL_FIELDS
+from Services.Analytics.Indicators import rsi_series, technical_signal
+from Services.Analytics.Sentiment import news_sentiment
+from Services.Market.FundamentalsRefresher import load_fundamentals
+from Services.Market.HistoryDataset import split_download
+import Utils.Resilience as upstreams
+from Utils.Resilience import UpstreamUnavailable
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+LLM_MODEL = "mistralai/Mistral-7B-Instruct-v0.2"
+NO_NEWS = "No recent news available."
+
+# System prompt to enforce persona and JSON format
+SYSTEM_PROMPT = """
+    You are a Senior Financial Markets Analyst AI specializing in technical and sentiment-based stock evaluation.
+
+    Your objective:
+    Analyze structured stock data and return a trading decision.
+
+    CRITICAL OUTPUT RULES:
+    - Output MUST be strictly valid JSON.
+    - Do NOT include markdown, backticks, commentary, or explanations outside JSON.
+    - Do NOT add extra fields.
+    - Do NOT change field names.
+    - Response must be a single JSON object.
+
+    Required JSON Schema:
+    {
+        "signal": "BUY" | "SELL" | "HOLD",
+        "reasoning": ["reason 1", "reason 2", "reason 3", "reason 4", "reason 5"],
+        "sentiment_score": integer (0-100)
+    }
+
+    Decision Rules:
+    - Heavily prioritize the provided Technical Indicator Signal.
+    - Only override it if news sentiment is strongly contradictory.
+    - reasoning must contain EXACTLY 5 concise, professional statements.
+    - sentiment_score:
+        0–40  = Bearish
+        41–60 = Neutral
+        61–100 = Bullish
+    """
+
+
+class AnalysisTimeout(Exception):
+    """The history stage, which every other stage depends on, missed the deadline."""
+
+
+def fetch_history(ticker: str) -> pd.DataFrame:
+    # Enough data for the SMA window
+    return upstreams.yfinance.call(yf.Ticker(ticker).history, period="6mo")
+
+
+def download_histories(tickers: List[str]) -> Dict[str, pd.DataFrame]:
+    """Six months of history for a whole batch in one upstream request."""
+    data = upstreams.yfinance.call(
+        yf.download, tickers, period="6mo", group_by="ticker", auto_adjust=True, progress=False
+    )
+    return {t: frame.dropna(subset=["Close"]) for t, frame in split_download(data, tickers).items()}
+
+
+def compute_technicals(history: pd.DataFrame) -> dict:
+    closes = history['Close']
+    current_rsi = rsi_series(closes, settings.SIGNAL_RSI_WINDOW).iloc[-1]
+    sma = closes.rolling(window=settings.SIGNAL_SMA_WINDOW).mean().iloc[-1]
+    current_price = closes.iloc[-1]
+    return {
+        "price": current_price,
+        "rsi": current_rsi,
+        "sma": sma,
+        "signal": technical_signal(
+            current_rsi, current_price, sma,
+            settings.SIGNAL_RSI_OVERSOLD, settings.SIGNAL_RSI_OVERBOUGHT
+        )
+    }
+
+
+def news_key(ticker: str) -> str:
+    # Clean ticker for better news search (e.g., RELIANCE.NS -> RELIANCE)
+    return ticker.split('.')[0]
+
+
+def fetch_news(ticker: str) -> List[dict]:
+    from Controller.NewsFetchController import fetch_google_news
+    return fetch_google_news(f"{news_key(ticker)} share price news")
+
+
+def summarize_news(news_items: List[dict]) -> str:
+    summary = "".join(f"- {item['title']} ({item['source']})\n" for item in news_items[:3])
+    return summary or NO_NEWS
+
+
+def fetch_fundamentals_view(ticker: str) -> dict:
+    stored = load_fundamentals(ticker) or {}
+    return {
+        field: stored.get(field) if stored.get(field) is not None else "N/A"
+        for field in FUNDAMENTAL_FIELDS
+    }
+
+
+def llm_analysis(ticker: str, technicals: dict, news_summary: str, sentiment: dict, timeout: float) -> dict:
+    """Hugging Face chat completion; raises on any failure so the caller can fall back."""
+    if not settings.HF_TOKEN:
+        raise ValueError("Missing HF Token")
+    from huggingface_hub import InferenceClient
+    client = InferenceClient(api_key=settings.HF_TOKEN, timeout=timeout)
+
+    user_prompt = f"""
+        Stock: {ticker}
+
+        Technical Data:
+        - Current Price: {round(technicals['price'], 2)}
+        - RSI ({settings.SIGNAL_RSI_WINDOW}): {round(technicals['rsi'], 2)}
+        - SMA ({settings.SIGNAL_SMA_WINDOW}): {round(technicals['sma'], 2)}
+        - Precomputed Technical Signal: {technicals['signal']}
+
+        News Summary:
+        {news_summary}
+        - Headline Sentiment (lexicon, 0-100): {sentiment['score']} ({sentiment['label']}, {sentiment['headlines']} headlines)
+
+        Analysis Instructions:
+        1. Base your primary decision on the Precomputed Technical Signal.
+        2. Adjust only if news sentiment strongly conflicts.
+        3. Provide EXACTLY 5 concise reasons.
+        4. Assign a sentiment score between 0 and 100.
+        5. Return strictly valid JSON.
+        """
+    response = upstreams.huggingface.call(
+        client.chat_completion,
+        model=LLM_MODEL,
+        messages=[
+            {"role": "system", "content": SYSTEM_PROMPT},
+            {"role": "user", "content": user_prompt}
+        ],
+        max_tokens=500,
+        temperature=0.7
+    )
+    content_str = response.choices[0].message.content
+    # Clean possible markdown code blocks if the model ignores instruction
+    if "```json" in content_str:
+        content_str = content_str.split("```json")[1].split("```")[0].strip()
+    elif "```" in content_str:
+        content_str = content_str.split("```")[1].strip()
+    return json.loads(content_str)
+
+
+def fallback_reasoning(tech_signal: str, reason: str, sentiment: dict) -> list:
+    reasoning = [reason]
+    if tech_signal == "BUY":
+        reasoning.append("Technical indicators suggest upside momentum.")
+    elif tech_signal == "SELL":
+        reasoning.append("Technical indicators suggest downside risk.")
+    else:
+        reasoning.append("Market conditions encompass mixed signals.")
+    if sentiment["headlines"]:
+        reasoning.append(
+            f"News sentiment is {sentiment['label']} ({sentiment['score']}/100) "
+            f"across {sentiment['headlines']} recent headlines."
+        )
+    return reasoning
+
+
+# Upstream fetches in flight, keyed by (stage, key); concurrent analyses of the
+# same ticker (or the same news query) join one request instead of repeating it
+_inflight: Dict[tuple, asyncio.Future] = {}
+
+
+def shared_fetch(stage: str, key: str, fn, *args) -> asyncio.Future:
+    """Join an identical in-flight fetch or start one in a worker thread."""
+    future = _inflight.get((stage, key))
+    if future is None:
+        future = asyncio.ensure_future(asyncio.to_thread(fn, *args))
+        _inflight[(stage, key)] = future
+        future.add_done_callback(lambda _: _inflight.pop((stage, key), None))
+    return future
+
+
+def _retrieve_exception(future: asyncio.Future):
+    if not future.cancelled():
+        future.exception()
+
+
+class StageClock:
+    """Per-request deadline plus the timing and outcome of every stage."""
+    def __init__(self, budget: float):
+        self.started = time.monotonic()
+        self.deadline = self.started + budget
+        self.timings: Dict[str, dict] = {}
+        # stage -> [started, finished]; finished is None while the stage runs
+        self.spans: Dict[str, List[Optional[float]]] = {}
+
+    def remaining(self) -> float:
+        return max(self.deadline - time.monotonic(), 0.0)
+
+    def start(self, stage: str, awaitable: Awaitable) -> asyncio.Future:
+        """
+        Schedule a stage and clock it from now until it completes, which may be
+        well before the pipeline gets round to awaiting it.
+        """
+        future = asyncio.ensure_future(awaitable)
+        span = self.spans[stage] = [time.monotonic(), None]
+
+        def finish(_):
+            if span[1] is None:
+                span[1] = time.monotonic()
+        future.add_done_callback(finish)
+        return future
+
+    def record(self, stage: str, status: str):
+        """Store a stage's outcome; unfinished (timed out) stages are clocked until now."""
+        started, finished = self.spans.get(stage, (None, None))
+        if started is None:
+            ms = 0.0
+        else:
+            ms = round(((finished or time.monotonic()) - started) * 1000, 1)
+        self.timings[stage] = {"ms": ms, "status": status}
+
+    async def wait(self, stage: str, awaitable: Awaitable, timeout: Optional[float] = None):
+        """Await a started stage within the remaining budget. Returns (value, status)."""
+        try:
+            value = await asyncio.wait_for(asyncio.shield(awaitable), self.remaining() if timeout is None else timeout)
+            status = "ok"
+        except asyncio.TimeoutError:
+            value, status = None, "timeout"
+        except UpstreamUnavailable as e:
+            logger.warning(f"Analysis stage {stage} skipped: {e}")
+            value, status = None, "unavailable"
+        except Exception as e:
+            logger.error(f"Analysis stage {stage} failed: {e}")
+            value, status = None, "error"
+        self.record(stage, status)
+        return value, status
+
+
+async def analyze_ticker(
+    ticker: str,
+    budget: Optional[float] = None,
+    history: Optional[Awaitable] = None,
+    news: Optional[Awaitable] = None,
+) -> Optional[dict]:
+    """
+    Technical + news + LLM analysis of one ticker, staged as:
+        history ─┐
+        news ────┼─> llm ─> result
+        fundamentals ──────────┘
+    History, news and fundamentals start together; the LLM starts as soon as the
+    technicals and news are in. Everything must finish within `budget` seconds:
+    late news is dropped, a late or failing LLM falls back to the technical signal
+    and late fundamentals are reported as N/A. Only history is required.
+    `history`/`news` may be shared in-flight fetches (see the batch endpoint).
+    Returns None when there is no price history for the ticker.
+    """
+    clock = StageClock(settings.ANALYSIS_DEADLINE_SECONDS if budget is None else budget)
+    started = clock.started
+    history_task = clock.start(
+        "history", history if history is not None else shared_fetch("history", ticker, fetch_history, ticker)
+    )
+    news_task = clock.start(
+        "news", news if news is not None else shared_fetch("news", news_key(ticker), fetch_news, ticker)
+    )
+    fundamentals_task = clock.start("fundamentals", asyncio.to_thread(fetch_fundamentals_view, ticker))
+    for task in (news_task, fundamentals_task):
+        # Stages abandoned by an early exit must not log "exception was never retrieved"
+        task.add_done_callback(_retrieve_exception)
+
+    # Every later stage needs the closes, so history is the one stage that cannot degrade
+    try:
+        frame = await asyncio.wait_for(asyncio.shield(history_task), clock.remaining())
+    except asyncio.TimeoutError:
+        clock.record("history", "timeout")
+        raise AnalysisTimeout(f"History for {ticker} not available within {clock.deadline - started:.1f}s")
+    clock.record("history", "ok")
+    if frame is None or frame.empty:
+        return None
+    technicals = compute_technicals(frame)
+    logger.info(f"Technicals calculated: Price={technicals['price']}, RSI={technicals['rsi']}, SMA={technicals['sma']}, Tech Signal={technicals['signal']}")
+
+    # Reserve the LLM's minimum slice up front; news may only use what is left over
+    run_llm = clock.remaining() >= settings.ANALYSIS_LLM_MIN_SECONDS
+    news_timeout = clock.remaining() - settings.ANALYSIS_LLM_MIN_SECONDS if run_llm else clock.remaining()
+    news_items, _ = await clock.wait("news", news_task, timeout=max(news_timeout, 0.0))
+    news_items = news_items or []
+    news_summary = summarize_news(news_items)
+    # Local lexicon score: LLM input, and the sentiment reading whenever the LLM has none
+    sentiment = dict(news_sentiment(news_items), source="lexicon")
+
+    signal = technicals["signal"]
+    if not run_llm:
+        clock.record("llm", "skipped")
+        reasoning = fallback_reasoning(
+            signal, "AI analysis skipped to meet the response deadline, using technicals.", sentiment
+        )
+    else:
+        remaining = clock.remaining()
+        ai_content, status = await clock.wait(
+            "llm", clock.start("llm", asyncio.to_thread(llm_analysis, ticker, technicals, news_summary, sentiment, remaining))
+        )
+        if ai_content is not None:
+            signal = ai_content.get("signal", signal)  # Fallback to technical signal
+            reasoning = ai_content.get("reasoning", ["AI analysis unavailable."])
+            if isinstance(ai_content.get("sentiment_score"), (int, float)):
+                sentiment.update(score=int(ai_content["sentiment_score"]), source="llm")
+        else:
+            reasoning = fallback_reasoning(signal, "AI connection failed, using fallback technicals.", sentiment)
+
+    fundamentals, _ = await clock.wait("fundamentals", fundamentals_task)
+    clock.timings["total"] = {"ms": round((time.monotonic() - started) * 1000, 1), "status": "ok"}
+
+    return {
+        "ticker": ticker,
+        "signal": signal,
+        "rsi": round(technicals["rsi"], 2),
+        "sma_50": round(technicals["sma"], 2),
+        "current_price": round(technicals["price"], 2),
+        "reasoning": reasoning,
+        "sentiment": sentiment,
+        "fundamentals": fundamentals or {field: "N/A" for field in FUNDAMENTAL_FIELDS},
+        "timings": clock.timings
+    }
+
+
+async def analyze_batch(
+    tickers: List[str],
+    concurrency: Optional[int] = None,
+    analyze: Optional[Callable[[str, Callable[[], Awaitable]], Awaitable[Optional[dict]]]] = None,
+) -> AsyncIterator[dict]:
+    """
+    Analyse many tickers at once, yielding {ticker, status, data, error} for each
+    as soon as it finishes. History for the whole batch comes from one download
+    (tickers it misses fall back to their own fetch), news is shared between
+    listings of the same company, and at most `concurrency` analyses, each with
+    its own deadline, run at a time.
+    `analyze(ticker, history)` replaces the plain analyze_ticker call (e.g. to go
+    through a cache); `history()` returns the shared history fetch, and the batch
+    download only starts once some ticker actually asks for it.
+    """
+    semaphore = asyncio.Semaphore(concurrency or settings.ANALYSIS_BATCH_CONCURRENCY)
+    histories: Optional[asyncio.Future] = None
+    if analyze is None:
+        analyze = lambda ticker, history: analyze_ticker(ticker, history=history())
+
+    async def history_for(ticker: str) -> pd.DataFrame:
+        nonlocal histories
+        if histories is None:
+            histories = asyncio.ensure_future(asyncio.to_thread(download_histories, tickers))
+        try:
+            frame = (await asyncio.shield(histories)).get(ticker)
+        except Exception as e:
+            logger.error(f"Batch history download failed: {e}")
+            frame = None
+        if frame is None or frame.empty:
+            frame = await shared_fetch("history", ticker, fetch_history, ticker)
+        return frame
+
+    async def run(ticker: str) -> dict:
+        async with semaphore:
+            try:
+                result = await analyze(ticker, lambda: history_for(ticker))
+            except AnalysisTimeout as e:
+                return {"ticker": ticker, "status": "timeout", "data": None, "error": str(e)}
+            except Exception as e:
+                logger.error(f"Batch analysis failed for {ticker}: {e}")
+                return {"ticker": ticker, "status": "error", "data": None, "error": str(e)}
+        if result is None:
+            return {"ticker": ticker, "status": "not_found", "data": None, "error": f"No data found for symbol {ticker}"}
+        return {"ticker": ticker, "status": "ok", "data": result, "error": None}
+
+    tasks = [asyncio.ensure_future(run(ticker)) for ticker in tickers]
+    try:
+        for finished in asyncio.as_completed(tasks):
+            yield await finished
+    finally:
+        # Client went away (or we are done): stop whatever is still queued
+        for task in tasks:
+            task.cancel()
+        if histories is not None:
+            histories.cancel()
@@ -0,0 +1,152 @@
+from typing import Dict, NamedTuple, Optional
+import numpy as np
+
+TRADING_DAYS = 252
+
+
+class SignalParams(NamedTuple):
+    """The RSI/SMA scoring rule used by /ai/signals and /{ticker}/analysis."""
+    rsi_window: int = 14
+    oversold: float = 30.0
+    overbought: float = 70.0
+    sma_window: int = 50
+
+
+def _rolling_mean(values: np.ndarray, window: int) -> np.ndarray:
+    """Trailing mean along axis 0 via cumulative sums; the first window-1 rows are NaN."""
+    out = np.full(values.shape, np.nan)
+    if window > len(values):
+        return out
+    csum = np.cumsum(values, axis=0)
+    out[window - 1] = csum[window - 1]
+    out[window:] = csum[window:] - csum[:-window]
+    out[window - 1:] /= window
+    return out
+
+
+def sma_matrix(closes: np.ndarray, window: int) -> np.ndarray:
+    """SMA per column. A window that touches a missing close is NaN."""
+    filled = np.nan_to_num(closes)
+    sma = _rolling_mean(filled, window)
+    missing = _rolling_mean(np.isnan(closes).astype(np.float64), window)
+    sma[missing > 0] = np.nan
+    return sma
+
+
+def rsi_matrix(closes: np.ndarray, window: int) -> np.ndarray:
+    """
+    RSI per column with simple moving averages of gains and losses, matching
+    Indicators.rsi_series (and so the analysis endpoints) on complete data.
+    """
+    delta = np.full(closes.shape, np.nan)
+    delta[1:] = np.diff(closes, axis=0)
+    valid = ~np.isnan(delta)
+    gains = np.where(valid & (delta > 0), delta, 0.0)
+    losses = np.where(valid & (delta < 0), -delta, 0.0)
+    avg_gain = _rolling_mean(gains, window)
+    avg_loss = _rolling_mean(losses, window)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rsi = 100 - 100 / (1 + avg_gain / avg_loss)
+    # Like pandas' where(), the undefined first change counts as zero
+    invalid = ~valid
+    invalid[0] = np.isnan(closes[0])
+    gaps = _rolling_mean(invalid.astype(np.float64), window)
+    rsi[gaps > 0] = np.nan
+    return rsi
+
+
+def signal_matrix(
+    closes: np.ndarray,
+    params: SignalParams = SignalParams(),
+    rsi: Optional[np.ndarray] = None,
+    sma: Optional[np.ndarray] = None,
+) -> np.ndarray:
+    """
+    +1 BUY, -1 SELL, 0 HOLD per bar and ticker, scored exactly like the live endpoints.
+    `rsi`/`sma` may be passed in when several threshold pairs share the same windows.
+    """
+    if rsi is None:
+        rsi = rsi_matrix(closes, params.rsi_window)
+    if sma is None:
+        sma = sma_matrix(closes, params.sma_window)
+    score = (rsi < params.oversold).astype(np.int8) - (rsi > params.overbought).astype(np.int8)
+    score += np.where(closes > sma, 1, -1).astype(np.int8)
+    signal = np.sign(score).astype(np.int8)
+    # No decision until the SMA exists
+    signal[np.isnan(sma) | np.isnan(closes)] = 0
+    return signal
+
+
+def positions_from_signals(signal: np.ndarray, allow_short: bool = False) -> np.ndarray:
+    """BUY goes long, SELL goes flat (or short); HOLD keeps the previous position."""
+    target = np.where(signal > 0, 1.0, -1.0 if allow_short else 0.0)
+    rows = np.arange(len(signal))[:, None]
+    # Row index of the latest non-HOLD signal, carried forward
+    last = np.maximum.accumulate(np.where(signal != 0, rows, -1), axis=0)
+    held = np.take_along_axis(target, np.maximum(last, 0), axis=0)
+    return np.where(last >= 0, held, 0.0)
+
+
+def performance(returns: np.ndarray) -> Dict[str, float]:
+    """CAGR, annualized volatility, Sharpe (risk-free 0) and max drawdown of daily returns."""
+    if not len(returns):
+        return {"cagr": 0.0, "volatility": 0.0, "sharpe": 0.0, "max_drawdown": 0.0, "total_return": 0.0}
+    equity = np.cumprod(1 + returns)
+    years = len(returns) / TRADING_DAYS
+    std = returns.std()
+    drawdown = equity / np.maximum.accumulate(equity) - 1
+    return {
+        "cagr": float(equity[-1] ** (1 / years) - 1) if equity[-1] > 0 else -1.0,
+        "volatility": float(std * np.sqrt(TRADING_DAYS)),
+        "sharpe": float(returns.mean() / std * np.sqrt(TRADING_DAYS)) if std > 0 else 0.0,
+        "max_drawdown": float(drawdown.min()),
+        "total_return": float(equity[-1] - 1),
+    }
+
+
+class BacktestResult(NamedTuple):
+    metrics: Dict[str, float]
+    benchmark: Dict[str, float]
+    returns: np.ndarray          # daily portfolio returns
+    positions: np.ndarray        # dates x tickers
+
+
+def run_backtest(
+    closes: np.ndarray,
+    params: SignalParams = SignalParams(),
+    allow_short: bool = False,
+    cost_bps: float = 10.0,
+    signal: Optional[np.ndarray] = None,
+) -> BacktestResult:
+    """
+    Equal-weight portfolio over the columns of `closes` (dates x tickers, NaN where a
+    ticker has no bar). Signals act on the next bar's return, so there is no look-ahead.
+    Costs are charged on every unit of position change.
+    """
+    if signal is None:
+        signal = signal_matrix(closes, params)
+    positions = positions_from_signals(signal, allow_short)
+
+    asset_returns = np.zeros(closes.shape)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        asset_returns[1:] = closes[1:] / closes[:-1] - 1
+    tradable = np.isfinite(asset_returns)
+    tradable[0] = False
+    asset_returns[~tradable] = 0.0
+
+    held = np.zeros(positions.shape)
+    held[1:] = positions[:-1]
+    trades = np.abs(np.diff(held, axis=0, prepend=0.0))
+    strategy = held * asset_returns - trades * cost_bps / 10_000
+
+    # Capital is split across the tickers that trade on each day
+    active = np.maximum(tradable.sum(axis=1), 1)
+    daily = strategy.sum(axis=1) / active
+    benchmark_daily = asset_returns.sum(axis=1) / active
+    daily, benchmark_daily = daily[1:], benchmark_daily[1:]
+
+    metrics = performance(daily)
+    # Average fraction of the book traded per year
+    metrics["turnover"] = float((trades.sum(axis=1) / active)[1:].mean() * TRADING_DAYS) if len(daily) else 0.0
+    metrics["exposure"] = float((np.abs(held).sum(axis=1) / active)[1:].mean()) if len(daily) else 0.0
+    return BacktestResult(metrics, performance(benchmark_daily), daily, positions)
@@ -0,0 +1,39 @@
+from typing import Optional
+import numpy as np
+import pandas as pd
+
+
+def rsi_series(closes: pd.Series, period: int = 14) -> pd.Series:
+    """RSI with simple moving averages of gains and losses, as used by the analysis endpoints."""
+    delta = closes.diff()
+    gain = (delta.where(delta > 0, 0)).rolling(window=period).mean()
+    loss = (-delta.where(delta < 0, 0)).rolling(window=period).mean()
+    rs = gain / loss
+    return 100 - (100 / (1 + rs))
+
+
+def latest_rsi(closes: np.ndarray, period: int = 14) -> Optional[float]:
+    """RSI of the last `period` changes of a plain array, or None without enough data."""
+    if len(closes) <= period:
+        return None
+    delta = np.diff(closes[-(period + 1):])
+    gain = delta[delta > 0].sum() / period
+    loss = -delta[delta < 0].sum() / period
+    if loss == 0:
+        return 100.0 if gain > 0 else 50.0
+    return float(100 - 100 / (1 + gain / loss))
+
+
+def technical_signal(rsi: float, price: float, sma: float, oversold: float = 30.0, overbought: float = 70.0) -> str:
+    """Score RSI extremes and price vs SMA into BUY/SELL/HOLD (see Backtest.signal_matrix)."""
+    score = 0
+    if rsi < oversold:
+        score += 1
+    elif rsi > overbought:
+        score -= 1
+    score += 1 if price > sma else -1
+    if score >= 1:
+        return "BUY"
+    if score <= -1:
+        return "SELL"
+    return "HOLD"
@@ -0,0 +1,178 @@
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from itertools import product
+from multiprocessing import get_context, shared_memory
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+import numpy as np
+from Services.Analytics.Backtest import (
+    SignalParams, performance, rsi_matrix, run_backtest, signal_matrix, sma_matrix
+)
+
+logger = logging.getLogger(__name__)
+
+# (lo, hi) ranges over the daily return series of a backtest
+Slice = Tuple[int, int]
+
+RANKING_SIZE = 20
+
+# Close matrix of the current sweep: a shared-memory view in pool workers
+_closes: Optional[np.ndarray] = None
+_closes_shm: Optional[shared_memory.SharedMemory] = None
+
+
+def _attach(name: str, shape: Tuple[int, int], dtype: str):
+    """Pool initializer: map the parent's close matrix read-only instead of unpickling a copy."""
+    global _closes, _closes_shm
+    _closes_shm = shared_memory.SharedMemory(name=name)
+    _closes = np.ndarray(shape, dtype=dtype, buffer=_closes_shm.buf)
+    _closes.flags.writeable = False
+
+
+def parameter_grid(
+    rsi_windows: Iterable[int],
+    oversold_levels: Iterable[float],
+    overbought_levels: Iterable[float],
+    sma_windows: Iterable[int],
+) -> List[SignalParams]:
+    """Every combination with oversold < overbought."""
+    return [
+        SignalParams(rsi_window, oversold, overbought, sma_window)
+        for rsi_window, oversold, overbought, sma_window
+        in product(sorted(set(rsi_windows)), sorted(set(oversold_levels)),
+                   sorted(set(overbought_levels)), sorted(set(sma_windows)))
+        if oversold < overbought
+    ]
+
+
+def walk_forward_splits(n: int, folds: int) -> List[Tuple[Slice, Slice]]:
+    """
+    Anchored walk-forward over n returns: the series is cut into folds + 1 blocks and
+    fold k trains on blocks 0..k and tests on block k + 1.
+    """
+    bounds = np.linspace(0, n, folds + 2).astype(int)
+    return [((0, int(bounds[k + 1])), (int(bounds[k + 1]), int(bounds[k + 2]))) for k in range(folds)]
+
+
+def _evaluate_group(
+    rsi_window: int,
+    sma_window: int,
+    thresholds: List[Tuple[float, float]],
+    slices: List[Slice],
+    allow_short: bool,
+    cost_bps: float,
+) -> List[Tuple[SignalParams, List[Dict[str, float]]]]:
+    """
+    Backtest every threshold pair for one (RSI window, SMA window); the indicator
+    matrices are computed once and shared by all pairs.
+    """
+    closes = _closes
+    rsi = rsi_matrix(closes, rsi_window)
+    sma = sma_matrix(closes, sma_window)
+    results = []
+    for oversold, overbought in thresholds:
+        params = SignalParams(rsi_window, oversold, overbought, sma_window)
+        signal = signal_matrix(closes, params, rsi=rsi, sma=sma)
+        returns = run_backtest(closes, params, allow_short, cost_bps, signal=signal).returns
+        results.append((params, [performance(returns[lo:hi]) for lo, hi in slices]))
+    return results
+
+
+def run_sweep(
+    closes: np.ndarray,
+    grid: List[SignalParams],
+    folds: int = 4,
+    allow_short: bool = False,
+    cost_bps: float = 10.0,
+    workers: int = 0,
+    on_progress: Optional[Callable[[int, int], None]] = None,
+) -> dict:
+    """
+    Evaluate `grid` on `closes` (dates x tickers) over the full period and every
+    walk-forward fold, then report the full-period ranking and the out-of-sample
+    performance of picking the best in-sample parameters per fold.
+    Work is grouped by indicator windows and spread over a process pool that maps
+    `closes` from shared memory. Row offsets in the result index daily returns,
+    i.e. return i is earned on closes row i + 1.
+    """
+    global _closes
+    started = time.perf_counter()
+    n_returns = len(closes) - 1
+    splits = walk_forward_splits(n_returns, folds) if folds else []
+    slices: List[Slice] = [(0, n_returns)] + [s for split in splits for s in split]
+
+    groups: Dict[Tuple[int, int], List[Tuple[float, float]]] = {}
+    for p in grid:
+        groups.setdefault((p.rsi_window, p.sma_window), []).append((p.oversold, p.overbought))
+
+    evaluated: List[Tuple[SignalParams, List[Dict[str, float]]]] = []
+    done = 0
+    workers = min(workers or os.cpu_count() or 1, len(groups))
+    if workers <= 1:
+        _closes = closes
+        try:
+            for (rsi_window, sma_window), thresholds in groups.items():
+                evaluated.extend(_evaluate_group(rsi_window, sma_window, thresholds, slices, allow_short, cost_bps))
+                done += len(thresholds)
+                if on_progress:
+                    on_progress(done, len(grid))
+        finally:
+            _closes = None
+    else:
+        data = np.ascontiguousarray(closes, dtype=np.float64)
+        shm = shared_memory.SharedMemory(create=True, size=max(data.nbytes, 1))
+        try:
+            np.ndarray(data.shape, dtype=data.dtype, buffer=shm.buf)[:] = data
+            with ProcessPoolExecutor(
+                max_workers=workers,
+                # spawn: forking a process that runs an event loop and threads is unsafe
+                mp_context=get_context("spawn"),
+                initializer=_attach,
+                initargs=(shm.name, data.shape, data.dtype.str),
+            ) as pool:
+                futures = {
+                    pool.submit(_evaluate_group, rsi_window, sma_window, thresholds, slices, allow_short, cost_bps): len(thresholds)
+                    for (rsi_window, sma_window), thresholds in groups.items()
+                }
+                for future in as_completed(futures):
+                    evaluated.extend(future.result())
+                    done += futures[future]
+                    if on_progress:
+                        on_progress(done, len(grid))
+        finally:
+            shm.close()
+            shm.unlink()
+
+    ranking = sorted(evaluated, key=lambda item: item[1][0]["sharpe"], reverse=True)
+
+    walk_forward = []
+    oos_returns = []
+    backtests: Dict[SignalParams, np.ndarray] = {}
+    for k, (train, test) in enumerate(splits):
+        train_idx, test_idx = 1 + 2 * k, 2 + 2 * k
+        params, metrics = max(evaluated, key=lambda item: item[1][train_idx]["sharpe"])
+        if params not in backtests:
+            backtests[params] = run_backtest(closes, params, allow_short, cost_bps).returns
+        oos_returns.append(backtests[params][test[0]:test[1]])
+        walk_forward.append({
+            "train": train,
+            "test": test,
+            "params": params._asdict(),
+            "train_metrics": metrics[train_idx],
+            "test_metrics": metrics[test_idx],
+        })
+
+    return {
+        "combinations": len(grid),
+        "workers": workers,
+        "ranking": [
+            {"params": params._asdict(), "metrics": metrics[0]}
+            for params, metrics in ranking[:RANKING_SIZE]
+        ],
+        "walk_forward": {
+            "folds": walk_forward,
+            "out_of_sample": performance(np.concatenate(oos_returns)) if oos_returns else None,
+        },
+        "elapsed_ms": round((time.perf_counter() - started) * 1000, 2),
+    }
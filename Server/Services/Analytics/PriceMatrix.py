@@ -0,0 +1,237 @@
+import json
+import logging
+import os
+import threading
+from typing import List, Optional, Sequence, Tuple
+import numpy as np
+import pandas as pd
+from Services.Market.HistoryDataset import list_tickers, read_history
+
+logger = logging.getLogger(__name__)
+
+# On-disk layout of a matrix directory:
+#   meta.json              version, rows, capacity, tickers, file names
+#   dates-<v>.i8           int64[capacity]  bar dates, epoch seconds (00:00 UTC)
+#   closes-<v>.f8          float64[capacity, tickers], Fortran order: each ticker's
+#                          column is contiguous, NaN where a ticker has no bar
+# Rows beyond `rows` are spare capacity, so new bars are appended in place; a new
+# ticker or a full matrix is written as a new version and swapped in via meta.json.
+META_FILE = "meta.json"
+SPARE_ROWS = 512
+# Re-derive the last few rows on every update so late corrections land
+REFRESH_ROWS = 5
+
+
+def _read_meta(directory: str) -> Optional[dict]:
+    path = os.path.join(directory, META_FILE)
+    if not os.path.exists(path):
+        return None
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+def _write_meta(directory: str, meta: dict):
+    tmp = os.path.join(directory, META_FILE + ".tmp")
+    with open(tmp, "w") as f:
+        json.dump(meta, f)
+    os.replace(tmp, os.path.join(directory, META_FILE))
+
+
+class PriceMatrix:
+    """
+    Read-only, memory-mapped dates x tickers close matrix. Every process maps the
+    same files, so concurrent requests and workers share one page-cached copy.
+    """
+    def __init__(self, directory: str, meta: dict):
+        self.directory = directory
+        self.version = meta["version"]
+        self.rows = meta["rows"]
+        self.tickers: List[str] = meta["tickers"]
+        self.columns = {t: i for i, t in enumerate(self.tickers)}
+        capacity = meta["capacity"]
+        self._dates = np.memmap(os.path.join(directory, meta["dates"]), dtype="<i8", mode="r", shape=(capacity,))
+        self._closes = np.memmap(
+            os.path.join(directory, meta["closes"]), dtype="<f8", mode="r",
+            shape=(capacity, len(self.tickers)), order="F"
+        )
+
+    @classmethod
+    def open(cls, directory: str) -> Optional["PriceMatrix"]:
+        meta = _read_meta(directory)
+        return cls(directory, meta) if meta else None
+
+    @property
+    def dates(self) -> np.ndarray:
+        return self._dates[:self.rows]
+
+    @property
+    def closes(self) -> np.ndarray:
+        return self._closes[:self.rows]
+
+    def index(self) -> pd.DatetimeIndex:
+        return pd.to_datetime(self.dates, unit="s")
+
+    def has(self, tickers: Sequence[str]) -> bool:
+        return all(t in self.columns for t in tickers)
+
+    def row_range(self, start: Optional[pd.Timestamp] = None, end: Optional[pd.Timestamp] = None) -> Tuple[int, int]:
+        dates = self.dates
+        lo = int(np.searchsorted(dates, int(start.timestamp()), "left")) if start is not None else 0
+        hi = int(np.searchsorted(dates, int(end.timestamp()), "right")) if end is not None else len(dates)
+        return lo, hi
+
+    def column(self, ticker: str, start=None, end=None) -> np.ndarray:
+        """One ticker's closes; a view into the mapping, no copy."""
+        lo, hi = self.row_range(start, end)
+        return self._closes[lo:hi, self.columns[ticker]]
+
+    def slice(self, tickers: Sequence[str], start=None, end=None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        (dates, closes) for a ticker subset and date range. The row range is a view;
+        picking columns copies only the requested tickers (a view if they are adjacent).
+        """
+        lo, hi = self.row_range(start, end)
+        cols = [self.columns[t] for t in tickers]
+        if cols and cols == list(range(cols[0], cols[0] + len(cols))):
+            block = self._closes[lo:hi, cols[0]:cols[0] + len(cols)]
+        else:
+            block = self._closes[lo:hi, cols]
+        return self._dates[lo:hi], block
+
+    def frame(self, tickers: Sequence[str], start=None, end=None) -> pd.DataFrame:
+        dates, block = self.slice(tickers, start, end)
+        return pd.DataFrame(block, index=pd.to_datetime(dates, unit="s"), columns=list(tickers), copy=False)
+
+
+def _allocate(directory: str, version: int, capacity: int, n_tickers: int):
+    dates_name, closes_name = f"dates-{version}.i8", f"closes-{version}.f8"
+    dates = np.memmap(os.path.join(directory, dates_name), dtype="<i8", mode="w+", shape=(capacity,))
+    closes = np.memmap(
+        os.path.join(directory, closes_name), dtype="<f8", mode="w+",
+        shape=(capacity, n_tickers), order="F"
+    )
+    closes[:] = np.nan
+    return dates_name, closes_name, dates, closes
+
+
+def _remove_stale(directory: str, keep: dict):
+    """Drop superseded versions; processes that still map them keep their pages until they reopen."""
+    for name in os.listdir(directory):
+        if name.startswith(("dates-", "closes-")) and name not in (keep["dates"], keep["closes"]):
+            try:
+                os.unlink(os.path.join(directory, name))
+            except OSError:
+                pass
+
+
+def build_price_matrix(dataset_dir: str, matrix_dir: str, full: bool = False) -> dict:
+    """
+    Bring the matrix in line with the per-ticker dataset. When the ticker set is
+    unchanged and spare rows remain, only bars from the last few stored dates on
+    are written in place; otherwise a new version is built and swapped in.
+    Returns the new meta.
+    """
+    os.makedirs(matrix_dir, exist_ok=True)
+    tickers = list_tickers(dataset_dir)
+    if not tickers:
+        raise ValueError(f"No history stored in {dataset_dir}; run backfill.py first")
+    histories = {t: read_history(dataset_dir, t) for t in tickers}
+    meta = None if full else _read_meta(matrix_dir)
+
+    if meta is not None and meta["tickers"] == tickers:
+        # Incremental: append new dates into spare capacity
+        capacity, rows = meta["capacity"], meta["rows"]
+        dates = np.memmap(os.path.join(matrix_dir, meta["dates"]), dtype="<i8", mode="r+", shape=(capacity,))
+        from_row = max(rows - REFRESH_ROWS, 0)
+        since = int(dates[from_row]) if rows else np.iinfo(np.int64).min
+        new_dates = np.unique(np.concatenate(
+            [h["t"][h["t"] >= since] for h in histories.values()] or [np.empty(0, np.int64)]
+        ))
+        if from_row + len(new_dates) <= capacity and (
+            not rows or np.array_equal(new_dates[:rows - from_row], dates[from_row:rows])
+        ):
+            closes = np.memmap(
+                os.path.join(matrix_dir, meta["closes"]), dtype="<f8", mode="r+",
+                shape=(capacity, len(tickers)), order="F"
+            )
+            dates[from_row:from_row + len(new_dates)] = new_dates
+            for j, ticker in enumerate(tickers):
+                h = histories[ticker]
+                mask = h["t"] >= since
+                # Assemble the tail first so readers never see it blanked out
+                tail = np.full(len(new_dates), np.nan)
+                tail[np.searchsorted(new_dates, h["t"][mask])] = h["c"][mask]
+                closes[from_row:from_row + len(new_dates), j] = tail
+            closes.flush()
+            dates.flush()
+            meta = dict(meta, rows=from_row + len(new_dates))
+            _write_meta(matrix_dir, meta)
+            logger.info(f"Price matrix updated in place: {meta['rows']} dates x {len(tickers)} tickers")
+            return meta
+
+    # Full build into a new version
+    all_dates = np.unique(np.concatenate(
+        [h["t"] for h in histories.values()] or [np.empty(0, np.int64)]
+    ))
+    previous = _read_meta(matrix_dir)
+    version = previous["version"] + 1 if previous else 1
+    capacity = len(all_dates) + SPARE_ROWS
+    dates_name, closes_name, dates, closes = _allocate(matrix_dir, version, capacity, len(tickers))
+    dates[:len(all_dates)] = all_dates
+    for j, ticker in enumerate(tickers):
+        h = histories[ticker]
+        closes[np.searchsorted(all_dates, h["t"]), j] = h["c"]
+    closes.flush()
+    dates.flush()
+    meta = {
+        "version": version, "rows": len(all_dates), "capacity": capacity,
+        "tickers": tickers, "dates": dates_name, "closes": closes_name
+    }
+    _write_meta(matrix_dir, meta)
+    _remove_stale(matrix_dir, meta)
+    logger.info(f"Price matrix rebuilt: {len(all_dates)} dates x {len(tickers)} tickers (v{version})")
+    return meta
+
+
+def period_start(period: str, end: pd.Timestamp) -> Optional[pd.Timestamp]:
+    """Start date for a yfinance-style period (5d, 6mo, 10y, ytd, max) ending at `end`."""
+    if period == "max":
+        return None
+    if period == "ytd":
+        return pd.Timestamp(year=end.year, month=1, day=1)
+    for suffix, unit in (("mo", "months"), ("y", "years"), ("d", "days")):
+        if period.endswith(suffix) and period[:-len(suffix)].isdigit():
+            return end - pd.DateOffset(**{unit: int(period[:-len(suffix)])})
+    raise ValueError(f"Unsupported period '{period}'")
+
+
+def is_supported_period(period: str) -> bool:
+    """Whether period_start understands `period` (for validating requests up front)."""
+    try:
+        period_start(period, pd.Timestamp.now())
+    except ValueError:
+        return False
+    return True
+
+
+_matrix: Optional[PriceMatrix] = None
+_matrix_mtime = 0.0
+_matrix_lock = threading.Lock()
+
+
+def get_price_matrix(directory: str) -> Optional[PriceMatrix]:
+    """This process's mapping of the matrix, reopened whenever meta.json changes."""
+    global _matrix, _matrix_mtime
+    try:
+        mtime = os.path.getmtime(os.path.join(directory, META_FILE))
+    except OSError:
+        return None
+    with _matrix_lock:
+        if _matrix is None or mtime != _matrix_mtime or _matrix.directory != directory:
+            try:
+                _matrix = PriceMatrix.open(directory)
+                _matrix_mtime = mtime
+            except Exception as e:
+                logger.error(f"Opening price matrix failed: {e}")
+                _matrix = None
+        return _matrix
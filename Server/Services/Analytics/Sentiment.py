@@ -0,0 +1,147 @@
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Dict, List, Sequence
+import numpy as np
+
+# Financial news lexicon, weights -3 (strongly bearish) .. +3 (strongly bullish).
+# Inflections (-s, -ed, -ing, ...) are resolved to these stems at lookup time.
+LEXICON: Dict[str, float] = {
+    # Bullish
+    "surge": 3, "soar": 3, "skyrocket": 3, "rocket": 2.5, "boom": 2.5, "record": 2, "breakout": 2.5,
+    "rally": 2.5, "jump": 2, "zoom": 2, "spurt": 2, "climb": 1.5, "rise": 1.5, "gain": 1.5, "advance": 1,
+    "rebound": 1.5, "recover": 1.5, "recovery": 1.5, "upgrade": 2.5, "outperform": 2, "beat": 2,
+    "strong": 1.5, "robust": 1.5, "stellar": 2.5, "bullish": 2.5, "buy": 1.5, "accumulate": 1,
+    "profit": 1.5, "profitable": 1.5, "growth": 1.5, "grow": 1.5, "expand": 1, "expansion": 1,
+    "dividend": 1, "bonus": 1, "buyback": 1.5, "win": 1.5, "bag": 1, "secure": 1, "approval": 1.5,
+    "approve": 1.5, "optimism": 2, "optimistic": 2, "positive": 1.5, "upbeat": 2, "boost": 1.5,
+    "high": 1, "peak": 1, "milestone": 1.5, "top": 0.5, "upside": 1.5, "momentum": 1, "green": 1,
+    "multibagger": 2.5, "inflow": 1, "overweight": 1.5, "target": 0.5, "improve": 1.5, "strengthen": 1.5,
+    # Bearish
+    "plunge": -3, "crash": -3, "tank": -2.5, "collapse": -3, "plummet": -3, "slump": -2.5, "tumble": -2.5,
+    "sink": -2, "slide": -2, "fall": -1.5, "drop": -1.5, "decline": -1.5, "dip": -1, "slip": -1,
+    "lose": -1.5, "loss": -2, "losses": -2, "downgrade": -2.5, "underperform": -2, "miss": -2,
+    "weak": -1.5, "weakness": -1.5, "sluggish": -1.5, "bearish": -2.5, "sell": -1.5, "selloff": -2.5,
+    "fraud": -3, "scam": -3, "probe": -2, "raid": -2, "penalty": -2, "fine": -1, "lawsuit": -2, "sue": -2,
+    "default": -3, "bankrupt": -3, "bankruptcy": -3, "insolvency": -3, "debt": -1, "layoff": -2,
+    "cut": -1, "slash": -2, "warn": -2, "warning": -2, "concern": -1.5, "worry": -1.5, "fear": -2,
+    "risk": -1, "volatile": -1, "volatility": -1, "pressure": -1, "outflow": -1, "low": -1, "red": -1,
+    "halt": -2, "suspend": -2, "delay": -1.5, "resign": -1.5, "exit": -1, "pessimism": -2,
+    "negative": -1.5, "downside": -1.5, "underweight": -1.5, "headwind": -1.5, "crisis": -2.5,
+    "slowdown": -1.5, "shortfall": -2, "disappoint": -2, "uncertainty": -1.5, "tariff": -1,
+}
+NEGATORS = frozenset({"not", "no", "never", "without", "nor", "hardly", "barely", "despite"})
+# A negator flips polarity of the next few words ("not a strong quarter"), damped as in VADER
+NEGATION_WINDOW = 2
+NEGATION_SCALE = -0.75
+# Normalisation sum / sqrt(sum^2 + alpha) maps unbounded sums into (-1, 1)
+NORMALIZATION_ALPHA = 15.0
+NEUTRAL_BAND = 0.05
+SUFFIXES = ("ing", "ed", "es", "s", "d")
+TOKEN_RE = re.compile(r"[a-z]+")
+
+CACHE_SIZE = 50000
+_scores: "OrderedDict[bytes, float]" = OrderedDict()
+_scores_lock = threading.Lock()
+
+
+@lru_cache(maxsize=65536)
+def token_weight(token: str) -> float:
+    weight = LEXICON.get(token)
+    if weight is None:
+        for suffix in SUFFIXES:
+            if token.endswith(suffix) and len(token) - len(suffix) >= 3:
+                stem = token[:-len(suffix)]
+                # "slashes" -> "slash", "cutting" -> "cut", "raised" -> "raise"
+                weight = LEXICON.get(stem) or LEXICON.get(stem + "e") or (
+                    LEXICON.get(stem[:-1]) if len(stem) > 3 and stem[-1] == stem[-2] else None
+                )
+                if weight is not None:
+                    break
+    return float(weight or 0.0)
+
+
+def score_batch(titles: Sequence[str]) -> np.ndarray:
+    """
+    Scores in (-1, 1) for a batch of headlines, without the cache. Tokens of the
+    whole batch are looked up once per distinct word and combined with array ops.
+    """
+    n = len(titles)
+    tokens = [TOKEN_RE.findall(title.lower()) for title in titles]
+    lengths = np.fromiter((len(t) for t in tokens), dtype=np.int64, count=n)
+    flat = [token for words in tokens for token in words]
+    if not flat:
+        return np.zeros(n)
+    # Intern tokens to ids (a dict beats sorting strings with np.unique)
+    vocabulary: Dict[str, int] = {}
+    ids = np.fromiter((vocabulary.setdefault(t, len(vocabulary)) for t in flat), dtype=np.int64, count=len(flat))
+    weights = np.array([token_weight(w) for w in vocabulary])[ids]
+    negator = np.array([w in NEGATORS for w in vocabulary])[ids]
+    doc = np.repeat(np.arange(n), lengths)
+
+    flip = np.zeros(len(flat), dtype=bool)
+    for k in range(1, NEGATION_WINDOW + 1):
+        flip[k:] |= negator[:-k] & (doc[k:] == doc[:-k])
+    weights = np.where(flip, weights * NEGATION_SCALE, weights)
+
+    sums = np.bincount(doc, weights=weights, minlength=n)
+    return sums / np.sqrt(sums * sums + NORMALIZATION_ALPHA)
+
+
+def _key(title: str) -> bytes:
+    return hashlib.blake2b(title.encode("utf-8"), digest_size=8).digest()
+
+
+def score_headlines(titles: Sequence[str]) -> np.ndarray:
+    """Headline scores in (-1, 1); headlines seen before are served from the cache."""
+    keys = [_key(t) for t in titles]
+    scores = np.empty(len(titles))
+    missing = []
+    with _scores_lock:
+        for i, key in enumerate(keys):
+            cached = _scores.get(key)
+            if cached is None:
+                missing.append(i)
+            else:
+                scores[i] = cached
+    if missing:
+        fresh = score_batch([titles[i] for i in missing])
+        scores[missing] = fresh
+        with _scores_lock:
+            for i, score in zip(missing, fresh):
+                _scores[keys[i]] = float(score)
+            while len(_scores) > CACHE_SIZE:
+                _scores.popitem(last=False)
+    return scores
+
+
+def aggregate_sentiment(scores: np.ndarray) -> dict:
+    """
+    Headline scores -> one reading on the same 0-100 scale the LLM uses
+    (0-40 Bearish, 41-60 Neutral, 61-100 Bullish).
+    """
+    scores = np.asarray(scores, dtype=np.float64)
+    mean = float(scores.mean()) if len(scores) else 0.0
+    score = int(round((mean + 1) * 50))
+    label = "Bearish" if score <= 40 else "Bullish" if score > 60 else "Neutral"
+    return {
+        "score": score,
+        "label": label,
+        "headlines": int(len(scores)),
+        "positive": int((scores > NEUTRAL_BAND).sum()),
+        "negative": int((scores < -NEUTRAL_BAND).sum()),
+    }
+
+
+def headline_text(item: dict) -> str:
+    """Google News titles end in ' - <source>'; the outlet name is not sentiment."""
+    title, source = item.get("title", ""), item.get("source", "")
+    suffix = f" - {source}"
+    return title[:-len(suffix)] if source and title.endswith(suffix) else title
+
+
+def news_sentiment(news_items: List[dict]) -> dict:
+    return aggregate_sentiment(score_headlines([headline_text(item) for item in news_items]))
+
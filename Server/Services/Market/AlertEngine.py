@@ -0,0 +1,76 @@
+import logging
+import time
+from typing import Callable, List, Optional
+import numpy as np
+from Database.AlertStore import get_alert_changes, mark_triggered
+from Services.Analytics.Indicators import latest_rsi
+from Services.Market.AlertIndex import AlertIndex, FiredAlert
+
+logger = logging.getLogger(__name__)
+
+# Rows committed by another worker may carry an updated_at slightly older than our
+# last read; re-reading a short window is harmless since add/remove are idempotent.
+SYNC_OVERLAP_SECONDS = 5.0
+
+RSI_PERIOD = 14
+RSI_INTERVAL = "1m"
+
+
+class AlertEngine:
+    """
+    Keeps an AlertIndex in step with the alerts table and evaluates it once per
+    stream cycle. Every worker runs one; each fires to its own sockets.
+    """
+    def __init__(self, sync_seconds: float = 2.0):
+        self.index = AlertIndex()
+        self.sync_seconds = sync_seconds
+        self.cursor = 0.0
+        self.last_sync = 0.0
+
+    def sync(self, force: bool = False):
+        now = time.monotonic()
+        if not force and now - self.last_sync < self.sync_seconds:
+            return
+        self.last_sync = now
+        try:
+            changes = get_alert_changes(self.cursor - SYNC_OVERLAP_SECONDS)
+        except Exception as e:
+            logger.error(f"Alert sync failed: {e}")
+            return
+        added = []
+        for row in changes:
+            if row["active"]:
+                added.append((row["id"], row["ticker"], row["metric"], row["direction"], row["threshold"]))
+            else:
+                self.index.remove(row["id"])
+            self.cursor = max(self.cursor, row["updated_at"])
+        self.index.add_many(added)
+
+    def tickers(self) -> set:
+        return self.index.tickers()
+
+    def evaluate(self, quotes: List[dict], closes_for: Callable[[str], Optional[np.ndarray]]) -> List[FiredAlert]:
+        """
+        Check a cycle's quotes. `closes_for(ticker)` supplies recent bar closes for RSI rules.
+        Fired alerts are removed from the index and marked triggered in the database.
+        """
+        self.sync()
+        if not len(self.index):
+            return []
+        rsi_tickers = self.index.tickers("rsi")
+        fired: List[FiredAlert] = []
+        for q in quotes:
+            ticker = q["ticker"]
+            fired.extend(self.index.evaluate(ticker, "price", q["price"]))
+            if ticker in rsi_tickers:
+                closes = closes_for(ticker)
+                rsi = latest_rsi(closes, RSI_PERIOD) if closes is not None else None
+                if rsi is not None:
+                    fired.extend(self.index.evaluate(ticker, "rsi", rsi))
+        if fired:
+            now = time.time()
+            try:
+                mark_triggered((a.id, a.value, now) for a in fired)
+            except Exception as e:
+                logger.error(f"Persisting fired alerts failed: {e}")
+        return fired
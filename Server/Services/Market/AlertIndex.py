@@ -0,0 +1,137 @@
+from bisect import bisect_left, bisect_right
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+ALERT_METRICS = ("price", "rsi")
+ALERT_DIRECTIONS = ("above", "below")
+
+
+class FiredAlert(NamedTuple):
+    id: int
+    ticker: str
+    metric: str
+    direction: str
+    threshold: float
+    value: float
+
+
+class ThresholdBook:
+    """
+    Rules of one (ticker, metric, direction) kept as parallel lists sorted by threshold.
+    A move from prev to cur crosses a contiguous slice, found with two bisections.
+    """
+    def __init__(self):
+        self.thresholds: List[float] = []
+        self.ids: List[int] = []
+
+    def add(self, threshold: float, alert_id: int):
+        i = bisect_right(self.thresholds, threshold)
+        self.thresholds.insert(i, threshold)
+        self.ids.insert(i, alert_id)
+
+    def extend(self, rules: List[Tuple[float, int]]):
+        """Add many (threshold, id) rules with one sort instead of an O(n) insert each."""
+        if len(rules) == 1:
+            self.add(*rules[0])
+            return
+        # Stable sort: equal thresholds keep insertion order, as with add()
+        merged = sorted([*zip(self.thresholds, self.ids), *rules], key=lambda rule: rule[0])
+        self.thresholds = [threshold for threshold, _ in merged]
+        self.ids = [alert_id for _, alert_id in merged]
+
+    def remove(self, threshold: float, alert_id: int) -> bool:
+        lo = bisect_left(self.thresholds, threshold)
+        hi = bisect_right(self.thresholds, threshold)
+        for i in range(lo, hi):
+            if self.ids[i] == alert_id:
+                del self.thresholds[i]
+                del self.ids[i]
+                return True
+        return False
+
+    def pop_range(self, lo: int, hi: int) -> List[Tuple[float, int]]:
+        crossed = list(zip(self.thresholds[lo:hi], self.ids[lo:hi]))
+        del self.thresholds[lo:hi]
+        del self.ids[lo:hi]
+        return crossed
+
+    def __len__(self):
+        return len(self.ids)
+
+
+class AlertIndex:
+    """
+    Active one-shot alerts indexed per ticker and metric.
+    evaluate() touches only the rules whose threshold lies between the previous and
+    the current value, so its cost is O(log n + crossed) regardless of how many
+    alerts a ticker has.
+    """
+    def __init__(self):
+        # (ticker, metric) -> {"above": book, "below": book}
+        self.books: Dict[Tuple[str, str], Dict[str, ThresholdBook]] = {}
+        self.rules: Dict[int, Tuple[str, str, str, float]] = {}
+        # Last value seen per (ticker, metric); a crossing needs two observations
+        self.last: Dict[Tuple[str, str], float] = {}
+
+    def __len__(self):
+        return len(self.rules)
+
+    def add(self, alert_id: int, ticker: str, metric: str, direction: str, threshold: float):
+        if alert_id in self.rules:
+            return
+        books = self.books.setdefault((ticker, metric), {d: ThresholdBook() for d in ALERT_DIRECTIONS})
+        books[direction].add(threshold, alert_id)
+        self.rules[alert_id] = (ticker, metric, direction, threshold)
+
+    def add_many(self, rows: Iterable[Tuple[int, str, str, str, float]]):
+        """Bulk add of (id, ticker, metric, direction, threshold) rows, e.g. the initial sync."""
+        pending: Dict[Tuple[str, str, str], List[Tuple[float, int]]] = {}
+        for alert_id, ticker, metric, direction, threshold in rows:
+            if alert_id in self.rules:
+                continue
+            self.rules[alert_id] = (ticker, metric, direction, threshold)
+            pending.setdefault((ticker, metric, direction), []).append((threshold, alert_id))
+        for (ticker, metric, direction), rules in pending.items():
+            books = self.books.setdefault((ticker, metric), {d: ThresholdBook() for d in ALERT_DIRECTIONS})
+            books[direction].extend(rules)
+
+    def remove(self, alert_id: int):
+        rule = self.rules.pop(alert_id, None)
+        if rule is None:
+            return
+        ticker, metric, direction, threshold = rule
+        books = self.books.get((ticker, metric))
+        if books is not None:
+            books[direction].remove(threshold, alert_id)
+            if not any(len(b) for b in books.values()):
+                del self.books[(ticker, metric)]
+
+    def tickers(self, metric: Optional[str] = None) -> set:
+        return {t for t, m in self.books if metric is None or m == metric}
+
+    def evaluate(self, ticker: str, metric: str, value: float) -> List[FiredAlert]:
+        """Fire (and remove) the rules crossed by moving from the last value to `value`."""
+        key = (ticker, metric)
+        prev = self.last.get(key)
+        self.last[key] = value
+        books = self.books.get(key)
+        if prev is None or books is None or value == prev:
+            return []
+        if value > prev:
+            # above: prev < threshold <= value
+            direction = "above"
+            book = books[direction]
+            lo, hi = bisect_right(book.thresholds, prev), bisect_right(book.thresholds, value)
+        else:
+            # below: value <= threshold < prev
+            direction = "below"
+            book = books[direction]
+            lo, hi = bisect_left(book.thresholds, value), bisect_left(book.thresholds, prev)
+        if lo >= hi:
+            return []
+        fired = []
+        for threshold, alert_id in book.pop_range(lo, hi):
+            del self.rules[alert_id]
+            fired.append(FiredAlert(alert_id, ticker, metric, direction, threshold, value))
+        if not any(len(b) for b in books.values()):
+            del self.books[key]
+        return fired
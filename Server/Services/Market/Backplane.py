@@ -0,0 +1,177 @@
+import asyncio
+import logging
+import os
+import tempfile
+from abc import ABC, abstractmethod
+from typing import Awaitable, Callable, Dict, List
+import orjson
+from Config.SystemConfig import get_settings
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+QuotesHandler = Callable[[List[dict]], Awaitable[None]]
+InterestProvider = Callable[[], Dict[str, int]]
+
+# A follower that cannot keep up is disconnected (it reconnects and resumes)
+MAX_FOLLOWER_BUFFER = 4 * 1024 * 1024
+INTEREST_REFRESH_SECONDS = 1.0
+
+
+class Backplane(ABC):
+    """
+    Moves quotes from the single elected poller to every worker, and carries each
+    worker's subscription interest (ticker -> subscriber count) back to the poller.
+    The price stream only talks to this interface, so another transport such as a
+    Redis pub/sub channel can be plugged in by subclassing it.
+    """
+    # Whether workers must elect a single poller before serving
+    needs_election = True
+
+    @abstractmethod
+    async def serve(self):
+        """Leader side: start accepting followers."""
+
+    @abstractmethod
+    async def publish(self, quotes: List[dict]):
+        """Leader side: send a cycle's quotes to every follower."""
+
+    @abstractmethod
+    def remote_interest(self) -> Dict[str, int]:
+        """Leader side: subscriber counts summed over all followers."""
+
+    @abstractmethod
+    async def follow(self, on_quotes: QuotesHandler, get_interest: InterestProvider):
+        """Follower side: deliver quotes until the leader goes away, then return."""
+
+    async def close(self):
+        pass
+
+
+class LocalBackplane(Backplane):
+    """Single-process deployment: the only worker is always the poller."""
+    needs_election = False
+
+    async def serve(self):
+        pass
+
+    async def publish(self, quotes: List[dict]):
+        pass
+
+    def remote_interest(self) -> Dict[str, int]:
+        return {}
+
+    async def follow(self, on_quotes: QuotesHandler, get_interest: InterestProvider):
+        raise RuntimeError("LocalBackplane has no followers")
+
+
+class UnixSocketBackplane(Backplane):
+    """
+    Newline-delimited JSON over a Unix domain socket.
+    Leader -> follower: {"type": "quotes", "data": [...]}
+    Follower -> leader: {"type": "interest", "data": {ticker: count}}
+    """
+    def __init__(self, path: str):
+        self.path = path
+        self.server = None
+        self.followers: Dict[asyncio.StreamWriter, Dict[str, int]] = {}
+
+    async def serve(self):
+        if os.path.exists(self.path):
+            os.unlink(self.path)  # stale socket from a previous leader
+        self.server = await asyncio.start_unix_server(self._handle_follower, path=self.path)
+        logger.info(f"Backplane serving on {self.path}")
+
+    async def _handle_follower(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.followers[writer] = {}
+        logger.info(f"Backplane follower connected. Total: {len(self.followers)}")
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                msg = orjson.loads(line)
+                if msg.get("type") == "interest" and isinstance(msg.get("data"), dict):
+                    self.followers[writer] = msg["data"]
+        except Exception as e:
+            logger.error(f"Backplane follower error: {e}")
+        finally:
+            self.followers.pop(writer, None)
+            writer.close()
+            logger.info(f"Backplane follower left. Total: {len(self.followers)}")
+
+    async def publish(self, quotes: List[dict]):
+        if not self.followers:
+            return
+        line = orjson.dumps({"type": "quotes", "data": quotes}) + b"\n"
+        for writer in list(self.followers):
+            if writer.transport.get_write_buffer_size() > MAX_FOLLOWER_BUFFER:
+                logger.warning("Backplane follower too slow, disconnecting")
+                self.followers.pop(writer, None)
+                writer.close()
+                continue
+            writer.write(line)
+
+    def remote_interest(self) -> Dict[str, int]:
+        totals: Dict[str, int] = {}
+        for interest in self.followers.values():
+            for ticker, count in interest.items():
+                totals[ticker] = totals.get(ticker, 0) + count
+        return totals
+
+    async def follow(self, on_quotes: QuotesHandler, get_interest: InterestProvider):
+        try:
+            reader, writer = await asyncio.open_unix_connection(self.path)
+        except OSError:
+            return
+        logger.info(f"Following price stream leader on {self.path}")
+
+        async def announce():
+            last = None
+            while True:
+                interest = get_interest()
+                if interest != last:
+                    writer.write(orjson.dumps({"type": "interest", "data": interest}) + b"\n")
+                    await writer.drain()
+                    last = interest
+                await asyncio.sleep(INTEREST_REFRESH_SECONDS)
+
+        announcer = asyncio.create_task(announce())
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                msg = orjson.loads(line)
+                if msg.get("type") == "quotes":
+                    await on_quotes(msg["data"])
+        except Exception as e:
+            logger.error(f"Backplane follow error: {e}")
+        finally:
+            announcer.cancel()
+            writer.close()
+            logger.info("Lost price stream leader")
+
+    async def close(self):
+        if self.server is not None:
+            self.server.close()
+            self.server = None
+        for writer in list(self.followers):
+            writer.close()
+        self.followers.clear()
+
+
+def _runtime_path(configured: str, name: str) -> str:
+    return configured or os.path.join(tempfile.gettempdir(), name)
+
+
+def stream_lock_path() -> str:
+    return _runtime_path(settings.STREAM_LOCK_FILE, "matrix_forge_stream.lock")
+
+
+def create_backplane() -> Backplane:
+    if settings.STREAM_BACKPLANE == "unix":
+        return UnixSocketBackplane(_runtime_path(settings.STREAM_SOCKET_PATH, "matrix_forge_stream.sock"))
+    if settings.STREAM_BACKPLANE == "local":
+        return LocalBackplane()
+    raise ValueError(f"Unknown STREAM_BACKPLANE '{settings.STREAM_BACKPLANE}'")
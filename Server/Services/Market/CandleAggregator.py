@@ -0,0 +1,151 @@
+import logging
+from typing import Dict, List, NamedTuple, Optional
+import numpy as np
+import pandas as pd
+from Services.Market.TradingCalendar import IST, MARKET_OPEN
+
+logger = logging.getLogger(__name__)
+
+# Intraday intervals built from streamed ticks, in seconds
+INTRADAY_INTERVALS = {
+    "1m": 60,
+    "5m": 300,
+    "15m": 900,
+}
+
+# Trading sessions covered by each intraday history period
+INTRADAY_PERIOD_SESSIONS = {
+    "1d": 1,
+    "5d": 5,
+}
+OHLCV = ["Open", "High", "Low", "Close", "Volume"]
+
+# Columns of a bar row in CandleRing.bars
+T, O, H, L, C, N = range(6)
+
+
+class ClosedBar(NamedTuple):
+    ticker: str
+    interval: str
+    t: int          # bucket start, epoch seconds
+    o: float
+    h: float
+    l: float
+    c: float
+    ticks: int
+
+
+class CandleRing:
+    """
+    Fixed-capacity ring of OHLC bars for one ticker and interval, stored in a single
+    float64 array (start, open, high, low, close, tick count). The newest row is the
+    bar still forming; once the ring is full the oldest bar is overwritten.
+    """
+    def __init__(self, seconds: int, capacity: int):
+        self.seconds = seconds
+        self.capacity = capacity
+        self.bars = np.zeros((capacity, 6), dtype=np.float64)
+        self.head = -1   # row of the forming bar
+        self.count = 0
+
+    def update(self, ts: float, price: float) -> Optional[np.ndarray]:
+        """Fold a tick into the ring. Returns the previous bar's row if this tick closed it."""
+        start = float(int(ts // self.seconds) * self.seconds)
+        if self.count:
+            bar = self.bars[self.head]
+            if start == bar[T]:
+                if price > bar[H]:
+                    bar[H] = price
+                if price < bar[L]:
+                    bar[L] = price
+                bar[C] = price
+                bar[N] += 1
+                return None
+            if start < bar[T]:
+                return None  # late tick for a bar that already closed
+        closed = self.bars[self.head].copy() if self.count else None
+        self.head = (self.head + 1) % self.capacity
+        self.bars[self.head] = (start, price, price, price, price, 1)
+        self.count = min(self.count + 1, self.capacity)
+        return closed
+
+    def snapshot(self) -> np.ndarray:
+        """Bars oldest first, including the forming one."""
+        if self.count < self.capacity:
+            return self.bars[:self.count].copy()
+        return np.roll(self.bars, -(self.head + 1), axis=0)
+
+
+class CandleAggregator:
+    """Live 1m/5m/15m bars per ticker, aggregated from the quotes the price stream dispatches."""
+    def __init__(self, capacity: int = 750):
+        self.capacity = capacity
+        self.rings: Dict[str, Dict[str, CandleRing]] = {}
+
+    def update(self, quotes: List[dict]) -> List[ClosedBar]:
+        """Aggregate a cycle's quotes; returns the bars those quotes closed."""
+        closed: List[ClosedBar] = []
+        for q in quotes:
+            rings = self.rings.get(q["ticker"])
+            if rings is None:
+                rings = self.rings[q["ticker"]] = {
+                    name: CandleRing(seconds, self.capacity) for name, seconds in INTRADAY_INTERVALS.items()
+                }
+            for name, ring in rings.items():
+                bar = ring.update(q["ts"], q["price"])
+                if bar is not None:
+                    closed.append(ClosedBar(
+                        q["ticker"], name, int(bar[T]),
+                        float(bar[O]), float(bar[H]), float(bar[L]), float(bar[C]), int(bar[N])
+                    ))
+        return closed
+
+    def closes(self, ticker: str, interval: str) -> Optional[np.ndarray]:
+        ring = self.rings.get(ticker, {}).get(interval)
+        return ring.snapshot()[:, C] if ring is not None else None
+
+    def history(self, ticker: str, interval: str) -> pd.DataFrame:
+        """Bars in the same OHLCV frame shape yfinance returns; empty if the ticker is not streamed."""
+        ring = self.rings.get(ticker, {}).get(interval)
+        bars = ring.snapshot() if ring is not None else np.empty((0, 6))
+        index = pd.to_datetime(bars[:, T].astype(np.int64), unit="s", utc=True)
+        return pd.DataFrame(
+            {
+                "Open": bars[:, O],
+                "High": bars[:, H],
+                "Low": bars[:, L],
+                "Close": bars[:, C],
+                # Quotes carry no traded volume
+                "Volume": np.zeros(len(bars), dtype=np.int64),
+            },
+            index=index
+        )
+
+
+def session_window(history: pd.DataFrame, sessions: int) -> Optional[pd.DataFrame]:
+    """
+    Live bars of the last `sessions` trading sessions, or None when the ring does
+    not reach back to the open of the first of them (e.g. streaming started mid-day).
+    """
+    if history.empty:
+        return None
+    local = history.index.tz_convert(IST)
+    days = pd.unique(local.date)
+    if len(days) < sessions:
+        return None
+    in_window = local.date >= days[-sessions]
+    if local[in_window][0].time() > MARKET_OPEN:
+        return None
+    return history[in_window]
+
+
+def merge_intraday(upstream: pd.DataFrame, live: pd.DataFrame) -> pd.DataFrame:
+    """Upstream bars up to where the live bars start, then the live bars (upstream lags the stream)."""
+    if upstream.empty:
+        return live
+    upstream = upstream[OHLCV]
+    upstream.index = upstream.index.tz_convert("UTC")
+    if live.empty:
+        return upstream
+    live = live[live.index >= upstream.index[0]]
+    return pd.concat([upstream[upstream.index < live.index[0]] if len(live) else upstream, live])
@@ -0,0 +1,134 @@
+import asyncio
+import logging
+import os
+import tempfile
+import time
+from typing import Dict, List, Optional
+import yfinance as yf
+from Config.SystemConfig import get_settings
+from Database.FundamentalsStore import delete_fundamentals, get_fundamentals, get_fundamentals_due, upsert_fundamentals
+from Services.Market.LeaderElection import FileLeaderLock
+import Utils.Resilience as upstreams
+from Utils.Resilience import UpstreamUnavailable
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# yfinance .info keys for each stored field
+INFO_KEYS = {
+    "market_cap": "marketCap",
+    "pe_ratio": "trailingPE",
+    "fifty_two_week_high": "fiftyTwoWeekHigh",
+    "fifty_two_week_low": "fiftyTwoWeekLow",
+    "sector": "sector",
+    "industry": "industry",
+}
+
+CHECK_INTERVAL_SECONDS = 3600
+BATCH_PAUSE_SECONDS = 2.0
+# Consecutive failed refreshes after which a symbol's row is dropped (delisted or bogus)
+MAX_FAILURES = 3
+
+# Failed refreshes per ticker since its last success (refresh leader only)
+_failures: Dict[str, int] = {}
+
+
+def fundamentals_lock_path() -> str:
+    return settings.FUNDAMENTALS_LOCK_FILE or os.path.join(tempfile.gettempdir(), "matrix_forge_fundamentals.lock")
+
+
+def fetch_fundamentals(ticker: str, retries: int = 0) -> Optional[dict]:
+    """
+    One upstream .info call, reduced to the stored fields. None when the
+    symbol is unknown upstream (.info carries no quote type).
+    """
+    info = upstreams.yfinance.call(lambda: yf.Ticker(ticker).info, retries=retries)
+    if info.get("quoteType") in (None, "NONE"):
+        return None
+    row = {field: info.get(key) for field, key in INFO_KEYS.items()}
+    row["ticker"] = ticker
+    row["updated_at"] = time.time()
+    return row
+
+
+def refresh_fundamentals(tickers: List[str]) -> int:
+    """
+    Fetch and store a batch. Failures are retried on the next pass; a ticker
+    that fails MAX_FAILURES passes in a row is dropped from the store.
+    """
+    rows, dropped = [], []
+    for ticker in tickers:
+        try:
+            row = fetch_fundamentals(ticker, retries=2)
+        except UpstreamUnavailable as e:
+            logger.warning(f"Fundamentals refresh paused: {e}")
+            break
+        except Exception as e:
+            logger.error(f"Fundamentals fetch failed for {ticker}: {e}")
+            row = None
+        if row is not None:
+            rows.append(row)
+            _failures.pop(ticker, None)
+            continue
+        _failures[ticker] = _failures.get(ticker, 0) + 1
+        if _failures[ticker] >= MAX_FAILURES:
+            dropped.append(ticker)
+            del _failures[ticker]
+    upsert_fundamentals(rows)
+    if dropped:
+        logger.warning(f"Dropping fundamentals for symbols that keep failing: {', '.join(dropped)}")
+        delete_fundamentals(dropped)
+    return len(rows)
+
+
+def load_fundamentals(ticker: str) -> Optional[dict]:
+    """
+    Stored fundamentals for a ticker, whatever their age (the background job keeps
+    them fresh). A ticker seen for the first time is fetched once and, only if
+    upstream knows the symbol, stored, which also enrols it in the daily refresh.
+    """
+    row = get_fundamentals(ticker)
+    if row is None and not ticker.startswith("^"):
+        row = fetch_fundamentals(ticker)
+        if row is not None:
+            upsert_fundamentals([row])
+    return row
+
+
+async def run_fundamentals_refresh():
+    """
+    Background job: every hour, refresh fundamentals older than FUNDAMENTALS_MAX_AGE_HOURS
+    in small batches. One worker per host runs it, elected with a lock file.
+    """
+    lock = FileLeaderLock(fundamentals_lock_path())
+    while True:
+        try:
+            try:
+                leader = lock.try_acquire()
+            except ImportError:
+                leader = True  # no fcntl: single-process deployment
+            if leader:
+                max_age = settings.FUNDAMENTALS_MAX_AGE_HOURS * 3600
+                while True:
+                    due = await asyncio.to_thread(
+                        get_fundamentals_due, max_age, time.time(), settings.FUNDAMENTALS_BATCH_SIZE
+                    )
+                    if not due:
+                        break
+                    stored = await asyncio.to_thread(refresh_fundamentals, due)
+                    logger.info(f"Refreshed fundamentals for {stored}/{len(due)} tickers")
+                    if not stored:
+                        break  # upstream is failing; try again next pass
+                    await asyncio.sleep(BATCH_PAUSE_SECONDS)
+        except Exception as e:
+            logger.error(f"Fundamentals refresh error: {e}")
+        await asyncio.sleep(CHECK_INTERVAL_SECONDS)
+
+
+refresh_task = None
+
+def start_fundamentals_refresh():
+    global refresh_task
+    if refresh_task is None:
+        refresh_task = asyncio.create_task(run_fundamentals_refresh())
+        logger.info("Fundamentals refresh task initialized")
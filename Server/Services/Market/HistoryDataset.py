@@ -0,0 +1,82 @@
+import os
+import tempfile
+from typing import Dict, List, Optional
+import numpy as np
+import pandas as pd
+
+# One compressed .npz per ticker holding parallel daily columns:
+#   t int64 (epoch seconds, bar date at 00:00 UTC), o/h/l/c/v float64
+COLUMNS = ("t", "o", "h", "l", "c", "v")
+FIELDS = {"o": "Open", "h": "High", "l": "Low", "c": "Close", "v": "Volume"}
+SUFFIX = ".npz"
+
+
+def _path(directory: str, ticker: str) -> str:
+    # '^NSEI' and 'M&M.NS' are valid file names; only path separators need escaping
+    return os.path.join(directory, ticker.replace("/", "_") + SUFFIX)
+
+
+def frame_to_columns(frame: pd.DataFrame) -> Dict[str, np.ndarray]:
+    """yfinance OHLCV frame -> dataset columns, dropping bars without a close."""
+    frame = frame.dropna(subset=["Close"])
+    index = pd.DatetimeIndex(frame.index)
+    if index.tz is not None:
+        index = index.tz_localize(None)
+    columns = {"t": index.normalize().as_unit("s").asi8.astype(np.int64)}
+    for key, field in FIELDS.items():
+        values = frame[field] if field in frame else pd.Series(np.nan, index=frame.index)
+        columns[key] = values.to_numpy(dtype=np.float64)
+    return columns
+
+
+def split_download(data: pd.DataFrame, tickers: List[str]) -> Dict[str, pd.DataFrame]:
+    """Per-ticker frames from a yf.download(..., group_by="ticker") result."""
+    if not isinstance(data.columns, pd.MultiIndex):
+        return {tickers[0]: data} if len(tickers) == 1 else {}
+    available = set(data.columns.get_level_values(0))
+    return {t: data[t] for t in tickers if t in available}
+
+
+def merge_columns(existing: Optional[Dict[str, np.ndarray]], new: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    """Union by date; bars in `new` replace existing bars for the same date."""
+    if existing is None or not len(existing["t"]):
+        return new
+    t = np.concatenate([new["t"], existing["t"]])
+    # np.unique keeps the first occurrence, i.e. the new bar
+    _, first = np.unique(t, return_index=True)
+    return {k: np.concatenate([new[k], existing[k]])[first] for k in COLUMNS}
+
+
+def read_history(directory: str, ticker: str) -> Optional[Dict[str, np.ndarray]]:
+    path = _path(directory, ticker)
+    if not os.path.exists(path):
+        return None
+    with np.load(path) as data:
+        return {k: data[k] for k in COLUMNS}
+
+
+def write_history(directory: str, ticker: str, columns: Dict[str, np.ndarray]):
+    """Atomic replace, so readers never see a partially written file."""
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            np.savez_compressed(f, **{k: columns[k] for k in COLUMNS})
+        os.replace(tmp, _path(directory, ticker))
+    except BaseException:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+        raise
+
+
+def list_tickers(directory: str) -> List[str]:
+    if not os.path.isdir(directory):
+        return []
+    return sorted(name[:-len(SUFFIX)] for name in os.listdir(directory) if name.endswith(SUFFIX))
+
+
+def last_bar_time(directory: str, ticker: str) -> Optional[int]:
+    history = read_history(directory, ticker)
+    if history is None or not len(history["t"]):
+        return None
+    return int(history["t"][-1])
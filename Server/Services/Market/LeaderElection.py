@@ -0,0 +1,45 @@
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+
+class FileLeaderLock:
+    """
+    Non-blocking exclusive lock on a local file. Exactly one process on the host
+    holds it; the OS releases it if that process dies, so another worker can
+    take over on its next attempt.
+    """
+    def __init__(self, path: str):
+        self.path = path
+        self.fd = None
+
+    @property
+    def is_leader(self) -> bool:
+        return self.fd is not None
+
+    def try_acquire(self) -> bool:
+        if self.fd is not None:
+            return True
+        import fcntl  # POSIX only; not needed for single-process deployments
+
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            os.close(fd)
+            return False
+        os.ftruncate(fd, 0)
+        os.write(fd, str(os.getpid()).encode())
+        self.fd = fd
+        logger.info(f"Acquired stream leader lock {self.path} (pid {os.getpid()})")
+        return True
+
+    def release(self):
+        if self.fd is None:
+            return
+        import fcntl
+
+        fcntl.flock(self.fd, fcntl.LOCK_UN)
+        os.close(self.fd)
+        self.fd = None
@@ -0,0 +1,89 @@
+import math
+import zlib
+from typing import Dict, Iterable, List, Optional
+from Services.Market.TradingCalendar import market_phase
+
+# Per-poll absolute return considered "normal" (5 bps); quieter tickers poll slower
+REFERENCE_MOVE = 0.0005
+VOLATILITY_ALPHA = 0.2
+
+
+class PollScheduler:
+    """
+    Assigns each tracked ticker its own poll interval from subscriber count,
+    recent volatility and the NSE session phase, and staggers due times so
+    fetches are spread across the interval instead of bursting together.
+    Times are monotonic seconds supplied by the caller.
+    """
+    def __init__(
+        self,
+        base_interval: float = 5.0,
+        min_interval: float = 2.0,
+        max_interval: float = 60.0,
+        off_hours_interval: float = 300.0,
+        idle_multiplier: float = 6.0,
+    ):
+        self.base_interval = base_interval
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.off_hours_interval = off_hours_interval
+        self.idle_multiplier = idle_multiplier
+        self.next_due: Dict[str, float] = {}
+        self.last_price: Dict[str, float] = {}
+        self.volatility: Dict[str, float] = {}
+
+    def interval_for(self, ticker: str, subscribers: int, phase: str) -> float:
+        if phase == "closed":
+            return self.off_hours_interval
+        if subscribers <= 0:
+            # Only tracked for the watchlist table
+            interval = self.base_interval * self.idle_multiplier
+        else:
+            interval = self.base_interval / (1.0 + math.log10(subscribers))
+        vol = self.volatility.get(ticker)
+        if vol is not None:
+            interval *= min(max(REFERENCE_MOVE / max(vol, 1e-9), 0.5), 2.0)
+        if phase != "open":
+            # Pre-open and post-close prices barely move
+            interval *= 3
+        return min(max(interval, self.min_interval), self.max_interval)
+
+    def _phase_offset(self, ticker: str) -> float:
+        """Stable per-ticker offset in [0, base_interval) used to spread first polls."""
+        return (zlib.crc32(ticker.encode()) % 1000) / 1000.0 * self.base_interval
+
+    def due(self, tickers: Iterable[str], now: float) -> List[str]:
+        """Tickers whose poll is due; newly tracked ones are scheduled, dropped ones forgotten."""
+        tracked = set(tickers)
+        for ticker in list(self.next_due):
+            if ticker not in tracked:
+                self._forget(ticker)
+        due = []
+        for ticker in tracked:
+            when = self.next_due.get(ticker)
+            if when is None:
+                when = self.next_due[ticker] = now + self._phase_offset(ticker) * 0.2
+            if when <= now:
+                due.append(ticker)
+        return due
+
+    def record(self, ticker: str, price: Optional[float], now: float, subscribers: int, phase: Optional[str] = None):
+        """Update volatility from the new price and schedule the next poll."""
+        if price:
+            prev = self.last_price.get(ticker)
+            if prev:
+                move = abs(price / prev - 1.0)
+                vol = self.volatility.get(ticker)
+                self.volatility[ticker] = move if vol is None else vol + VOLATILITY_ALPHA * (move - vol)
+            self.last_price[ticker] = price
+        interval = self.interval_for(ticker, subscribers, phase or market_phase())
+        # Keep each ticker on its own phase within the interval so polls don't realign
+        self.next_due[ticker] = now + interval + (self._phase_offset(ticker) % (interval * 0.1))
+
+    def next_wakeup(self) -> Optional[float]:
+        return min(self.next_due.values()) if self.next_due else None
+
+    def _forget(self, ticker: str):
+        self.next_due.pop(ticker, None)
+        self.last_price.pop(ticker, None)
+        self.volatility.pop(ticker, None)
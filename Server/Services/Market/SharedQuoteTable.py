@@ -0,0 +1,227 @@
+import logging
+import time
+from multiprocessing import shared_memory
+from typing import Dict, Iterable, List, Optional, Tuple
+import numpy as np
+from Config.SystemConfig import get_settings
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# Fixed layout, all fields 8-byte aligned:
+#   header  uint32[4]          magic (zeroed once retired), version, capacity, count (slots assigned)
+#   pad     to 64 bytes
+#   symbols S32[capacity]      ticker per slot, append-only
+#   seq     uint64[capacity]   seqlock per slot: odd while a write is in progress
+#   last, prev_close, ts       float64[capacity] each
+MAGIC = 0x4D414651  # "MAFQ"
+VERSION = 1
+HEADER_BYTES = 64
+SYMBOL_BYTES = 32
+READ_RETRIES = 16
+ATTACH_RETRY_SECONDS = 5.0
+
+
+def _layout_size(capacity: int) -> int:
+    return HEADER_BYTES + capacity * (SYMBOL_BYTES + 8 * 4)
+
+
+def _untrack(shm: shared_memory.SharedMemory):
+    """
+    Keep the block alive when this process exits. The resource tracker would
+    otherwise unlink it, pulling the table out from under the other workers.
+    """
+    try:
+        from multiprocessing import resource_tracker
+        resource_tracker.unregister(shm._name, "shared_memory")
+    except Exception:
+        pass
+
+
+def _unlink(shm: shared_memory.SharedMemory):
+    """Remove the block. unlink() unregisters it from the tracker, so track it again first."""
+    try:
+        from multiprocessing import resource_tracker
+        resource_tracker.register(shm._name, "shared_memory")
+    except Exception:
+        pass
+    shm.unlink()
+
+
+def _retire(name: str):
+    """Mark a leftover block dead for the readers still mapping it, then remove it."""
+    try:
+        shm = shared_memory.SharedMemory(name=name)
+    except FileNotFoundError:
+        return
+    _untrack(shm)
+    if shm.size >= 4:
+        shm.buf[:4] = bytes(4)
+    shm.close()
+    _unlink(shm)
+
+
+class SharedQuoteTable:
+    """
+    Latest quote per symbol in a shared-memory block: written by the price stream
+    leader, read zero-copy by every worker. Each slot is guarded by a seqlock so
+    readers never observe a half-written (last, prev_close, ts) triple.
+    """
+    def __init__(self, shm: shared_memory.SharedMemory, capacity: int):
+        self.shm = shm
+        self.capacity = capacity
+        buf = shm.buf
+        offset = HEADER_BYTES
+        self.header = np.ndarray((4,), dtype=np.uint32, buffer=buf)
+        self.symbols = np.ndarray((capacity,), dtype=f"S{SYMBOL_BYTES}", buffer=buf, offset=offset)
+        offset += capacity * SYMBOL_BYTES
+        self.seq = np.ndarray((capacity,), dtype=np.uint64, buffer=buf, offset=offset)
+        offset += capacity * 8
+        self.last = np.ndarray((capacity,), dtype=np.float64, buffer=buf, offset=offset)
+        offset += capacity * 8
+        self.prev_close = np.ndarray((capacity,), dtype=np.float64, buffer=buf, offset=offset)
+        offset += capacity * 8
+        self.ts = np.ndarray((capacity,), dtype=np.float64, buffer=buf, offset=offset)
+        self.slots: Dict[str, int] = {}
+        self._known = 0
+
+    @classmethod
+    def create(cls, name: str, capacity: int) -> "SharedQuoteTable":
+        """
+        Writer side. A block left by a previous leader that exited without
+        closing it (a crash) is retired and replaced; its readers reattach.
+        """
+        try:
+            shm = shared_memory.SharedMemory(name=name, create=True, size=_layout_size(capacity))
+        except FileExistsError:
+            logger.warning(f"Replacing shared quote table {name} left by a previous leader")
+            _retire(name)
+            shm = shared_memory.SharedMemory(name=name, create=True, size=_layout_size(capacity))
+        _untrack(shm)
+        table = cls(shm, capacity)
+        table.header[:] = (MAGIC, VERSION, capacity, 0)
+        return table
+
+    @classmethod
+    def attach(cls, name: str) -> Optional["SharedQuoteTable"]:
+        """Reader side. Returns None if no leader has created the table yet."""
+        try:
+            shm = shared_memory.SharedMemory(name=name)
+        except FileNotFoundError:
+            return None
+        _untrack(shm)
+        magic, version, capacity, _ = np.ndarray((4,), dtype=np.uint32, buffer=shm.buf)
+        if magic != MAGIC or version != VERSION:
+            logger.error(f"Shared quote table {name} has an unexpected layout")
+            shm.close()
+            return None
+        return cls(shm, int(capacity))
+
+    @property
+    def retired(self) -> bool:
+        """The leader has closed (or replaced) this block; readers should reattach."""
+        return int(self.header[0]) != MAGIC
+
+    def close(self, unlink: bool = False):
+        """
+        Drop this process's mapping. The leader passes unlink=True on shutdown so
+        the block does not outlive the server in /dev/shm, unless a newer leader
+        has already replaced it (the name then belongs to the new block).
+        """
+        unlink = unlink and not self.retired
+        if unlink:
+            self.header[0] = 0
+        # The column views export the buffer; they must go before the mapping can close
+        del self.header, self.symbols, self.seq, self.last, self.prev_close, self.ts
+        self.shm.close()
+        if unlink:
+            _unlink(self.shm)
+
+    def _refresh_slots(self):
+        count = int(self.header[3])
+        for slot in range(self._known, count):
+            self.slots[self.symbols[slot].decode()] = slot
+        self._known = count
+
+    def _slot(self, ticker: str, assign: bool = False) -> Optional[int]:
+        slot = self.slots.get(ticker)
+        if slot is None:
+            self._refresh_slots()
+            slot = self.slots.get(ticker)
+        if slot is None and assign:
+            count = int(self.header[3])
+            encoded = ticker.encode()
+            if count >= self.capacity or len(encoded) > SYMBOL_BYTES:
+                return None
+            # Publish the symbol before bumping count so readers never see an empty slot
+            self.symbols[count] = encoded
+            self.header[3] = count + 1
+            slot = self.slots[ticker] = count
+            self._known = count + 1
+        return slot
+
+    def write_many(self, quotes: Iterable[dict]):
+        for q in quotes:
+            slot = self._slot(q["ticker"], assign=True)
+            if slot is None:
+                logger.warning(f"Shared quote table full or symbol too long: {q['ticker']}")
+                continue
+            # Force odd from whatever is there: a leader that died mid-write leaves the
+            # slot odd, and a blind += 1 would invert the parity for good
+            begin = (int(self.seq[slot]) + 1) | 1
+            self.seq[slot] = begin
+            self.last[slot] = q["price"]
+            self.prev_close[slot] = q["prev_close"] if q["prev_close"] is not None else np.nan
+            self.ts[slot] = q["ts"]
+            self.seq[slot] = begin + 1
+
+    def read(self, ticker: str) -> Optional[Tuple[float, Optional[float], float]]:
+        """(last, prev_close, ts) for a ticker, or None if it has never been written."""
+        slot = self._slot(ticker)
+        if slot is None:
+            return None
+        for _ in range(READ_RETRIES):
+            before = self.seq[slot]
+            if before & 1:
+                continue
+            last, prev_close, ts = float(self.last[slot]), float(self.prev_close[slot]), float(self.ts[slot])
+            if self.seq[slot] == before:
+                if not before:
+                    return None
+                return last, (None if np.isnan(prev_close) else prev_close), ts
+        return None
+
+    def read_many(self, tickers: Iterable[str]) -> Dict[str, Tuple[float, float, float]]:
+        result = {}
+        for ticker in tickers:
+            values = self.read(ticker)
+            if values is not None:
+                result[ticker] = values
+        return result
+
+
+_reader: Optional[SharedQuoteTable] = None
+_last_attach = 0.0
+
+
+def get_quote_table() -> Optional[SharedQuoteTable]:
+    """This worker's handle on the shared table, attached lazily (None if unavailable)."""
+    global _reader, _last_attach
+    if _reader is not None and _reader.retired:
+        _reader.close()
+        _reader = None
+    if _reader is None and settings.QUOTE_SHM_NAME:
+        now = time.monotonic()
+        if now - _last_attach >= ATTACH_RETRY_SECONDS:
+            _last_attach = now
+            _reader = SharedQuoteTable.attach(settings.QUOTE_SHM_NAME)
+    return _reader
+
+
+def read_fresh_quotes(tickers: List[str], max_age: float) -> Dict[str, Tuple[float, float, float]]:
+    """Quotes from the shared table no older than `max_age` seconds."""
+    table = get_quote_table()
+    if table is None:
+        return {}
+    cutoff = time.time() - max_age
+    return {t: v for t, v in table.read_many(tickers).items() if v[2] >= cutoff}
@@ -0,0 +1,193 @@
+import asyncio
+import glob
+import gzip
+import logging
+import os
+import shutil
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, List, Optional
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# One fixed-width, 8-byte aligned record per streamed quote. `batch` numbers the
+# stream cycle the quote was published in, so replay can rebuild the same frames.
+TICK_DTYPE = np.dtype([
+    ("ts", "<f8"),
+    ("batch", "<u4"),
+    ("symbol", "<u4"),
+    ("price", "<f8"),
+    ("prev_close", "<f8"),
+])
+
+SYMBOLS_FILE = "symbols.txt"
+SEGMENT_PREFIX = "ticks-"
+SEGMENT_SUFFIX = ".bin"
+SEALED_SUFFIX = ".bin.gz"
+
+REPLAY_MAX_SPEED = "max"
+
+
+def load_symbols(directory: str) -> List[str]:
+    path = os.path.join(directory, SYMBOLS_FILE)
+    if not os.path.exists(path):
+        return []
+    with open(path, 'r') as f:
+        return [line.rstrip("\n") for line in f]
+
+
+def _segment_day(ts: float) -> str:
+    return datetime.fromtimestamp(ts, tz=timezone.utc).strftime("%Y%m%d")
+
+
+def _seal(paths: List[str]):
+    """Compress finished segments; each uncompressed file is removed once its copy is complete."""
+    for path in paths:
+        try:
+            with open(path, 'rb') as src, gzip.open(path[:-len(SEGMENT_SUFFIX)] + SEALED_SUFFIX, 'wb') as dst:
+                shutil.copyfileobj(src, dst)
+            os.unlink(path)
+        except Exception as e:
+            logger.error(f"Sealing tick segment {path} failed: {e}")
+
+
+def _whole_records(size: int) -> int:
+    """Complete records in `size` bytes; a crash mid-write can leave a partial one at the end."""
+    return size // TICK_DTYPE.itemsize
+
+
+class TickRecorder:
+    """
+    Append-only tick log: one uncompressed, memory-mappable segment per UTC day
+    plus an append-only symbol table. Finished segments are gzip-sealed in the background.
+    """
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self.symbols = {s: i for i, s in enumerate(load_symbols(directory))}
+        self.symbols_file = open(os.path.join(directory, SYMBOLS_FILE), 'a')
+        self.segment_day = None
+        self.segment = None
+        self.sealer: Optional[threading.Thread] = None
+        self.batch = 0
+
+    def _symbol_id(self, ticker: str) -> int:
+        symbol_id = self.symbols.get(ticker)
+        if symbol_id is None:
+            symbol_id = self.symbols[ticker] = len(self.symbols)
+            self.symbols_file.write(ticker + "\n")
+            self.symbols_file.flush()
+        return symbol_id
+
+    def _rotate(self, day: str):
+        if self.segment is not None:
+            self.segment.close()
+        path = os.path.join(self.directory, f"{SEGMENT_PREFIX}{day}{SEGMENT_SUFFIX}")
+        # Every other uncompressed segment is finished: the one just closed, and any
+        # left unsealed by a process that stopped before its day was over
+        finished = [p for p in list_segments(self.directory) if p.endswith(SEGMENT_SUFFIX) and p != path]
+        if finished:
+            self.sealer = threading.Thread(target=_seal, args=(finished,), daemon=True)
+            self.sealer.start()
+        if os.path.exists(path):
+            size = os.path.getsize(path)
+            count = _whole_records(size)
+            if count * TICK_DTYPE.itemsize != size:
+                # Drop a record torn by a crash so appends stay aligned
+                logger.warning(f"Truncating partial tick record at the end of {path}")
+                os.truncate(path, count * TICK_DTYPE.itemsize)
+            if count:
+                # Resuming today's segment after a restart: keep batch numbers increasing
+                last = np.memmap(path, dtype=TICK_DTYPE, mode="r", shape=(count,))[-1]
+                self.batch = max(self.batch, int(last["batch"]) + 1)
+        self.segment = open(path, 'ab')
+        self.segment_day = day
+
+    def append(self, quotes: List[dict]):
+        if not quotes:
+            return
+        day = _segment_day(quotes[0]["ts"])
+        if day != self.segment_day:
+            self._rotate(day)
+        records = np.empty(len(quotes), dtype=TICK_DTYPE)
+        records["batch"] = self.batch
+        records["ts"] = [q["ts"] for q in quotes]
+        records["symbol"] = [self._symbol_id(q["ticker"]) for q in quotes]
+        records["price"] = [q["price"] for q in quotes]
+        records["prev_close"] = [q["prev_close"] if q["prev_close"] is not None else np.nan for q in quotes]
+        self.segment.write(records.tobytes())
+        self.segment.flush()
+        self.batch += 1
+
+    def close(self):
+        if self.segment is not None:
+            self.segment.close()
+            self.segment = None
+        self.symbols_file.close()
+
+
+def open_segment(path: str) -> np.ndarray:
+    """Records of one segment: memory-mapped if uncompressed, decompressed if sealed."""
+    if path.endswith(SEALED_SUFFIX):
+        with gzip.open(path, 'rb') as f:
+            data = f.read()
+        return np.frombuffer(data, dtype=TICK_DTYPE, count=_whole_records(len(data)))
+    count = _whole_records(os.path.getsize(path))
+    if count == 0:
+        return np.empty(0, dtype=TICK_DTYPE)
+    return np.memmap(path, dtype=TICK_DTYPE, mode="r", shape=(count,))
+
+
+def list_segments(path: str) -> List[str]:
+    """A single segment file, or every segment of a log directory in time order."""
+    if os.path.isfile(path):
+        return [path]
+    pattern = os.path.join(path, f"{SEGMENT_PREFIX}*")
+    return sorted(p for p in glob.glob(pattern) if p.endswith((SEGMENT_SUFFIX, SEALED_SUFFIX)))
+
+
+async def replay_ticks(
+    path: str,
+    on_quotes: Callable[[List[dict]], Awaitable[None]],
+    speed: str = "1",
+):
+    """
+    Feed recorded cycles to `on_quotes` in their original grouping.
+    speed is a multiplier of recorded time ("1", "10", ...) or "max" for no delays.
+    """
+    directory = path if os.path.isdir(path) else os.path.dirname(path)
+    symbols = load_symbols(directory)
+    factor: Optional[float] = None if speed == REPLAY_MAX_SPEED else float(speed)
+    prev_ts = None
+    cycles = 0
+    started = time.monotonic()
+    for segment in list_segments(path):
+        records = open_segment(segment)
+        if not len(records):
+            continue
+        # Cycle boundaries are where the batch number changes
+        bounds = np.flatnonzero(np.diff(records["batch"])) + 1
+        for cycle in np.split(records, bounds):
+            ts = float(cycle["ts"][0])
+            if factor and prev_ts is not None and ts > prev_ts:
+                await asyncio.sleep((ts - prev_ts) / factor)
+            else:
+                await asyncio.sleep(0)
+            prev_ts = ts
+            quotes = []
+            for rec_ts, _, symbol, price, prev_close in cycle.tolist():
+                has_prev = prev_close == prev_close and prev_close != 0
+                quotes.append({
+                    "ticker": symbols[symbol],
+                    "price": price,
+                    "prev_close": prev_close if has_prev else None,
+                    "change_pct": ((price - prev_close) / prev_close) * 100 if has_prev else 0.0,
+                    "ts": rec_ts
+                })
+            await on_quotes(quotes)
+            cycles += 1
+    elapsed = time.monotonic() - started
+    logger.info(f"Replay finished: {cycles} cycles in {elapsed:.2f}s")
+    return cycles
@@ -0,0 +1,76 @@
+import json
+import os
+from datetime import date, datetime, time, timedelta, timezone
+from functools import lru_cache
+from typing import Optional, Set
+from Config.SystemConfig import get_settings
+
+settings = get_settings()
+
+# IST has no DST, so a fixed offset avoids depending on the tz database
+IST = timezone(timedelta(hours=5, minutes=30), "IST")
+
+PRE_OPEN_START = time(9, 0)
+MARKET_OPEN = time(9, 15)
+MARKET_CLOSE = time(15, 30)
+POST_CLOSE_END = time(16, 0)
+
+# NSE equity segment trading holidays (weekdays only). Refresh yearly from the
+# NSE holiday circular, or point NSE_HOLIDAYS_FILE at a JSON list of ISO dates.
+NSE_HOLIDAYS = {
+    # 2025
+    "2025-02-26", "2025-03-14", "2025-03-31", "2025-04-10", "2025-04-14",
+    "2025-04-18", "2025-05-01", "2025-08-15", "2025-08-27", "2025-10-02",
+    "2025-10-21", "2025-10-22", "2025-11-05", "2025-12-25",
+    # 2026
+    "2026-01-26", "2026-03-03", "2026-03-26", "2026-03-31", "2026-04-03",
+    "2026-04-14", "2026-05-01", "2026-05-28", "2026-06-26", "2026-09-14",
+    "2026-10-02", "2026-10-20", "2026-11-10", "2026-11-24", "2026-12-25",
+}
+
+
+@lru_cache()
+def get_holidays() -> Set[date]:
+    holidays = set(NSE_HOLIDAYS)
+    if settings.NSE_HOLIDAYS_FILE and os.path.exists(settings.NSE_HOLIDAYS_FILE):
+        with open(settings.NSE_HOLIDAYS_FILE, 'r') as f:
+            holidays.update(json.load(f))
+    return {date.fromisoformat(d) for d in holidays}
+
+
+def is_trading_day(day: date) -> bool:
+    return day.weekday() < 5 and day not in get_holidays()
+
+
+def market_phase(now: Optional[datetime] = None) -> str:
+    """
+    NSE session phase at `now`: pre_open (09:00-09:15), open (09:15-15:30),
+    post_close (15:30-16:00) or closed.
+    """
+    now = (now or datetime.now(IST)).astimezone(IST)
+    if not is_trading_day(now.date()):
+        return "closed"
+    t = now.time()
+    if PRE_OPEN_START <= t < MARKET_OPEN:
+        return "pre_open"
+    if MARKET_OPEN <= t < MARKET_CLOSE:
+        return "open"
+    if MARKET_CLOSE <= t < POST_CLOSE_END:
+        return "post_close"
+    return "closed"
+
+
+def in_session(ts: float) -> bool:
+    """Whether epoch seconds `ts` falls in the continuous trading session."""
+    return market_phase(datetime.fromtimestamp(ts, IST)) == "open"
+
+
+def next_session_start(now: Optional[datetime] = None) -> datetime:
+    """Start of the next pre-open session strictly after `now`."""
+    now = (now or datetime.now(IST)).astimezone(IST)
+    day = now.date()
+    if now.time() >= PRE_OPEN_START:
+        day += timedelta(days=1)
+    while not is_trading_day(day):
+        day += timedelta(days=1)
+    return datetime.combine(day, PRE_OPEN_START, tzinfo=IST)
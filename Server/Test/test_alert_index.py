@@ -0,0 +1,71 @@
+import sys
+import os
+
+# Add Server to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import asyncio
+from Controller.AlertController import add_alert
+from Models.StockModels import AlertCreate
+from Services.Market.AlertIndex import AlertIndex
+from Services.Analytics.Indicators import latest_rsi
+
+
+def test_only_crossed_thresholds_fire_once():
+    index = AlertIndex()
+    index.add(1, "TCS.NS", "price", "above", 4000)
+    index.add(2, "TCS.NS", "price", "above", 4100)
+    index.add(3, "TCS.NS", "price", "below", 3900)
+    index.add(4, "TCS.NS", "price", "above", 3950)  # already below the first price
+
+    assert index.evaluate("TCS.NS", "price", 3990) == []  # first observation never fires
+    fired = index.evaluate("TCS.NS", "price", 4050)
+    assert [a.id for a in fired] == [1]
+    assert index.evaluate("TCS.NS", "price", 4000) == []
+    assert index.evaluate("TCS.NS", "price", 4050) == []  # one-shot
+    fired = index.evaluate("TCS.NS", "price", 3800)
+    # Falling moves only check "below" rules
+    assert [(a.id, a.direction) for a in fired] == [(3, "below")]
+    assert sorted(index.rules) == [2, 4] and index.tickers() == {"TCS.NS"}
+
+
+def test_remove_and_equal_thresholds():
+    index = AlertIndex()
+    for alert_id in range(5):
+        index.add(alert_id, "INFY.NS", "rsi", "below", 30)
+    index.remove(2)
+    index.evaluate("INFY.NS", "rsi", 45)
+    fired = index.evaluate("INFY.NS", "rsi", 28)
+    assert sorted(a.id for a in fired) == [0, 1, 3, 4]
+    assert len(index) == 0 and index.tickers() == set()
+
+
+def test_latest_rsi():
+    assert latest_rsi([1.0] * 5) is None
+    rising = [float(i) for i in range(20)]
+    assert latest_rsi(rising) == 100.0
+    zigzag = [10.0, 11.0] * 10
+    assert abs(latest_rsi(zigzag) - 50.0) < 1e-9
+
+
+def test_bulk_add_matches_single_adds():
+    rows = [(i, "TCS.NS", "price", "above" if i % 2 else "below", float(4000 + (i * 37) % 200)) for i in range(400)]
+    bulk, single = AlertIndex(), AlertIndex()
+    bulk.add_many(rows[:150])
+    bulk.add_many(rows[100:] + [rows[0]])  # overlapping re-sync is idempotent
+    for row in rows:
+        single.add(*row)
+    assert bulk.rules == single.rules
+    for direction in ("above", "below"):
+        book, expected = bulk.books[("TCS.NS", "price")][direction], single.books[("TCS.NS", "price")][direction]
+        assert book.thresholds == sorted(book.thresholds)
+        assert (book.thresholds, book.ids) == (expected.thresholds, expected.ids)
+    bulk.evaluate("TCS.NS", "price", 4100)
+    single.evaluate("TCS.NS", "price", 4100)
+    assert bulk.evaluate("TCS.NS", "price", 4300) == single.evaluate("TCS.NS", "price", 4300)
+
+
+def test_create_rejects_non_finite_or_non_positive_prices():
+    for threshold in (float("nan"), float("inf"), 0.0, -5.0):
+        response = asyncio.run(add_alert(AlertCreate(ticker="TCS.NS", direction="above", threshold=threshold)))
+        assert response.status_code == 400
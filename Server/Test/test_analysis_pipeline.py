@@ -0,0 +1,169 @@
+import sys
+import os
+import asyncio
+import time
+
+# Add Server to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+import pandas as pd
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+import Controller.StockController as stock_controller
+import Services.Analytics.AnalysisPipeline as pipeline
+from Utils.StaleCache import StaleWhileRevalidateCache
+
+
+def make_history(days=120):
+    closes = 100 + np.sin(np.arange(days) / 5.0) * 5
+    return pd.DataFrame({"Close": closes}, index=pd.date_range("2024-01-01", periods=days))
+
+
+def analyze(budget):
+    """Result and elapsed seconds, measured inside the loop (asyncio.run also waits for leftover threads)."""
+    async def scenario():
+        started = time.monotonic()
+        result = await pipeline.analyze_ticker("X.NS", budget=budget)
+        return result, time.monotonic() - started
+    return asyncio.run(scenario())
+
+
+@pytest.fixture
+def stages(monkeypatch):
+    delays = {"history": 0.0, "news": 0.0, "fundamentals": 0.0, "llm": 0.0}
+
+    def slow(stage, value):
+        def run(*args):
+            time.sleep(delays[stage])
+            return value
+        return run
+
+    monkeypatch.setattr(pipeline, "fetch_history", slow("history", make_history()))
+    monkeypatch.setattr(pipeline, "fetch_news", slow("news", [{"title": "Shares surge to record high", "source": "X"}]))
+    monkeypatch.setattr(pipeline, "fetch_fundamentals_view", slow("fundamentals", {"sector": "Energy"}))
+    monkeypatch.setattr(pipeline, "llm_analysis", slow("llm", {"signal": "BUY", "reasoning": ["r"] * 5}))
+    monkeypatch.setattr(pipeline.settings, "ANALYSIS_LLM_MIN_SECONDS", 0.2)
+    return delays
+
+
+def test_independent_stages_run_concurrently(stages):
+    stages.update(history=0.2, news=0.2, fundamentals=0.2)
+    result, elapsed = analyze(2.0)
+    assert elapsed < 0.5
+    assert result["signal"] == "BUY" and result["fundamentals"] == {"sector": "Energy"}
+    assert result["sentiment"]["source"] == "lexicon" and result["sentiment"]["label"] == "Bullish"
+    assert {s: result["timings"][s]["status"] for s in ("history", "news", "llm", "fundamentals")} == {
+        "history": "ok", "news": "ok", "llm": "ok", "fundamentals": "ok"
+    }
+
+
+def test_late_stages_degrade_within_deadline(stages):
+    stages.update(news=2.0, llm=2.0, fundamentals=2.0)
+    result, elapsed = analyze(0.6)
+    assert elapsed < 0.8
+    timings = result["timings"]
+    assert timings["news"]["status"] == "timeout"
+    assert timings["llm"]["status"] == "timeout"
+    assert timings["fundamentals"]["status"] == "timeout"
+    # Technical fallback instead of the LLM verdict
+    assert result["reasoning"][0].startswith("AI connection failed")
+    assert result["fundamentals"]["sector"] == "N/A"
+
+
+def test_llm_skipped_when_budget_is_spent(stages):
+    stages.update(history=0.5)
+    result, _ = analyze(0.6)
+    assert result["timings"]["llm"]["status"] == "skipped"
+    assert result["signal"] in ("BUY", "SELL", "HOLD")
+    # Lexicon sentiment stands in for the LLM's reading
+    assert result["reasoning"][-1].startswith("News sentiment is Bullish")
+
+
+def test_history_timeout_raises(stages):
+    stages.update(history=1.0)
+    with pytest.raises(pipeline.AnalysisTimeout):
+        analyze(0.2)
+
+
+def test_batch_streams_in_completion_order_and_shares_fetches(stages, monkeypatch):
+    calls = {"download": 0, "history": [], "news": []}
+
+    def download(tickers):
+        calls["download"] += 1
+        return {t: make_history() for t in tickers if t != "MISSING.NS"}
+
+    def history(ticker):
+        calls["history"].append(ticker)
+        return make_history() if ticker == "MISSING.NS" else make_history().iloc[:0]
+
+    def news(ticker):
+        calls["news"].append(ticker)
+        time.sleep(0.05)
+        return [{"title": "Shares surge to record high", "source": "X"}]
+
+    def llm(ticker, *args):
+        time.sleep(0.3 if ticker == "SLOW.NS" else 0.0)
+        return {"signal": "HOLD", "reasoning": ["r"] * 5}
+
+    monkeypatch.setattr(pipeline, "download_histories", download)
+    monkeypatch.setattr(pipeline, "fetch_history", history)
+    monkeypatch.setattr(pipeline, "fetch_news", news)
+    monkeypatch.setattr(pipeline, "llm_analysis", llm)
+
+    async def scenario():
+        return [line async for line in pipeline.analyze_batch(
+            ["SLOW.NS", "RELIANCE.NS", "RELIANCE.BO", "MISSING.NS"], concurrency=4
+        )]
+
+    lines = asyncio.run(scenario())
+    assert [line["status"] for line in lines] == ["ok"] * 4
+    assert lines[-1]["ticker"] == "SLOW.NS"
+    # One batch download, an individual fetch only for the ticker it missed
+    assert calls["download"] == 1 and calls["history"] == ["MISSING.NS"]
+    # Both RELIANCE listings share one news query
+    assert sorted(calls["news"]) == ["MISSING.NS", "RELIANCE.NS", "SLOW.NS"]
+
+
+def test_stage_timings_measure_each_stage(stages):
+    stages.update(history=0.2, news=0.05, fundamentals=0.0, llm=0.2)
+    result, _ = analyze(2.0)
+    ms = {stage: timing["ms"] for stage, timing in result["timings"].items()}
+    # Each stage is clocked from its own start to its own completion,
+    # not from the request start to the moment the pipeline awaited it
+    assert 180 <= ms["history"] < 300
+    assert 40 <= ms["news"] < 150
+    assert ms["fundamentals"] < 100
+    assert 180 <= ms["llm"] < 300
+    assert ms["total"] >= 380
+
+
+def test_batch_reads_and_fills_the_analysis_cache(stages, monkeypatch):
+    calls = {"download": [], "llm": []}
+
+    def download(tickers):
+        calls["download"].append(list(tickers))
+        return {t: make_history() for t in tickers}
+
+    def llm(ticker, *args):
+        calls["llm"].append(ticker)
+        return {"signal": "HOLD", "reasoning": ["r"] * 5}
+
+    monkeypatch.setattr(pipeline, "download_histories", download)
+    monkeypatch.setattr(pipeline, "llm_analysis", llm)
+    monkeypatch.setattr(stock_controller, "analysis_cache", StaleWhileRevalidateCache(60, 600))
+    app = FastAPI()
+    app.include_router(stock_controller.router, prefix="/api/stock")
+    client = TestClient(app)
+
+    assert client.get("/api/stock/TCS.NS/analysis").json()["data"]["signal"] == "HOLD"
+    lines = client.post("/api/stock/analysis/batch", json={"tickers": ["TCS.NS", "INFY.NS"]}).text.splitlines()
+    assert len(lines) == 2 and all('"status":"ok"' in line for line in lines)
+    # TCS.NS came from the single-ticker request's cache entry
+    assert calls["llm"] == ["TCS.NS", "INFY.NS"]
+    assert client.get("/api/stock/INFY.NS/analysis").headers["X-Cache"] == "HIT"
+
+    # A fully cached batch neither downloads history nor calls the LLM
+    client.post("/api/stock/analysis/batch", json={"tickers": ["INFY.NS", "TCS.NS"]})
+    assert calls["llm"] == ["TCS.NS", "INFY.NS"] and len(calls["download"]) == 1
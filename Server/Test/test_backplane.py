@@ -0,0 +1,76 @@
+import sys
+import os
+import asyncio
+
+# Add Server to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pytest
+from Services.Market.Backplane import Backplane, LocalBackplane, UnixSocketBackplane
+from Services.Market.LeaderElection import FileLeaderLock
+
+
+def test_backplane_is_abstract():
+    with pytest.raises(TypeError):
+        Backplane()
+    assert not LocalBackplane().needs_election
+
+
+def test_leader_lock_handoff(tmp_path):
+    path = str(tmp_path / "stream.lock")
+    first, second = FileLeaderLock(path), FileLeaderLock(path)
+    assert first.try_acquire() and first.is_leader
+    assert first.try_acquire()  # re-entrant for the holder
+    assert not second.try_acquire() and not second.is_leader
+    with open(path) as f:
+        assert f.read() == str(os.getpid())
+
+    first.release()
+    assert not first.is_leader
+    assert second.try_acquire()
+
+    # A holder that dies without releasing: the OS drops the lock with its descriptor
+    os.close(second.fd)
+    second.fd = None
+    assert first.try_acquire()
+    first.release()
+
+
+async def wait_until(predicate, timeout=2.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not predicate():
+        assert asyncio.get_running_loop().time() < deadline, "condition not reached"
+        await asyncio.sleep(0.01)
+
+
+def test_unix_socket_publish_and_interest(tmp_path):
+    async def scenario():
+        path = str(tmp_path / "stream.sock")
+        leader = UnixSocketBackplane(path)
+        await leader.serve()
+        received = []
+
+        async def on_quotes(quotes):
+            received.extend(quotes)
+
+        followers = [
+            asyncio.create_task(UnixSocketBackplane(path).follow(on_quotes, lambda: {"TCS.NS": 2, "INFY.NS": 1})),
+            asyncio.create_task(UnixSocketBackplane(path).follow(on_quotes, lambda: {"TCS.NS": 1})),
+        ]
+        await wait_until(lambda: leader.remote_interest() == {"TCS.NS": 3, "INFY.NS": 1})
+
+        await leader.publish([{"ticker": "TCS.NS", "price": 101.5}])
+        await wait_until(lambda: len(received) == 2)
+        assert received == [{"ticker": "TCS.NS", "price": 101.5}] * 2
+
+        # Followers return once the leader goes away, so they can contend for the lock
+        await leader.close()
+        await asyncio.wait_for(asyncio.gather(*followers), 2.0)
+        assert leader.remote_interest() == {}
+
+    asyncio.run(scenario())
+
+
+def test_follow_without_leader_returns(tmp_path):
+    follower = UnixSocketBackplane(str(tmp_path / "missing.sock"))
+    asyncio.run(asyncio.wait_for(follower.follow(None, dict), 1.0))
@@ -0,0 +1,45 @@
+import sys
+import os
+import numpy as np
+import pandas as pd
+
+# Add Server to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from Services.Analytics.Backtest import (
+    SignalParams, rsi_matrix, sma_matrix, signal_matrix, positions_from_signals, run_backtest
+)
+from Services.Analytics.Indicators import rsi_series
+
+
+def random_walk(rows=400, cols=3, seed=1):
+    rng = np.random.default_rng(seed)
+    return 100 * np.exp(np.cumsum(rng.normal(0, 0.02, (rows, cols)), axis=0))
+
+
+def test_indicators_match_pandas():
+    closes = random_walk()
+    ref_rsi = rsi_series(pd.Series(closes[:, 1]), 14).to_numpy()
+    ref_sma = pd.Series(closes[:, 1]).rolling(50).mean().to_numpy()
+    np.testing.assert_allclose(rsi_matrix(closes, 14)[:, 1], ref_rsi, equal_nan=True)
+    np.testing.assert_allclose(sma_matrix(closes, 50)[:, 1], ref_sma, equal_nan=True)
+
+
+def test_hold_carries_previous_position():
+    signal = np.array([[0], [1], [0], [0], [-1], [0], [1]], dtype=np.int8)
+    assert positions_from_signals(signal)[:, 0].tolist() == [0, 1, 1, 1, 0, 0, 1]
+    assert positions_from_signals(signal, allow_short=True)[:, 0].tolist() == [0, 1, 1, 1, -1, -1, 1]
+
+
+def test_uptrend_is_held_without_lookahead():
+    closes = np.linspace(100, 200, 300)[:, None]
+    # A straight line is permanently "overbought", so switch that leg off
+    params = SignalParams(sma_window=20, overbought=101)
+    signal = signal_matrix(closes, params)
+    assert (signal[:19] == 0).all() and (signal[19:] == 1).all()
+    result = run_backtest(closes, params, cost_bps=0)
+    # The first signal is on bar 19, so the position earns from bar 20 on
+    expected = closes[-1, 0] / closes[19, 0] - 1
+    assert abs(result.metrics["total_return"] - expected) < 1e-9
+    assert result.metrics["max_drawdown"] == 0
+    assert result.benchmark["total_return"] > result.metrics["total_return"]
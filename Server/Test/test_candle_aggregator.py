@@ -0,0 +1,84 @@
+import sys
+import os
+
+# Add Server to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from datetime import datetime
+import numpy as np
+import pandas as pd
+from Services.Market.CandleAggregator import CandleAggregator, CandleRing, merge_intraday, session_window
+from Services.Market.TradingCalendar import IST, in_session
+from Utils.HistorySerializer import history_to_columns
+
+
+def quote(ts, price, ticker="TCS.NS"):
+    return {"ticker": ticker, "price": price, "prev_close": 100.0, "ts": ts}
+
+
+def test_ticks_fold_into_bars_and_close_on_next_bucket():
+    agg = CandleAggregator(capacity=10)
+    assert agg.update([quote(60, 100), quote(75, 103), quote(90, 99)]) == []
+    closed = agg.update([quote(125, 101)])
+    one_minute = [b for b in closed if b.interval == "1m"]
+    assert len(one_minute) == 1
+    bar = one_minute[0]
+    assert (bar.t, bar.o, bar.h, bar.l, bar.c, bar.ticks) == (60, 100, 103, 99, 99, 3)
+    # 5m and 15m buckets are still forming
+    assert all(b.interval == "1m" for b in closed)
+
+    columns = history_to_columns(agg.history("TCS.NS", "1m"))
+    assert columns["t"] == [60, 120]
+    assert columns["c"] == [99, 101]
+    assert agg.history("INFY.NS", "1m").empty
+
+
+def test_ring_overwrites_oldest_and_ignores_late_ticks():
+    ring = CandleRing(seconds=60, capacity=3)
+    for minute in range(5):
+        ring.update(minute * 60 + 1, 100 + minute)
+    assert ring.update(60, 1.0) is None
+    bars = ring.snapshot()
+    assert bars[:, 0].tolist() == [120, 180, 240]
+    assert bars[:, 4].tolist() == [102, 103, 104]
+
+
+def ist(day, hour, minute):
+    return datetime(2024, 3, day, hour, minute, tzinfo=IST).timestamp()
+
+
+def streamed(*spans):
+    """1m bars from the stream, one tick per minute over each (start, end) span."""
+    agg = CandleAggregator(capacity=1000)
+    for start, end in spans:
+        agg.update([quote(ts, 100.0) for ts in np.arange(start, end, 60.0)])
+    return agg.history("TCS.NS", "1m")
+
+
+def test_session_window_needs_the_session_open():
+    # Streaming started mid-session: the ring alone would chart a fraction of the day
+    assert session_window(streamed((ist(4, 14, 0), ist(4, 14, 3))), 1) is None
+    full = streamed((ist(4, 9, 15), ist(4, 15, 30)), (ist(5, 9, 15), ist(5, 10, 0)))
+    window = session_window(full, 1)
+    assert len(window) == 45 and window.index[0] == pd.Timestamp(ist(5, 9, 15), unit="s", tz="UTC")
+    assert len(session_window(full, 2)) == 375 + 45
+    assert session_window(full, 5) is None
+
+
+def test_merge_prefers_live_bars_where_they_overlap():
+    live = streamed((ist(4, 14, 0), ist(4, 14, 3)))
+    index = pd.date_range(datetime(2024, 3, 4, 9, 15), periods=6 * 60, freq="1min", tz="Asia/Kolkata")
+    upstream = pd.DataFrame(
+        {"Open": 1.0, "High": 1.0, "Low": 1.0, "Close": 1.0, "Volume": 10, "Dividends": 0.0}, index=index
+    )
+    merged = merge_intraday(upstream, live)
+    assert list(merged.columns) == ["Open", "High", "Low", "Close", "Volume"]
+    assert merged.index.is_monotonic_increasing and len(merged) == 4 * 60 + 45 + 3
+    assert merged["Close"].iloc[-3:].tolist() == [100.0] * 3
+    assert merge_intraday(upstream.iloc[:0], live) is live
+
+
+def test_in_session():
+    assert in_session(ist(4, 10, 0))
+    assert not in_session(ist(4, 9, 5)) and not in_session(ist(4, 16, 0))
+    assert not in_session(ist(9, 11, 0))  # Saturday
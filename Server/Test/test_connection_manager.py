@@ -0,0 +1,175 @@
+import sys
+import os
+import asyncio
+import json
+
+# Add Server to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from Controller.PriceStreamController import ConnectionManager, assemble_price_update, BINARY_HEADER, BINARY_RECORD
+
+
+class FakeSocket:
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.sent = []
+        self.closed_with = None
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, message):
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        self.sent.append(json.loads(message))
+
+    async def send_bytes(self, message):
+        self.sent.append(message)
+
+    async def close(self, code=1000):
+        self.closed_with = code
+
+
+def update(ticker, price):
+    return {"ticker": ticker, "price": price, "change": "0.0%", "positive": True}
+
+
+def queued_frame(item):
+    """Queue items are ready text frames or lists of StreamUpdate assembled at send time."""
+    if isinstance(item, str):
+        return json.loads(item)
+    return json.loads(assemble_price_update([u.fragment for u in item]))
+
+
+def run_cycles(policy, cycles=10, max_queue=4):
+    """Broadcast to one fast and one stalled client; return what each one saw."""
+    async def scenario():
+        manager = ConnectionManager(max_queue=max_queue, policy=policy)
+        fast, slow = FakeSocket(), FakeSocket(delay=10)
+        for ws in (fast, slow):
+            await manager.connect(ws)
+            await manager.subscribe(ws, ["TCS.NS"])
+        for i in range(cycles):
+            await manager.broadcast([update("TCS.NS", 100 + i), update("OTHER.NS", 1)])
+            await asyncio.sleep(0)
+        await asyncio.sleep(0.01)
+        channel = manager.active_connections.get(slow)
+        backlog = [queued_frame(item) for item in channel.queue] if channel else None
+        for ws in list(manager.active_connections):
+            manager.disconnect(ws)
+        return fast, slow, backlog
+    return asyncio.run(scenario())
+
+
+def test_slow_client_does_not_block_fast_client():
+    fast, slow, backlog = run_cycles("drop_oldest")
+    assert len(fast.sent) == 10
+    assert all(u["ticker"] == "TCS.NS" for m in fast.sent for u in m["data"])
+    # Slow writer is stuck on its first send; the backlog is bounded and keeps the newest
+    assert len(backlog) == 4
+    assert backlog[-1]["data"][0]["price"] == 109
+
+
+def test_disconnect_policy_drops_slow_client():
+    fast, slow, backlog = run_cycles("disconnect")
+    assert backlog is None
+    assert slow.closed_with == 1013
+    assert len(fast.sent) == 10
+
+
+def test_coalesce_policy_keeps_latest_price():
+    async def scenario():
+        manager = ConnectionManager(max_queue=4, policy="coalesce")
+        ws = FakeSocket()
+        await manager.connect(ws)
+        await manager.subscribe(ws, ["TCS.NS"])
+        # No yield between cycles: the writer only sees the latest value
+        for i in range(5):
+            await manager.broadcast([update("TCS.NS", 100 + i)])
+        await asyncio.sleep(0.01)
+        manager.disconnect(ws)
+        return ws
+    ws = asyncio.run(scenario())
+    assert ws.sent == [{"type": "PRICE_UPDATE", "data": [update("TCS.NS", 104)]}]
+
+
+def test_inverted_index_follows_subscriptions():
+    async def scenario():
+        manager = ConnectionManager()
+        a, b = FakeSocket(), FakeSocket()
+        await manager.connect(a)
+        await manager.connect(b)
+        await manager.subscribe(a, ["TCS.NS", "INFY.NS"])
+        await manager.subscribe(b, ["TCS.NS"])
+        await manager.unsubscribe(a, ["TCS.NS"])
+        index = {t: set(s) for t, s in manager.subscribers.items()}
+        await manager.broadcast([update("TCS.NS", 1), update("INFY.NS", 2), update("^NSEI", 3)])
+        await asyncio.sleep(0.01)
+        manager.disconnect(b)
+        remaining = {t: set(s) for t, s in manager.subscribers.items()}
+        manager.disconnect(a)
+        return a, b, index, remaining
+    a, b, index, remaining = asyncio.run(scenario())
+    assert index == {"TCS.NS": {b}, "INFY.NS": {a}}
+    assert remaining == {"INFY.NS": {a}}
+    assert [u["ticker"] for u in a.sent[0]["data"]] == ["^NSEI", "INFY.NS"]
+    assert [u["ticker"] for u in b.sent[0]["data"]] == ["^NSEI", "TCS.NS"]
+
+
+def test_delta_mode_sends_only_changes_and_snapshots_on_subscribe():
+    async def scenario():
+        manager = ConnectionManager()
+        feeder, ws = FakeSocket(), FakeSocket()
+        await manager.connect(feeder)
+        await manager.subscribe(feeder, ["TCS.NS"])
+        await manager.broadcast([update("TCS.NS", 100), update("^NSEI", 1)])
+        await manager.connect(ws, mode="delta")
+        await manager.subscribe(ws, ["TCS.NS"])
+        await asyncio.sleep(0.01)
+        await manager.broadcast([update("TCS.NS", 100), update("^NSEI", 2)])
+        await asyncio.sleep(0.01)
+        await manager.broadcast([update("TCS.NS", 100), update("^NSEI", 2)])
+        await asyncio.sleep(0.01)
+        for s in list(manager.active_connections):
+            manager.disconnect(s)
+        return ws
+    ws = asyncio.run(scenario())
+    assert ws.sent[0] == {"type": "HELLO", "data": {"mode": "delta", "encoding": "json"}}
+    frames = [[(u["ticker"], u["price"]) for u in m["data"]] for m in ws.sent[1:]]
+    # Snapshot (index + subscribed ticker), then only the index move, then nothing
+    assert sorted(frames[0]) == [("TCS.NS", 100), ("^NSEI", 1)]
+    assert frames[1:] == [[("^NSEI", 2)]]
+
+
+def test_binary_encoding_announces_symbols_then_packs_records():
+    async def scenario():
+        manager = ConnectionManager()
+        ws = FakeSocket()
+        await manager.connect(ws, encoding="binary")
+        await manager.subscribe(ws, ["TCS.NS"])
+        await manager.broadcast([update("TCS.NS", 3512.5)])
+        await asyncio.sleep(0.01)
+        manager.disconnect(ws)
+        return ws
+    ws = asyncio.run(scenario())
+    hello, symbols, frame = ws.sent
+    assert symbols == {"type": "SYMBOLS", "data": {"0": "TCS.NS"}}
+    frame_type, count = BINARY_HEADER.unpack_from(frame, 0)
+    assert (frame_type, count) == (1, 1)
+    assert BINARY_RECORD.unpack_from(frame, BINARY_HEADER.size) == (0, 3512.5, 0.0)
+
+
+def test_binary_records_take_symbol_ids_beyond_uint16():
+    async def scenario():
+        manager = ConnectionManager()
+        manager.symbol_ids = {f"T{i}.NS": i for i in range(70000)}
+        ws = FakeSocket()
+        await manager.connect(ws, encoding="binary")
+        await manager.subscribe(ws, ["TCS.NS"])
+        await manager.broadcast([update("TCS.NS", 3512.5)])
+        await asyncio.sleep(0.01)
+        manager.disconnect(ws)
+        return ws
+    ws = asyncio.run(scenario())
+    assert ws.sent[1] == {"type": "SYMBOLS", "data": {"70000": "TCS.NS"}}
+    assert BINARY_RECORD.unpack_from(ws.sent[2], BINARY_HEADER.size) == (70000, 3512.5, 0.0)
@@ -0,0 +1,99 @@
+import sys
+import os
+import sqlite3
+
+# Add Server to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pytest
+from Config.SystemConfig import get_settings
+import Services.Market.FundamentalsRefresher as refresher
+from Database.FundamentalsStore import (
+    delete_fundamentals, get_fundamentals, get_fundamentals_due, get_sector_changes, upsert_fundamentals
+)
+
+SCHEMA = os.path.join(os.path.dirname(__file__), '..', 'Database', 'schema.sql')
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    path = str(tmp_path / "test.db")
+    with sqlite3.connect(path) as conn, open(SCHEMA) as f:
+        conn.executescript(f.read())
+    monkeypatch.setattr(get_settings(), "DB_FILE", path)
+    monkeypatch.setattr(refresher, "_failures", {})
+    return path
+
+
+def execute(db, sql, *args):
+    with sqlite3.connect(db) as conn:
+        conn.execute(sql, args)
+
+
+def row(ticker, updated_at, sector="Energy", **fields):
+    return {"ticker": ticker, "updated_at": updated_at, "sector": sector, **fields}
+
+
+def test_upsert_get_and_delete(db):
+    upsert_fundamentals([row("RELIANCE.NS", 100.0, market_cap=1e12, pe_ratio=25.0)])
+    upsert_fundamentals([row("RELIANCE.NS", 200.0, market_cap=2e12)])
+    stored = get_fundamentals("RELIANCE.NS")
+    assert stored["market_cap"] == 2e12 and stored["pe_ratio"] is None and stored["updated_at"] == 200.0
+    delete_fundamentals(["RELIANCE.NS"])
+    assert get_fundamentals("RELIANCE.NS") is None
+
+
+def test_due_tickers_missing_first_then_oldest(db):
+    execute(db, "INSERT INTO watchlist (ticker) VALUES (?)", "TCS.NS")
+    execute(db, "INSERT INTO watchlist (ticker) VALUES (?)", "^NSEI")
+    upsert_fundamentals([row("INFY.NS", 500.0), row("HDFCBANK.NS", 100.0), row("ITC.NS", 990.0)])
+    assert get_fundamentals_due(max_age_seconds=100, now=1000.0, limit=10) == ["TCS.NS", "HDFCBANK.NS", "INFY.NS"]
+    assert get_fundamentals_due(max_age_seconds=100, now=1000.0, limit=1) == ["TCS.NS"]
+
+
+def test_sector_changes_need_a_quote(db):
+    upsert_fundamentals([row("RELIANCE.NS", 1.0), row("ONGC.NS", 1.0), row("TCS.NS", 1.0, sector="Technology")])
+    for ticker, change in (("RELIANCE.NS", 2.0), ("ONGC.NS", -1.0)):
+        execute(db, "INSERT INTO quotes_latest (ticker, price, change_pct, updated_at) VALUES (?, 1, ?, 1)", ticker, change)
+    assert get_sector_changes() == [{"name": "Energy", "change": 0.5, "constituents": 2}]
+
+
+class FakeTicker:
+    infos = {
+        "RELIANCE.NS": {"quoteType": "EQUITY", "marketCap": 2e12, "sector": "Energy"},
+        "BOGUS.NS": {"trailingPegRatio": None},
+    }
+
+    def __init__(self, ticker):
+        self.info = self.infos[ticker]
+
+
+def test_unknown_symbols_are_not_stored(db, monkeypatch):
+    monkeypatch.setattr(refresher.yf, "Ticker", FakeTicker)
+    assert refresher.load_fundamentals("BOGUS.NS") is None
+    assert get_fundamentals("BOGUS.NS") is None
+    assert refresher.load_fundamentals("RELIANCE.NS")["market_cap"] == 2e12
+    assert get_fundamentals("RELIANCE.NS")["sector"] == "Energy"
+
+
+def test_refresh_drops_symbols_that_keep_failing(db, monkeypatch):
+    upsert_fundamentals([row("RELIANCE.NS", 1.0), row("DELISTED.NS", 1.0)])
+
+    def fetch(ticker, retries=0):
+        if ticker == "DELISTED.NS":
+            raise ValueError("404 Not Found")
+        return row(ticker, 2.0)
+
+    monkeypatch.setattr(refresher, "fetch_fundamentals", fetch)
+    for _ in range(refresher.MAX_FAILURES - 1):
+        assert refresher.refresh_fundamentals(["RELIANCE.NS", "DELISTED.NS"]) == 1
+        assert get_fundamentals("DELISTED.NS") is not None
+    refresher.refresh_fundamentals(["RELIANCE.NS", "DELISTED.NS"])
+    assert get_fundamentals("DELISTED.NS") is None
+    assert get_fundamentals("RELIANCE.NS")["updated_at"] == 2.0
+    assert refresher._failures == {}
+
+
+def test_lock_path_is_configurable(monkeypatch, tmp_path):
+    monkeypatch.setattr(get_settings(), "FUNDAMENTALS_LOCK_FILE", str(tmp_path / "f.lock"))
+    assert refresher.fundamentals_lock_path() == str(tmp_path / "f.lock")
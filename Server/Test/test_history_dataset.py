@@ -0,0 +1,76 @@
+import sys
+import os
+import pytest
+import numpy as np
+import pandas as pd
+
+# Add Server to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from Services.Market.HistoryDataset import (
+    frame_to_columns, merge_columns, read_history, split_download, write_history, list_tickers
+)
+import backfill
+from backfill import Checkpoint, read_universe
+
+
+def ohlcv(dates, closes, tz="Asia/Kolkata"):
+    index = pd.DatetimeIndex(pd.to_datetime(dates)).tz_localize(tz)
+    closes = np.asarray(closes, dtype=float)
+    return pd.DataFrame({"Open": closes, "High": closes, "Low": closes, "Close": closes, "Volume": 1.0}, index=index)
+
+
+def test_merge_prefers_new_bars_and_roundtrips(tmp_path):
+    old = frame_to_columns(ohlcv(["2026-01-01", "2026-01-02"], [10, 11]))
+    new = frame_to_columns(ohlcv(["2026-01-02", "2026-01-05"], [12, 13]))
+    merged = merge_columns(old, new)
+    assert merged["c"].tolist() == [10, 12, 13]
+    assert np.all(np.diff(merged["t"]) > 0) and merged["t"][0] % 86400 == 0
+
+    write_history(str(tmp_path), "^NSEI", merged)
+    assert list_tickers(str(tmp_path)) == ["^NSEI"]
+    assert read_history(str(tmp_path), "^NSEI")["c"].tolist() == [10, 12, 13]
+
+
+def test_universe_split_and_checkpoint(tmp_path):
+    universe = tmp_path / "universe.csv"
+    universe.write_text("symbol,name\ntcs.ns,TCS\n# comment\nINFY.NS\n\nTCS.NS\n")
+    assert read_universe(str(universe)) == ["TCS.NS", "INFY.NS"]
+
+    frame = pd.concat({"TCS.NS": ohlcv(["2026-01-01"], [1]), "INFY.NS": ohlcv(["2026-01-01"], [2])}, axis=1)
+    assert set(split_download(frame, ["TCS.NS", "INFY.NS", "X.NS"])) == {"TCS.NS", "INFY.NS"}
+
+    checkpoint = Checkpoint(str(tmp_path), {"mode": "full", "period": "max"}, restart=False)
+    checkpoint.record(["TCS.NS"], {"INFY.NS": "no data"})
+    resumed = Checkpoint(str(tmp_path), {"mode": "full", "period": "max"}, restart=False)
+    assert resumed.completed == {"TCS.NS"} and resumed.state["failed"] == {"INFY.NS": "no data"}
+    assert Checkpoint(str(tmp_path), {"mode": "full", "period": "10y"}, restart=False).completed == set()
+
+
+def test_download_does_not_sleep_after_last_attempt(monkeypatch):
+    sleeps = []
+    monkeypatch.setattr(backfill.time, "sleep", sleeps.append)
+    monkeypatch.setattr(backfill.yf, "download", lambda *a, **k: (_ for _ in ()).throw(IOError("down")))
+    with pytest.raises(RuntimeError):
+        backfill.download(["TCS.NS"], backfill.RateLimiter(0))
+    assert sleeps == [2 ** i for i in range(backfill.MAX_ATTEMPTS - 1)]
+
+
+def test_incremental_syncs_stale_symbols_separately(tmp_path, monkeypatch):
+    day = 86400
+    fresh = 20_000 * day
+    last = {"TCS.NS": fresh, "INFY.NS": fresh + 3600, "OLD.NS": fresh - 900 * day}
+    monkeypatch.setattr(backfill, "last_bar_time", lambda directory, ticker: last.get(ticker))
+    calls = []
+
+    def fake_download(tickers, limiter, **kwargs):
+        calls.append((kwargs["start"], list(tickers)))
+        return {t: ohlcv(["2026-01-01"], [1]) for t in tickers}
+
+    monkeypatch.setattr(backfill, "download", fake_download)
+    status = backfill.run_incremental(["TCS.NS", "INFY.NS", "OLD.NS", "NEW.NS"], str(tmp_path), 0, chunk_size=20)
+    assert status == 0
+    assert len(calls) == 2
+    starts = dict((tuple(tickers), start) for start, tickers in calls)
+    assert starts[("OLD.NS",)] < starts[("TCS.NS", "INFY.NS")]
+    assert sorted(list_tickers(str(tmp_path))) == ["INFY.NS", "OLD.NS", "TCS.NS"]
@@ -0,0 +1,58 @@
+import sys
+import os
+
+# Add Server to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+import pandas as pd
+
+from Utils.HistoryDownsampler import lttb_indices, bucket_ohlc, resample_ohlc, downsample_history
+
+
+def make_history(n):
+    index = pd.date_range("2020-01-01", periods=n, freq="B", tz="Asia/Kolkata")
+    close = 100 + np.cumsum(np.sin(np.arange(n) / 7.0))
+    return pd.DataFrame({
+        "Open": close - 0.5,
+        "High": close + 1.0,
+        "Low": close - 1.0,
+        "Close": close,
+        "Volume": np.full(n, 10.0)
+    }, index=index)
+
+
+def test_lttb_keeps_endpoints_and_count():
+    y = np.sin(np.linspace(0, 20, 5000))
+    idx = lttb_indices(np.arange(5000), y, 200)
+    assert len(idx) == 200
+    assert idx[0] == 0 and idx[-1] == 4999
+    assert np.all(np.diff(idx) > 0)
+
+
+def test_lttb_noop_when_under_threshold():
+    assert lttb_indices(np.arange(10), np.arange(10), 50).tolist() == list(range(10))
+
+
+def test_bucket_ohlc_preserves_extremes_and_volume():
+    history = make_history(1000)
+    bars = bucket_ohlc(history, 37)
+    assert len(bars) == 37
+    assert bars["High"].max() == history["High"].max()
+    assert bars["Low"].min() == history["Low"].min()
+    assert bars["Volume"].sum() == history["Volume"].sum()
+    assert bars["Close"].iloc[-1] == history["Close"].iloc[-1]
+
+
+def test_weekly_resample():
+    history = make_history(20)
+    weekly = resample_ohlc(history, "1wk")
+    # 2020-01-01 is a Wednesday: 3 + 5 + 5 + 5 + 2 business days
+    assert weekly.index[0] == history.index[0]
+    assert weekly["Volume"].tolist() == [30.0, 50.0, 50.0, 50.0, 20.0]
+
+
+def test_downsample_caps_points():
+    history = make_history(5000)
+    assert len(downsample_history(history, points=300)) == 300
+    assert len(downsample_history(history, points=300, method="ohlc")) == 300
@@ -0,0 +1,62 @@
+import sys
+import os
+
+# Add Server to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+import pandas as pd
+
+from Utils.HistorySerializer import (
+    history_to_records, history_to_columns, history_to_packed, unpack_history
+)
+
+
+def make_history(n=5):
+    index = pd.date_range("2024-01-01", periods=n, freq="D", tz="Asia/Kolkata")
+    close = np.linspace(100, 110, n)
+    return pd.DataFrame({
+        "Open": close - 1.004,
+        "High": close + 2.006,
+        "Low": close - 3.0,
+        "Close": close,
+        "Volume": np.arange(n) * 1000.0
+    }, index=index)
+
+
+def test_records_match_row_format():
+    history = make_history()
+    records = history_to_records(history)
+    assert len(records) == 5
+    assert records[0] == {
+        "date": "2024-01-01", "open": 99.0, "high": 102.01, "low": 97.0,
+        "close": 100.0, "volume": 0
+    }
+    assert records[-1]["volume"] == 4000
+    assert isinstance(records[-1]["volume"], int)
+
+
+def test_columnar_layout():
+    history = make_history()
+    columns = history_to_columns(history)
+    assert set(columns) == {"t", "o", "h", "l", "c", "v"}
+    assert all(len(v) == 5 for v in columns.values())
+    assert columns["c"][-1] == 110.0
+    assert columns["t"][1] - columns["t"][0] == 86400
+
+
+def test_packed_roundtrip():
+    history = make_history(7)
+    decoded = unpack_history(history_to_packed(history))
+    np.testing.assert_allclose(decoded["c"], history["Close"].to_numpy())
+    np.testing.assert_allclose(decoded["v"], history["Volume"].to_numpy())
+    assert decoded["t"].tolist() == history_to_columns(history)["t"]
+
+
+def test_empty_history_from_unknown_ticker():
+    # yfinance returns a bare frame (plain Index, often no columns) for unknown symbols
+    for history in (pd.DataFrame(), pd.DataFrame(columns=["Open", "High", "Low", "Close", "Volume"])):
+        assert history_to_records(history) == []
+        assert history_to_columns(history) == {"t": [], "o": [], "h": [], "l": [], "c": [], "v": []}
+        unpacked = unpack_history(history_to_packed(history))
+        assert len(unpacked["t"]) == 0 and len(unpacked["c"]) == 0
@@ -0,0 +1,79 @@
+import sys
+import os
+
+# Add Server to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from Middleware.HttpCacheMiddleware import etag_matches, http_cache_middleware, negotiate_encoding
+from Utils.ResponseHelper import make_response
+from Utils.ResponseHelperModels import HTTPStatusCode, APICode
+
+app = FastAPI()
+app.middleware("http")(http_cache_middleware)
+
+
+@app.get("/api/stock/{ticker}/history")
+async def history(ticker: str):
+    return make_response(
+        status=HTTPStatusCode.OK, code=APICode.OK, message="ok",
+        data=[{"date": f"2024-01-{d:02d}", "close": 100.0 + d} for d in range(1, 29)] * 4
+    )
+
+
+@app.get("/api/missing")
+async def missing():
+    return make_response(status=HTTPStatusCode.NOT_FOUND, code=APICode.DATA_NOT_FOUND, message="nope")
+
+
+@pytest.fixture
+def client():
+    return TestClient(app)
+
+
+def test_weak_etag_stable_across_envelopes(client):
+    first = client.get("/api/stock/TCS.NS/history", headers={"Accept-Encoding": "identity"})
+    second = client.get("/api/stock/TCS.NS/history", headers={"Accept-Encoding": "identity"})
+    assert first.headers["etag"].startswith('W/"')
+    assert first.headers["etag"] == second.headers["etag"]
+    # meta (timestamp, request id) differs, so the bodies are not byte-identical
+    assert first.content != second.content
+    assert first.headers["cache-control"] == "public, max-age=300"
+
+
+def test_if_none_match_returns_304(client):
+    etag = client.get("/api/stock/TCS.NS/history", headers={"Accept-Encoding": "identity"}).headers["etag"]
+    response = client.get("/api/stock/TCS.NS/history", headers={"If-None-Match": etag, "Accept-Encoding": "gzip"})
+    assert response.status_code == 304 and response.content == b""
+    assert response.headers["etag"] == etag and "Accept-Encoding" in response.headers["vary"]
+    assert client.get("/api/stock/TCS.NS/history", headers={"If-None-Match": 'W/"other"'}).status_code == 200
+
+
+@pytest.mark.parametrize("encoding", ["gzip", "br"])
+def test_compressed_variants_get_their_own_tag(client, encoding):
+    plain = client.get("/api/stock/TCS.NS/history", headers={"Accept-Encoding": "identity"})
+    response = client.get("/api/stock/TCS.NS/history", headers={"Accept-Encoding": encoding})
+    assert response.headers["content-encoding"] == encoding
+    assert response.headers["etag"] == plain.headers["etag"][:-1] + f'-{encoding}"'
+    assert response.json()["data"] == plain.json()["data"]
+    # Revalidating with the compressed variant's tag still matches
+    revalidated = client.get(
+        "/api/stock/TCS.NS/history", headers={"If-None-Match": response.headers["etag"], "Accept-Encoding": encoding}
+    )
+    assert revalidated.status_code == 304
+
+
+def test_errors_are_not_cached_or_tagged(client):
+    response = client.get("/api/missing")
+    assert response.status_code == 404
+    assert "etag" not in response.headers and "cache-control" not in response.headers
+
+
+def test_negotiation_and_matching_helpers():
+    assert negotiate_encoding("gzip, deflate, br") == "br"
+    assert negotiate_encoding("br;q=0, gzip;q=0.5") == "gzip"
+    assert negotiate_encoding("gzip;q=0") is None and negotiate_encoding("") is None
+    assert etag_matches('"abc", W/"def-gzip"', 'W/"def"')
+    assert etag_matches("*", '"abc"') and not etag_matches(None, '"abc"')
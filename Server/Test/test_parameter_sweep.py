@@ -0,0 +1,63 @@
+import sys
+import os
+from multiprocessing import shared_memory
+import numpy as np
+import pytest
+
+# Add Server to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from Services.Analytics.Backtest import SignalParams, run_backtest
+import Services.Analytics.ParameterSweep as sweep
+from Services.Analytics.ParameterSweep import parameter_grid, walk_forward_splits, run_sweep
+
+
+def test_grid_skips_inverted_thresholds():
+    grid = parameter_grid([14], [30, 70], [70], [50])
+    assert grid == [SignalParams(14, 30, 70, 50)]
+
+
+def test_walk_forward_is_anchored_and_contiguous():
+    splits = walk_forward_splits(100, 4)
+    assert splits == [((0, 20), (20, 40)), ((0, 40), (40, 60)), ((0, 60), (60, 80)), ((0, 80), (80, 100))]
+
+
+def test_sweep_ranks_and_reports_out_of_sample():
+    rng = np.random.default_rng(3)
+    closes = 100 * np.exp(np.cumsum(rng.normal(0.0005, 0.02, (300, 4)), axis=0))
+    grid = parameter_grid([7, 14], [30], [70], [10, 20])
+    progress = []
+    result = run_sweep(closes, grid, folds=2, cost_bps=5, workers=1, on_progress=lambda d, n: progress.append((d, n)))
+
+    assert result["combinations"] == 4 and progress[-1] == (4, 4)
+    sharpes = [r["metrics"]["sharpe"] for r in result["ranking"]]
+    assert sharpes == sorted(sharpes, reverse=True)
+    best = SignalParams(**result["ranking"][0]["params"])
+    assert abs(run_backtest(closes, best, cost_bps=5).metrics["sharpe"] - sharpes[0]) < 1e-9
+    assert len(result["walk_forward"]["folds"]) == 2
+    assert result["walk_forward"]["out_of_sample"] is not None
+
+
+def test_process_pool_matches_serial_and_frees_shared_memory(monkeypatch):
+    created = []
+
+    class RecordingSharedMemory(shared_memory.SharedMemory):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            created.append(self.name)
+
+    monkeypatch.setattr(sweep.shared_memory, "SharedMemory", RecordingSharedMemory)
+    rng = np.random.default_rng(11)
+    closes = 100 * np.exp(np.cumsum(rng.normal(0.0005, 0.02, (260, 3)), axis=0))
+    grid = parameter_grid([7, 14], [25, 30], [70], [10, 20])
+
+    serial = run_sweep(closes, grid, folds=2, cost_bps=5, workers=1)
+    parallel = run_sweep(closes, grid, folds=2, cost_bps=5, workers=2)
+
+    assert parallel["workers"] == 2
+    key = lambda r: tuple(r["params"].values())
+    assert sorted(parallel["ranking"], key=key) == sorted(serial["ranking"], key=key)
+    assert parallel["walk_forward"] == serial["walk_forward"]
+    assert len(created) == 1
+    with pytest.raises(FileNotFoundError):
+        shared_memory.SharedMemory(name=created[0])
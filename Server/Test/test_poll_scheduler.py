@@ -0,0 +1,55 @@
+import sys
+import os
+from datetime import datetime
+
+# Add Server to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from Services.Market.PollScheduler import PollScheduler
+from Services.Market.TradingCalendar import IST, market_phase, next_session_start
+
+
+def test_market_phases():
+    # 2026-10-19 is a Monday
+    assert market_phase(datetime(2026, 10, 19, 9, 5, tzinfo=IST)) == "pre_open"
+    assert market_phase(datetime(2026, 10, 19, 11, 0, tzinfo=IST)) == "open"
+    assert market_phase(datetime(2026, 10, 19, 15, 45, tzinfo=IST)) == "post_close"
+    assert market_phase(datetime(2026, 10, 19, 20, 0, tzinfo=IST)) == "closed"
+    # Weekend and exchange holiday (Gandhi Jayanti)
+    assert market_phase(datetime(2026, 10, 18, 11, 0, tzinfo=IST)) == "closed"
+    assert market_phase(datetime(2026, 10, 2, 11, 0, tzinfo=IST)) == "closed"
+
+
+def test_next_session_skips_weekend():
+    friday_evening = datetime(2026, 10, 16, 18, 0, tzinfo=IST)
+    assert next_session_start(friday_evening) == datetime(2026, 10, 19, 9, 0, tzinfo=IST)
+
+
+def test_intervals_follow_demand_volatility_and_session():
+    scheduler = PollScheduler(base_interval=5, min_interval=2, max_interval=60, off_hours_interval=300)
+    assert scheduler.interval_for("A", 1, "open") == 5
+    assert scheduler.interval_for("A", 100, "open") == 2
+    assert scheduler.interval_for("A", 0, "open") == 30
+    assert scheduler.interval_for("A", 1, "closed") == 300
+    assert scheduler.interval_for("A", 1, "pre_open") == 15
+    # A flat ticker backs off, a volatile one speeds up
+    scheduler.volatility["FLAT"] = 0.0
+    scheduler.volatility["HOT"] = 0.01
+    assert scheduler.interval_for("FLAT", 1, "open") == 10
+    assert scheduler.interval_for("HOT", 1, "open") == 2.5
+
+
+def test_due_spreads_and_reschedules():
+    scheduler = PollScheduler(base_interval=5)
+    tickers = [f"T{i}.NS" for i in range(50)]
+    # First polls are staggered over the first second rather than all at once
+    assert scheduler.due(tickers, now=0.0) == []
+    assert 0 < len(scheduler.due(tickers, now=0.5)) < 50
+    assert len(scheduler.due(tickers, now=1.0)) == 50
+    for t in tickers:
+        scheduler.record(t, 100.0, 1.0, subscribers=1, phase="open")
+    assert scheduler.due(tickers, now=2.0) == []
+    assert sorted(scheduler.due(tickers, now=7.0)) == sorted(tickers)
+    # Untracked tickers are forgotten
+    scheduler.due(tickers[:10], now=8.0)
+    assert set(scheduler.next_due) == set(tickers[:10])
@@ -0,0 +1,54 @@
+import sys
+import os
+import numpy as np
+
+# Add Server to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pandas as pd
+from Services.Analytics.PriceMatrix import PriceMatrix, build_price_matrix, is_supported_period, period_start
+from Services.Market.HistoryDataset import write_history
+
+DAY = 86400
+
+
+def store(directory, ticker, days, closes):
+    t = np.asarray(days, dtype=np.int64) * DAY
+    c = np.asarray(closes, dtype=np.float64)
+    write_history(directory, ticker, {"t": t, "o": c, "h": c, "l": c, "c": c, "v": np.zeros(len(c))})
+
+
+def test_build_slice_and_incremental_append(tmp_path):
+    dataset, matrix_dir = str(tmp_path / "history"), str(tmp_path / "matrix")
+    store(dataset, "A.NS", [1, 2, 3], [10, 11, 12])
+    store(dataset, "B.NS", [2, 3], [20, 21])
+    meta = build_price_matrix(dataset, matrix_dir)
+    matrix = PriceMatrix.open(matrix_dir)
+    assert matrix.tickers == ["A.NS", "B.NS"] and matrix.rows == 3
+    np.testing.assert_array_equal(matrix.closes, [[10, np.nan], [11, 20], [12, 21]])
+    # A single column is a view into the mapping
+    assert np.shares_memory(matrix.column("B.NS"), matrix._closes)
+
+    start = pd.Timestamp(2 * DAY, unit="s")
+    dates, block = matrix.slice(["B.NS", "A.NS"], start=start)
+    assert (dates // DAY).tolist() == [2, 3] and block.tolist() == [[20, 11], [21, 12]]
+
+    # New bars append in place, same version
+    store(dataset, "A.NS", [1, 2, 3, 4], [10, 11, 12, 13])
+    assert build_price_matrix(dataset, matrix_dir)["version"] == meta["version"]
+    matrix = PriceMatrix.open(matrix_dir)
+    assert matrix.rows == 4 and matrix.column("A.NS")[-1] == 13 and np.isnan(matrix.column("B.NS")[-1])
+
+    # A new ticker rebuilds into a new version
+    store(dataset, "C.NS", [4], [30])
+    assert build_price_matrix(dataset, matrix_dir)["version"] == meta["version"] + 1
+    assert PriceMatrix.open(matrix_dir).frame(["C.NS"]).dropna().iloc[0, 0] == 30
+
+
+def test_period_start():
+    end = pd.Timestamp("2026-10-19")
+    assert period_start("6mo", end) == pd.Timestamp("2026-04-19")
+    assert period_start("10y", end) == pd.Timestamp("2016-10-19")
+    assert period_start("ytd", end) == pd.Timestamp("2026-01-01")
+    assert period_start("max", end) is None
+    assert is_supported_period("10y") and not is_supported_period("1w") and not is_supported_period("")
@@ -0,0 +1,98 @@
+import sys
+import os
+import asyncio
+
+# Add Server to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from Middleware.RateLimitMiddleware import (
+    EXPENSIVE, READ, ClientBuckets, ConcurrencyGate, RateLimitMiddleware, route_class
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_route_classes():
+    assert route_class("/") is None and route_class("/docs") is None
+    assert route_class("/api/stock/RELIANCE.NS/history") == READ
+    assert route_class("/api/stock/backtest/sweep/abc123") == READ
+    assert route_class("/api/stock/market/analysis") == READ
+    assert route_class("/api/stock/RELIANCE.NS/analysis") == EXPENSIVE
+    assert route_class("/api/stock/analysis/batch") == EXPENSIVE
+    assert route_class("/api/stock/backtest/sweep") == EXPENSIVE
+    assert route_class("/api/chat/message") == EXPENSIVE
+
+
+def test_buckets_are_per_client_and_report_wait():
+    clock = FakeClock()
+    buckets = ClientBuckets(per_minute=60, burst=2, max_clients=100, clock=clock)
+    assert buckets.take("a") == 0 and buckets.take("a") == 0
+    assert buckets.take("a") == 1.0
+    assert buckets.take("b") == 0
+    # A rejected request does not spend a token
+    clock.now = 1.0
+    assert buckets.take("a") == 0
+
+
+def test_idle_and_excess_clients_are_evicted():
+    clock = FakeClock()
+    buckets = ClientBuckets(per_minute=60, burst=2, max_clients=3, clock=clock)
+    for client in "abc":
+        buckets.take(client)
+    buckets.take("d")
+    assert list(buckets.buckets) == ["b", "c", "d"]
+    clock.now = 2.0  # fully refilled
+    buckets.take("e")
+    assert list(buckets.buckets) == ["e"]
+
+
+def test_gate_queues_then_rejects():
+    async def run():
+        gate = ConcurrencyGate(limit=1, max_queue=1, queue_timeout=0.05)
+        assert await gate.acquire()
+        queued = asyncio.ensure_future(gate.acquire())
+        await asyncio.sleep(0)
+        # Queue is full: turned away without waiting
+        assert not await gate.acquire()
+        gate.release()
+        assert await queued
+        # Slot never frees: the queued caller gives up after the timeout
+        assert not await gate.acquire()
+        assert gate.waiting == 0
+    asyncio.run(run())
+
+
+def test_middleware_returns_429_with_retry_after():
+    async def app(scope, receive, send):
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b"{}"})
+
+    async def request(middleware, path, method="POST"):
+        sent = []
+
+        async def receive():
+            return {"type": "http.request", "body": b""}
+
+        async def send(message):
+            sent.append(message)
+
+        scope = {"type": "http", "method": method, "path": path, "headers": [], "client": ("10.0.0.1", 1234)}
+        await middleware(scope, receive, send)
+        return sent[0]["status"], dict(sent[0]["headers"])
+
+    async def run():
+        middleware = RateLimitMiddleware(app)
+        middleware.buckets[EXPENSIVE] = ClientBuckets(per_minute=1, burst=1, max_clients=10)
+        path = "/api/stock/RELIANCE.NS/analysis"
+        assert (await request(middleware, path))[0] == 200
+        status, headers = await request(middleware, path)
+        assert status == 429 and int(headers[b"retry-after"]) > 0
+        assert (await request(middleware, path, method="OPTIONS"))[0] == 200
+        assert (await request(middleware, "/"))[0] == 200
+    asyncio.run(run())
@@ -0,0 +1,124 @@
+import sys
+import os
+import asyncio
+
+# Add Server to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pytest
+from Utils.Resilience import (
+    CLOSED, HALF_OPEN, OPEN, CircuitBreaker, TokenBucket, Upstream, UpstreamUnavailable, backoff_delay
+)
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class Throttled(Exception):
+    def __init__(self):
+        super().__init__("429 Client Error: Too Many Requests")
+
+
+def test_token_bucket_waits_and_adapts():
+    clock = Clock()
+    bucket = TokenBucket(rate=2.0, burst=2, clock=clock)
+    assert [bucket.reserve() for _ in range(3)] == [0.0, 0.0, 0.5]
+    clock.now = 10.0
+    bucket.throttled()
+    assert bucket.rate == 1.0 and bucket.reserve() > 0
+    for _ in range(40):
+        bucket.succeeded()
+    assert bucket.rate == 2.0
+
+
+def test_breaker_opens_on_error_rate_and_probes_once():
+    clock = Clock()
+    breaker = CircuitBreaker("x", error_rate=0.5, min_calls=4, window=60, cooldown=10, max_cooldown=100, clock=clock)
+    for ok in (True, False, True):
+        breaker.record(ok)
+    assert breaker.state == CLOSED
+    breaker.record(False)
+    assert breaker.state == OPEN
+    # Fail fast until the jittered cooldown (5-10s for the first open) is over
+    assert breaker.allow() > 0
+    clock.now = 10.0
+    assert breaker.allow() == 0 and breaker.state == HALF_OPEN
+    assert breaker.allow() > 0  # only one probe at a time
+    breaker.record(False)
+    assert breaker.state == OPEN and 10.0 + 10 <= breaker.retry_at <= 10.0 + 20
+    clock.now = breaker.retry_at
+    assert breaker.allow() == 0
+    breaker.record(True)
+    assert breaker.state == CLOSED and breaker.opens == 0
+
+
+def test_old_failures_leave_the_window():
+    clock = Clock()
+    breaker = CircuitBreaker("x", error_rate=0.5, min_calls=3, window=10, cooldown=10, max_cooldown=100, clock=clock)
+    breaker.record(False)
+    breaker.record(False)
+    clock.now = 20.0
+    breaker.record(True)
+    breaker.record(True)
+    breaker.record(False)
+    assert breaker.state == CLOSED
+
+
+def test_backoff_grows_with_jitter_and_cap():
+    for attempt in range(8):
+        delay = backoff_delay(attempt, 1.0, 16.0)
+        cap = min(16.0, 2 ** attempt)
+        assert cap / 2 <= delay <= cap
+
+
+def test_upstream_fails_fast_once_open_and_ignores_client_errors():
+    upstream = Upstream("test", rate=1000, burst=1000)
+    calls = []
+
+    def boom(error):
+        calls.append(error)
+        raise error
+
+    for _ in range(10):
+        with pytest.raises(KeyError):
+            upstream.call(boom, KeyError("bad ticker"))
+    assert upstream.breaker.state == CLOSED
+
+    with pytest.raises(Throttled):
+        upstream.call(boom, Throttled())
+    assert upstream.bucket.rate == 500
+    while upstream.breaker.state == CLOSED:
+        with pytest.raises(ConnectionError):
+            upstream.call(boom, ConnectionError())
+    made = len(calls)
+    with pytest.raises(UpstreamUnavailable):
+        upstream.call(boom, ConnectionError())
+    assert len(calls) == made
+
+
+def test_rate_limit_over_budget_fails_fast():
+    upstream = Upstream("test", rate=1, burst=1, max_wait=0)
+    assert upstream.call(lambda: 1) == 1
+    with pytest.raises(UpstreamUnavailable) as info:
+        upstream.call(lambda: 2)
+    assert info.value.reason == "rate limited"
+
+
+def test_async_call_retries_with_backoff(monkeypatch):
+    monkeypatch.setattr("Utils.Resilience.RETRY_BASE_SECONDS", 0.01)
+    upstream = Upstream("test", rate=1000, burst=1000)
+    attempts = []
+
+    def flaky():
+        attempts.append(1)
+        if len(attempts) < 3:
+            raise ConnectionError()
+        return "ok"
+
+    assert asyncio.run(upstream.acall(flaky, retries=2)) == "ok"
+    assert len(attempts) == 3
@@ -0,0 +1,50 @@
+import sys
+import os
+
+# Add Server to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+import Services.Analytics.Sentiment as sentiment
+from Services.Analytics.Sentiment import (
+    aggregate_sentiment, headline_text, score_batch, score_headlines, token_weight
+)
+
+
+def test_polarity_inflections_and_negation():
+    scores = score_batch([
+        "Reliance shares surged after record quarterly profit",
+        "TCS slips as brokerages downgrade the stock",
+        "HDFC Bank AGM today",
+        "Not a strong quarter for Infosys",
+        "",
+    ])
+    assert scores[0] > 0.5 and scores[1] < -0.5
+    assert scores[2] == 0 and scores[4] == 0
+    assert scores[3] < 0
+    assert np.all(np.abs(scores) < 1)
+    assert token_weight("slipped") == token_weight("slip") and token_weight("cutting") == token_weight("cut")
+
+
+def test_negation_does_not_cross_headlines():
+    alone = score_batch(["Profit jumps"])[0]
+    batched = score_batch(["Deal not", "Profit jumps"])[1]
+    assert alone == batched > 0
+
+
+def test_cached_scores_match_and_skip_rescoring(monkeypatch):
+    titles = ["Shares tumble on fraud probe", "Stock rallies to record high"]
+    first = score_headlines(titles)
+    calls = []
+    monkeypatch.setattr(sentiment, "score_batch", lambda batch: calls.append(batch) or np.zeros(len(batch)))
+    second = score_headlines(titles + ["Brand new headline"])
+    np.testing.assert_array_equal(second[:2], first)
+    assert calls == [["Brand new headline"]]
+
+
+def test_aggregate_uses_llm_scale():
+    assert aggregate_sentiment(np.array([]))["label"] == "Neutral"
+    reading = aggregate_sentiment(np.array([0.8, 0.6, -0.02]))
+    assert reading == {"score": 73, "label": "Bullish", "headlines": 3, "positive": 2, "negative": 0}
+    assert aggregate_sentiment(np.array([-0.9]))["label"] == "Bearish"
+    assert headline_text({"title": "Nifty falls - Mint", "source": "Mint"}) == "Nifty falls"
@@ -0,0 +1,118 @@
+import sys
+import os
+import uuid
+
+# Add Server to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pytest
+from multiprocessing import shared_memory
+import Services.Market.SharedQuoteTable as quote_tables
+from Services.Market.SharedQuoteTable import SharedQuoteTable
+
+
+def quote(ticker, price, prev_close=100.0, ts=1700000000.0):
+    return {"ticker": ticker, "price": price, "prev_close": prev_close, "ts": ts}
+
+
+def exists(name):
+    try:
+        shm = shared_memory.SharedMemory(name=name)
+    except FileNotFoundError:
+        return False
+    quote_tables._untrack(shm)
+    shm.close()
+    return True
+
+
+@pytest.fixture
+def table():
+    table = SharedQuoteTable.create(f"mf_test_{uuid.uuid4().hex[:12]}", capacity=4)
+    yield table
+    if hasattr(table, "header"):
+        table.close(unlink=True)
+
+
+def test_write_read_roundtrip(table):
+    assert table.read("TCS.NS") is None
+    table.write_many([quote("TCS.NS", 101.5), quote("^NSEI", 22000.0, prev_close=None)])
+    assert table.read("TCS.NS") == (101.5, 100.0, 1700000000.0)
+    assert table.read("^NSEI") == (22000.0, None, 1700000000.0)
+    assert table.read_many(["TCS.NS", "INFY.NS"]) == {"TCS.NS": (101.5, 100.0, 1700000000.0)}
+
+
+def test_full_table_and_long_symbols_are_skipped(table):
+    table.write_many([quote(f"T{i}", float(i)) for i in range(5)] + [quote("X" * 40, 1.0)])
+    assert table.read("T3") == (3.0, 100.0, 1700000000.0)
+    assert table.read("T4") is None and table.read("X" * 40) is None
+
+
+class TearingColumn:
+    """Stands in for a price column; the first read races with a full rewrite of the slot."""
+    def __init__(self, table, array, rewrite):
+        self.table, self.array, self.rewrite = table, array, rewrite
+
+    def __getitem__(self, slot):
+        value = self.array[slot]
+        if self.rewrite:
+            rewrite, self.rewrite = self.rewrite, None
+            self.table.write_many([rewrite])
+        return value
+
+    def __setitem__(self, slot, value):
+        self.array[slot] = value
+
+
+def test_torn_read_is_retried(table):
+    table.write_many([quote("TCS.NS", 101.0, prev_close=99.0, ts=1.0)])
+    table.last = TearingColumn(table, table.last, quote("TCS.NS", 105.0, prev_close=104.0, ts=2.0))
+    # The first attempt saw last=101 but prev_close/ts of the rewrite; the seqlock rejects it
+    assert table.read("TCS.NS") == (105.0, 104.0, 2.0)
+
+
+def test_write_in_progress_is_never_returned(table):
+    table.write_many([quote("TCS.NS", 101.0)])
+    slot = table.slots["TCS.NS"]
+    table.seq[slot] += 1  # writer died between its two increments
+    assert table.read("TCS.NS") is None
+    # The next leader's write restores even parity instead of inverting it
+    table.write_many([quote("TCS.NS", 102.0)])
+    assert table.seq[slot] % 2 == 0
+    assert table.read("TCS.NS") == (102.0, 100.0, 1700000000.0)
+
+
+def test_close_unlinks_the_segment(table):
+    name = table.shm.name.lstrip("/")
+    reader = SharedQuoteTable.attach(name)
+    table.write_many([quote("TCS.NS", 101.0)])
+    table.close(unlink=True)
+    assert not exists(name)
+    # Readers still mapping it see a retired table rather than frozen quotes
+    assert reader.retired
+    reader.close()
+    assert SharedQuoteTable.attach(name) is None
+
+
+def test_new_leader_replaces_a_leftover_block(table, monkeypatch):
+    name = table.shm.name.lstrip("/")
+    table.write_many([quote("TCS.NS", 101.0), quote("INFY.NS", 1500.0)])
+    monkeypatch.setattr(quote_tables.settings, "QUOTE_SHM_NAME", name)
+    monkeypatch.setattr(quote_tables, "_reader", None)
+    monkeypatch.setattr(quote_tables, "_last_attach", -quote_tables.ATTACH_RETRY_SECONDS)
+    reader = quote_tables.get_quote_table()
+    assert reader.read("INFY.NS") == (1500.0, 100.0, 1700000000.0)
+
+    # The old leader crashed without closing; the next one starts a fresh block
+    leader = SharedQuoteTable.create(name, capacity=8)
+    try:
+        assert table.retired and leader.capacity == 8
+        leader.write_many([quote("RELIANCE.NS", 2900.0)])
+        monkeypatch.setattr(quote_tables, "_last_attach", -quote_tables.ATTACH_RETRY_SECONDS)
+        reader = quote_tables.get_quote_table()
+        assert reader.read("RELIANCE.NS") == (2900.0, 100.0, 1700000000.0)
+        assert reader.read("INFY.NS") is None
+        reader.close()
+    finally:
+        leader.close(unlink=True)
+    assert not exists(name)
+    assert SharedQuoteTable.attach(f"mf_missing_{uuid.uuid4().hex[:12]}") is None
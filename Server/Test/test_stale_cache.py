@@ -0,0 +1,163 @@
+import sys
+import os
+import asyncio
+
+# Add Server to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pytest
+from Utils.StaleCache import StaleWhileRevalidateCache
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def counting_loader(results):
+    calls = []
+
+    async def load():
+        calls.append(len(calls))
+        await asyncio.sleep(0.01)
+        value = results[len(calls) - 1]
+        if isinstance(value, Exception):
+            raise value
+        return value
+    return load, calls
+
+
+def test_hit_stale_and_hard_expiry():
+    async def scenario():
+        clock = Clock()
+        cache = StaleWhileRevalidateCache(soft_ttl=10, hard_ttl=100, clock=clock)
+        load, calls = counting_loader(["v1", "v2", "v3"])
+        states = [await cache.get("k", load)]
+        clock.now = 5
+        states.append(await cache.get("k", load))
+        # Past soft TTL: old value at once, refreshed in the background
+        clock.now = 20
+        states.append(await cache.get("k", load))
+        await asyncio.sleep(0.05)
+        states.append(await cache.get("k", load))
+        # Past hard TTL: the caller waits for a fresh load
+        clock.now = 200
+        states.append(await cache.get("k", load))
+        return [(r.value, r.state, int(r.age)) for r in states], len(calls)
+
+    states, loads = asyncio.run(scenario())
+    assert states == [
+        ("v1", "MISS", 0), ("v1", "HIT", 5), ("v1", "STALE", 20), ("v2", "HIT", 0), ("v3", "MISS", 0)
+    ]
+    assert loads == 3
+
+
+def test_concurrent_misses_and_refreshes_share_one_load():
+    async def scenario():
+        clock = Clock()
+        cache = StaleWhileRevalidateCache(soft_ttl=10, hard_ttl=100, clock=clock)
+        load, calls = counting_loader(["v1", "v2"])
+        first = await asyncio.gather(*[cache.get("k", load) for _ in range(5)])
+        clock.now = 50
+        stale = await asyncio.gather(*[cache.get("k", load) for _ in range(5)])
+        await asyncio.sleep(0.05)
+        return first, stale, len(calls)
+
+    first, stale, loads = asyncio.run(scenario())
+    assert {r.value for r in first} == {"v1"}
+    assert {(r.value, r.state) for r in stale} == {("v1", "STALE")}
+    assert loads == 2
+
+
+def test_failed_refresh_keeps_stale_value_and_uncacheable_results_are_not_stored():
+    async def scenario():
+        clock = Clock()
+        cache = StaleWhileRevalidateCache(soft_ttl=10, hard_ttl=100, clock=clock)
+        load, _ = counting_loader(["v1", RuntimeError("upstream down"), None])
+        keep = lambda v: v is not None
+        await cache.get("k", load, keep)
+        clock.now = 50
+        await cache.get("k", load, keep)
+        await asyncio.sleep(0.05)
+        after_failure = await cache.get("k", load, keep)
+        await asyncio.sleep(0.05)
+        after_uncacheable = await cache.get("k", load, keep)
+        return after_failure, after_uncacheable
+
+    after_failure, after_uncacheable = asyncio.run(scenario())
+    assert (after_failure.value, after_failure.state) == ("v1", "STALE")
+    assert after_uncacheable.value == "v1"
+
+
+def test_miss_propagates_load_errors_and_evicts_lru():
+    async def scenario():
+        cache = StaleWhileRevalidateCache(soft_ttl=10, hard_ttl=100, max_entries=2, clock=Clock())
+        load, _ = counting_loader([RuntimeError("boom")])
+        with pytest.raises(RuntimeError):
+            await cache.get("bad", load)
+
+        async def value(v):
+            return v
+        for key in ("a", "b", "c"):
+            await cache.get(key, lambda key=key: value(key))
+        return list(cache.entries)
+
+    assert asyncio.run(scenario()) == ["b", "c"]
+
+
+def test_expired_value_served_when_upstream_unavailable():
+    class Unavailable(Exception):
+        pass
+
+    async def scenario():
+        clock = Clock()
+        cache = StaleWhileRevalidateCache(soft_ttl=10, hard_ttl=100, clock=clock, serve_expired_on=(Unavailable,))
+        load, _ = counting_loader(["v1", Unavailable(), RuntimeError("other")])
+        await cache.get("k", load)
+        clock.now = 500
+        served = await cache.get("k", load)
+        with pytest.raises(RuntimeError):
+            await cache.get("k", load)
+        return served
+
+    served = asyncio.run(scenario())
+    assert (served.value, served.state, int(served.age)) == ("v1", "STALE", 500)
+
+
+def test_degraded_values_are_short_lived_and_never_replace_complete_ones():
+    async def scenario():
+        clock = Clock()
+        cache = StaleWhileRevalidateCache(soft_ttl=10, hard_ttl=100, clock=clock, degraded_ttl=3)
+        load, calls = counting_loader(["fallback", "fallback", "full", "fallback", "full"])
+        degraded = lambda v: v == "fallback"
+        states = [await cache.get("k", load, degraded=degraded)]
+        clock.now = 2
+        states.append(await cache.get("k", load, degraded=degraded))
+        # Degraded entries hard-expire after degraded_ttl: no stale serving
+        clock.now = 4
+        states.append(await cache.get("k", load, degraded=degraded))
+        clock.now = 10
+        states.append(await cache.get("k", load, degraded=degraded))
+        # A degraded background refresh keeps the complete value being served
+        clock.now = 30
+        states.append(await cache.get("k", load, degraded=degraded))
+        await asyncio.sleep(0.05)
+        # ... and the next refresh waits degraded_ttl
+        states.append(await cache.get("k", load, degraded=degraded))
+        await asyncio.sleep(0.05)
+        loads_after_fallback = len(calls)
+        clock.now = 34
+        states.append(await cache.get("k", load, degraded=degraded))
+        await asyncio.sleep(0.05)
+        states.append(await cache.get("k", load, degraded=degraded))
+        return [(r.value, r.state) for r in states], loads_after_fallback, len(calls)
+
+    states, loads_after_fallback, loads = asyncio.run(scenario())
+    assert states == [
+        ("fallback", "MISS"), ("fallback", "HIT"), ("fallback", "MISS"),
+        ("full", "MISS"), ("full", "STALE"), ("full", "STALE"), ("full", "STALE"), ("full", "HIT")
+    ]
+    assert (loads_after_fallback, loads) == (4, 5)
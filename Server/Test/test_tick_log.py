@@ -0,0 +1,75 @@
+import sys
+import os
+import asyncio
+from datetime import datetime, timezone
+
+# Add Server to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from Services.Market.TickLog import TICK_DTYPE, TickRecorder, list_segments, open_segment, replay_ticks
+
+DAY1 = datetime(2024, 3, 4, 4, 0, tzinfo=timezone.utc).timestamp()
+DAY2 = DAY1 + 86400
+
+
+def quote(ticker, price, ts, prev_close=100.0):
+    return {"ticker": ticker, "price": price, "prev_close": prev_close, "ts": ts}
+
+
+def replay(path):
+    cycles = []
+
+    async def collect(quotes):
+        cycles.append([(q["ticker"], q["price"], q["prev_close"]) for q in quotes])
+
+    asyncio.run(replay_ticks(str(path), collect, "max"))
+    return cycles
+
+
+def test_record_and_replay_cycles(tmp_path):
+    recorder = TickRecorder(str(tmp_path))
+    recorder.append([quote("TCS.NS", 101.0, DAY1), quote("^NSEI", 22000.0, DAY1, prev_close=None)])
+    recorder.append([quote("TCS.NS", 102.0, DAY1 + 5)])
+    recorder.close()
+    assert replay(tmp_path) == [
+        [("TCS.NS", 101.0, 100.0), ("^NSEI", 22000.0, None)],
+        [("TCS.NS", 102.0, 100.0)],
+    ]
+
+
+def test_resume_truncates_a_torn_record(tmp_path):
+    recorder = TickRecorder(str(tmp_path))
+    recorder.append([quote("TCS.NS", 101.0, DAY1)])
+    recorder.append([quote("TCS.NS", 102.0, DAY1 + 5)])
+    segment = recorder.segment.name
+    recorder.close()
+    # Crash halfway through writing the next record
+    with open(segment, 'ab') as f:
+        f.write(b"\x01" * (TICK_DTYPE.itemsize // 2))
+
+    assert len(open_segment(segment)) == 2
+    assert len(replay(segment)) == 2
+
+    recorder = TickRecorder(str(tmp_path))
+    recorder.append([quote("INFY.NS", 1500.0, DAY1 + 10)])
+    recorder.close()
+    records = open_segment(segment)
+    assert os.path.getsize(segment) == 3 * TICK_DTYPE.itemsize
+    assert records["batch"].tolist() == [0, 1, 2]
+    assert replay(tmp_path)[-1] == [("INFY.NS", 1500.0, 100.0)]
+
+
+def test_unsealed_segments_are_sealed_on_rotation(tmp_path):
+    recorder = TickRecorder(str(tmp_path))
+    recorder.append([quote("TCS.NS", 101.0, DAY1)])
+    recorder.close()
+
+    # Restarted the next day: yesterday's segment was never rotated out by the old process
+    recorder = TickRecorder(str(tmp_path))
+    recorder.append([quote("TCS.NS", 103.0, DAY2)])
+    recorder.sealer.join(5)
+    recorder.close()
+    assert [os.path.basename(p) for p in list_segments(str(tmp_path))] == [
+        "ticks-20240304.bin.gz", "ticks-20240305.bin"
+    ]
+    assert replay(tmp_path) == [[("TCS.NS", 101.0, 100.0)], [("TCS.NS", 103.0, 100.0)]]
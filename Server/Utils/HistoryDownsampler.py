@@ -0,0 +1,111 @@
+from typing import Optional
+import numpy as np
+import pandas as pd
+
+# Calendar intervals accepted by /{ticker}/history, mapped to pandas resample rules
+RESAMPLE_RULES = {
+    "1wk": "W",
+    "1mo": "ME",
+    "3mo": "QE",
+}
+
+DOWNSAMPLE_METHODS = ("lttb", "ohlc")
+
+OHLCV_AGG = {"Open": "first", "High": "max", "Low": "min", "Close": "last", "Volume": "sum"}
+
+
+def resample_ohlc(history: pd.DataFrame, interval: str) -> pd.DataFrame:
+    """
+    Aggregate bars into calendar buckets (weekly, monthly, ...).
+    Each bar is labelled with the timestamp of the first source bar in its bucket.
+    """
+    rule = RESAMPLE_RULES[interval]
+    bars = history.resample(rule).agg(OHLCV_AGG)
+    first_ts = history.index.to_series().resample(rule).first()
+    # Empty calendar buckets (e.g. a holiday-only week) have no source bar
+    keep = first_ts.notna().to_numpy()
+    bars = bars[keep]
+    bars.index = pd.DatetimeIndex(first_ts[keep])
+    return bars
+
+
+def bucket_ohlc(history: pd.DataFrame, points: int) -> pd.DataFrame:
+    """
+    Aggregate consecutive bars into `points` equal-count buckets.
+    Unlike LTTB this keeps every high and low visible in the output.
+    """
+    n = len(history)
+    if points >= n:
+        return history
+    starts = (np.arange(points) * n) // points
+    ends = np.append(starts[1:], n) - 1
+    opens = history["Open"].to_numpy(dtype=np.float64)
+    highs = history["High"].to_numpy(dtype=np.float64)
+    lows = history["Low"].to_numpy(dtype=np.float64)
+    closes = history["Close"].to_numpy(dtype=np.float64)
+    volume = history["Volume"].fillna(0).to_numpy(dtype=np.float64)
+    return pd.DataFrame({
+        "Open": opens[starts],
+        "High": np.maximum.reduceat(highs, starts),
+        "Low": np.minimum.reduceat(lows, starts),
+        "Close": closes[ends],
+        "Volume": np.add.reduceat(volume, starts)
+    }, index=history.index[starts])
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets: indices of the `threshold` points that best
+    preserve the visual shape of (x, y). First and last points are always kept.
+    """
+    n = len(y)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+
+    # Inner buckets split points 1..n-2; bucket i spans [edges[i], edges[i + 1])
+    edges = (np.arange(threshold - 1) * (n - 2)) // (threshold - 2) + 1
+    counts = np.diff(edges)
+    avg_x = np.add.reduceat(x[1:n - 1], edges[:-1] - 1) / counts
+    avg_y = np.add.reduceat(y[1:n - 1], edges[:-1] - 1) / counts
+    # The "next" point for the final bucket is the last sample
+    avg_x = np.append(avg_x[1:], x[-1])
+    avg_y = np.append(avg_y[1:], y[-1])
+
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+    a = 0
+    for i in range(threshold - 2):
+        lo, hi = edges[i], edges[i + 1]
+        bx, by = x[lo:hi], y[lo:hi]
+        area = np.abs((x[a] - avg_x[i]) * (by - y[a]) - (x[a] - bx) * (avg_y[i] - y[a]))
+        a = lo + int(np.argmax(area))
+        selected[i + 1] = a
+    return selected
+
+
+def downsample_history(
+    history: pd.DataFrame,
+    points: Optional[int] = None,
+    interval: Optional[str] = None,
+    method: str = "lttb"
+) -> pd.DataFrame:
+    """
+    Bound the number of bars returned for a chart.
+    `interval` resamples to calendar bars first, then `points` caps the count
+    using LTTB on closes (method="lttb") or equal-count OHLC buckets (method="ohlc").
+    """
+    if history.empty:
+        return history
+    if interval:
+        history = resample_ohlc(history, interval)
+    if points and points < len(history):
+        if method == "ohlc":
+            history = bucket_ohlc(history, points)
+        else:
+            x = history.index.as_unit("s").asi8
+            history = history.iloc[lttb_indices(x, history["Close"].to_numpy(), points)]
+    return history
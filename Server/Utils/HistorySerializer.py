@@ -0,0 +1,79 @@
+import struct
+import numpy as np
+import pandas as pd
+
+# Binary layout (little-endian):
+#   header: magic b"MAFH", uint32 version, uint32 row count
+#   body:   int64 t[n] (epoch seconds), float64 o[n], h[n], l[n], c[n], v[n]
+PACKED_MAGIC = b"MAFH"
+PACKED_VERSION = 1
+PACKED_HEADER = struct.Struct("<4sII")
+
+HISTORY_FORMATS = ("json", "columnar", "binary")
+
+
+def _columns(history: pd.DataFrame):
+    """Extract OHLCV as numpy arrays in one pass, rounded like the row format."""
+    prices = np.round(history[["Open", "High", "Low", "Close"]].to_numpy(dtype=np.float64), 2)
+    volume = history["Volume"].fillna(0).to_numpy(dtype=np.int64)
+    return prices, volume
+
+
+def _epoch_seconds(index: pd.DatetimeIndex) -> np.ndarray:
+    return index.as_unit("s").asi8.astype(np.int64)
+
+
+def history_to_records(history: pd.DataFrame, date_format: str = '%Y-%m-%d') -> list:
+    """Row-of-dicts layout, kept for existing clients."""
+    if history.empty:
+        # Unknown/delisted tickers come back as a bare frame without a DatetimeIndex
+        return []
+    prices, volume = _columns(history)
+    dates = history.index.strftime(date_format)
+    return [
+        {"date": d, "open": o, "high": h, "low": l, "close": c, "volume": v}
+        for d, (o, h, l, c), v in zip(dates, prices.tolist(), volume.tolist())
+    ]
+
+
+def history_to_columns(history: pd.DataFrame) -> dict:
+    """Columnar layout: parallel arrays for t/o/h/l/c/v (t in epoch seconds)."""
+    if history.empty:
+        return {key: [] for key in ("t", "o", "h", "l", "c", "v")}
+    prices, volume = _columns(history)
+    return {
+        "t": _epoch_seconds(history.index).tolist(),
+        "o": prices[:, 0].tolist(),
+        "h": prices[:, 1].tolist(),
+        "l": prices[:, 2].tolist(),
+        "c": prices[:, 3].tolist(),
+        "v": volume.tolist()
+    }
+
+
+def history_to_packed(history: pd.DataFrame) -> bytes:
+    """Packed float arrays, see PACKED_HEADER for the layout."""
+    if history.empty:
+        return PACKED_HEADER.pack(PACKED_MAGIC, PACKED_VERSION, 0)
+    n = len(history)
+    ohlc = history[["Open", "High", "Low", "Close"]].to_numpy(dtype="<f8")
+    volume = history["Volume"].fillna(0).to_numpy(dtype="<f8")
+    return b"".join((
+        PACKED_HEADER.pack(PACKED_MAGIC, PACKED_VERSION, n),
+        _epoch_seconds(history.index).astype("<i8").tobytes(),
+        # Transpose so each field is contiguous (column-major)
+        np.ascontiguousarray(ohlc.T).tobytes(),
+        volume.tobytes()
+    ))
+
+
+def unpack_history(payload: bytes) -> dict:
+    """Inverse of history_to_packed, mainly for tests and Python consumers."""
+    magic, version, n = PACKED_HEADER.unpack_from(payload, 0)
+    if magic != PACKED_MAGIC or version != PACKED_VERSION:
+        raise ValueError("Unsupported history payload")
+    offset = PACKED_HEADER.size
+    t = np.frombuffer(payload, dtype="<i8", count=n, offset=offset)
+    offset += 8 * n
+    fields = np.frombuffer(payload, dtype="<f8", count=5 * n, offset=offset).reshape(5, n)
+    return {"t": t, "o": fields[0], "h": fields[1], "l": fields[2], "c": fields[3], "v": fields[4]}
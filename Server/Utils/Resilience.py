@@ -0,0 +1,257 @@
+import asyncio
+import logging
+import random
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Optional, Tuple
+from Config.SystemConfig import get_settings
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+# While the half-open probe is in flight, other callers are told to come back after this
+PROBE_RETRY_SECONDS = 1.0
+RETRY_BASE_SECONDS = 0.5
+RETRY_CAP_SECONDS = 8.0
+# Errors that mean "bad request or unexpected payload", not "upstream unhealthy":
+# the upstream did answer, so they count as successes for the circuit
+CLIENT_ERRORS = (KeyError, IndexError, TypeError, AttributeError)
+
+
+class UpstreamUnavailable(Exception):
+    """Raised instead of calling an upstream whose circuit is open or whose rate limit would make us wait too long."""
+    def __init__(self, name: str, reason: str, retry_after: float):
+        super().__init__(f"{name} unavailable ({reason}), retry in {retry_after:.1f}s")
+        self.name = name
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+def backoff_delay(attempt: int, base: float, cap: float) -> float:
+    """Exponential backoff with jitter: half fixed, half random, so retries never synchronise or hit zero."""
+    delay = min(cap, base * (2 ** attempt))
+    return delay / 2 + random.uniform(0, delay / 2)
+
+
+def is_throttled(exc: BaseException) -> bool:
+    """HTTP 429 or a client library's rate-limit error."""
+    if "RateLimit" in type(exc).__name__:
+        return True
+    response = getattr(exc, "response", None)
+    return getattr(response, "status_code", None) == 429 or "Too Many Requests" in str(exc)
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket with an adaptive rate (AIMD): the rate is halved
+    whenever the upstream throttles us and creeps back to the configured rate
+    with every success.
+    """
+    def __init__(self, rate: float, burst: int, clock: Callable[[], float] = time.monotonic):
+        self.max_rate = rate
+        self.rate = rate
+        self.min_rate = rate / 16
+        self.burst = burst
+        self.tokens = float(burst)
+        self.clock = clock
+        self.updated = clock()
+        self.lock = threading.Lock()
+
+    def _refill(self):
+        now = self.clock()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self) -> float:
+        """Take a token; returns how long the caller must wait before using it."""
+        with self.lock:
+            self._refill()
+            self.tokens -= 1
+            return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+    def refund(self):
+        with self.lock:
+            self.tokens = min(self.burst, self.tokens + 1)
+
+    def throttled(self):
+        with self.lock:
+            # Settle refill at the old rate, then drop the burst allowance
+            self._refill()
+            self.rate = max(self.min_rate, self.rate / 2)
+            self.tokens = min(self.tokens, 0.0)
+
+    def succeeded(self):
+        if self.rate < self.max_rate:
+            with self.lock:
+                self.rate = min(self.max_rate, self.rate + self.max_rate / 20)
+
+
+class CircuitBreaker:
+    """
+    Opens when at least `error_rate` of the calls in the last `window` seconds
+    failed (given `min_calls`). While open, calls fail fast. After a jittered,
+    exponentially growing cooldown one probe call is let through (half-open):
+    success closes the circuit, failure reopens it for longer.
+    """
+    def __init__(self, name: str, error_rate: float, min_calls: int, window: float,
+                 cooldown: float, max_cooldown: float, clock: Callable[[], float] = time.monotonic):
+        self.name = name
+        self.error_rate = error_rate
+        self.min_calls = min_calls
+        self.window = window
+        self.cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.clock = clock
+        self.state = CLOSED
+        self.calls: Deque[Tuple[float, bool]] = deque()
+        self.failures = 0
+        self.opens = 0
+        self.retry_at = 0.0
+        self.probing = False
+        self.lock = threading.Lock()
+
+    def allow(self) -> float:
+        """0 if a call may go ahead, otherwise seconds until the caller should try again."""
+        with self.lock:
+            if self.state == CLOSED:
+                return 0.0
+            now = self.clock()
+            if self.state == OPEN:
+                if now < self.retry_at:
+                    return self.retry_at - now
+                self.state = HALF_OPEN
+                self.probing = False
+            if self.probing:
+                return PROBE_RETRY_SECONDS
+            self.probing = True
+            return 0.0
+
+    def abandon(self):
+        """An allowed call never reached the upstream; free the probe slot."""
+        with self.lock:
+            self.probing = False
+
+    def record(self, ok: bool):
+        with self.lock:
+            now = self.clock()
+            if self.state == HALF_OPEN:
+                self.probing = False
+                if ok:
+                    logger.info(f"Circuit {self.name} closed")
+                    self.state = CLOSED
+                    self.opens = 0
+                else:
+                    self._trip(now)
+                return
+            if self.state == OPEN:
+                return  # a call that started before the circuit opened
+            self.calls.append((now, ok))
+            self.failures += not ok
+            while self.calls and self.calls[0][0] < now - self.window:
+                self.failures -= not self.calls.popleft()[1]
+            if len(self.calls) >= self.min_calls and self.failures >= self.error_rate * len(self.calls):
+                self._trip(now)
+
+    def _trip(self, now: float):
+        delay = backoff_delay(self.opens, self.cooldown, self.max_cooldown)
+        logger.warning(f"Circuit {self.name} open for {delay:.1f}s")
+        self.state = OPEN
+        self.retry_at = now + delay
+        self.opens += 1
+        self.calls.clear()
+        self.failures = 0
+
+
+class Upstream:
+    """Rate limit + circuit breaker + retries for one external service, shared by every caller in the process."""
+    def __init__(self, name: str, rate: float, burst: int, max_wait: Optional[float] = None):
+        self.name = name
+        self.bucket = TokenBucket(rate, burst)
+        self.breaker = CircuitBreaker(
+            name, settings.BREAKER_ERROR_RATE, settings.BREAKER_MIN_CALLS, settings.BREAKER_WINDOW_SECONDS,
+            settings.BREAKER_COOLDOWN_SECONDS, settings.BREAKER_MAX_COOLDOWN_SECONDS
+        )
+        self.max_wait = settings.UPSTREAM_MAX_WAIT_SECONDS if max_wait is None else max_wait
+
+    def _admit(self, max_wait: float) -> float:
+        """Seconds to wait before calling, or UpstreamUnavailable to fail fast."""
+        retry_after = self.breaker.allow()
+        if retry_after:
+            raise UpstreamUnavailable(self.name, "circuit open", retry_after)
+        wait = self.bucket.reserve()
+        if wait > max_wait:
+            self.bucket.refund()
+            self.breaker.abandon()
+            raise UpstreamUnavailable(self.name, "rate limited", wait)
+        return wait
+
+    def _failed(self, exc: Exception) -> bool:
+        """Record a failed call; True if it says something about upstream health."""
+        if isinstance(exc, CLIENT_ERRORS):
+            self.breaker.record(True)
+            return False
+        if is_throttled(exc):
+            logger.warning(f"{self.name} is throttling us; slowing to {self.bucket.rate / 2:.2f}/s")
+            self.bucket.throttled()
+        self.breaker.record(False)
+        return True
+
+    def _succeeded(self):
+        self.breaker.record(True)
+        self.bucket.succeeded()
+
+    def call(self, fn: Callable[..., Any], *args, retries: int = 0, max_wait: Optional[float] = None, **kwargs) -> Any:
+        """Call `fn` through the guard from a worker thread (or other blocking context)."""
+        attempt = 0
+        while True:
+            wait = self._admit(self.max_wait if max_wait is None else max_wait)
+            if wait:
+                time.sleep(wait)
+            try:
+                result = fn(*args, **kwargs)
+            except Exception as e:
+                if not self._failed(e) or attempt >= retries:
+                    raise
+                time.sleep(backoff_delay(attempt, RETRY_BASE_SECONDS, RETRY_CAP_SECONDS))
+                attempt += 1
+                continue
+            self._succeeded()
+            return result
+
+    async def acall(self, fn: Callable[..., Any], *args, retries: int = 0, max_wait: Optional[float] = None, **kwargs) -> Any:
+        """Like call(), but waits without blocking the event loop and runs `fn` in a worker thread."""
+        attempt = 0
+        while True:
+            wait = self._admit(self.max_wait if max_wait is None else max_wait)
+            if wait:
+                await asyncio.sleep(wait)
+            try:
+                result = await asyncio.to_thread(fn, *args, **kwargs)
+            except asyncio.CancelledError:
+                self.breaker.abandon()
+                raise
+            except Exception as e:
+                if not self._failed(e) or attempt >= retries:
+                    raise
+                await asyncio.sleep(backoff_delay(attempt, RETRY_BASE_SECONDS, RETRY_CAP_SECONDS))
+                attempt += 1
+                continue
+            self._succeeded()
+            return result
+
+    def status(self) -> dict:
+        return {
+            "name": self.name,
+            "state": self.breaker.state,
+            "rate": round(self.bucket.rate, 3),
+            "retry_after": round(max(self.breaker.retry_at - time.monotonic(), 0.0), 1)
+            if self.breaker.state == OPEN else 0.0
+        }
+
+
+# One guard per upstream for the whole process
+yfinance = Upstream("yfinance", settings.YF_RATE_PER_SECOND, settings.YF_BURST)
+huggingface = Upstream("huggingface", settings.HF_RATE_PER_SECOND, settings.HF_BURST)
+news = Upstream("news", settings.NEWS_RATE_PER_SECOND, settings.NEWS_BURST)
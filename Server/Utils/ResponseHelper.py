@@ -1,11 +1,47 @@
-import uuid
-from datetime import datetime
-from fastapi.responses import JSONResponse
-from typing import Any, Optional
+import hashlib
+import random
+from datetime import datetime, date
+from fastapi.responses import Response
+from typing import Any, Dict, Optional
 from Utils.ResponseHelperModels import HTTPStatusCode, APICode
 
+import numpy as np
+import orjson
 from fastapi.encoders import jsonable_encoder
 
+ORJSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+
+def _default(obj: Any):
+    """
+    Fallback for types orjson does not serialize natively.
+    NumPy arrays/scalars are handled by OPT_SERIALIZE_NUMPY; this covers
+    pandas timestamps, stray numpy scalars and anything FastAPI knows how to encode.
+    """
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, (datetime, date)):
+        # pandas.Timestamp / NaT are datetime subclasses orjson rejects
+        return None if obj != obj else obj.isoformat()
+    if hasattr(obj, "isoformat"):
+        return obj.isoformat()
+    return jsonable_encoder(obj)
+
+
+def dumps(value: Any) -> bytes:
+    """Serialize a payload to JSON bytes (NaN/Inf become null)."""
+    return orjson.dumps(value, default=_default, option=ORJSON_OPTIONS)
+
+
+def etag_for(payload: bytes, weak: bool = False) -> str:
+    """
+    ETag over the payload bytes. Strong only when `payload` is the whole body;
+    weak when it covers part of it (the data inside a JSON envelope).
+    """
+    tag = f'"{hashlib.blake2b(payload, digest_size=16).hexdigest()}"'
+    return f"W/{tag}" if weak else tag
+
+
 def make_response(
     *,
     status: HTTPStatusCode,
@@ -14,21 +50,35 @@ def make_response(
     data: Optional[Any] = None,
     error: Optional[Any] = None,
     error_location: Optional[str] = None,
+    location: Optional[str] = None,
+    headers: Optional[Dict[str, str]] = None,
 ):
-    body = {
-        "success": status < 400,  # 2xx/3xx = success, 4xx/5xx = error
-        "message": message, 
-        "data": data if status < 400 else None,
-        "error": None if status < 400 else {
-            "type": code.value,
-            "details": error,
-            "location": error_location
-        },
-        "meta": {
-            "http_code": status,
-            "timestamp": datetime.utcnow().isoformat(),
-            "request_id": f"req_{uuid.uuid4().hex[:12]}"
-        }
+    success = status < 400  # 2xx/3xx = success, 4xx/5xx = error
+    error_body = None if success else {
+        "type": code.value,
+        "details": error,
+        "location": error_location or location
     }
+    meta = {
+        "http_code": int(status),
+        "timestamp": datetime.utcnow().isoformat(),
+        "request_id": "req_%012x" % random.getrandbits(48)
+    }
+
+    # Envelope is assembled from pre-serialized parts so the (potentially large)
+    # data payload is encoded exactly once, without a jsonable_encoder walk.
+    data_bytes = dumps(data if success else None)
+    content = b"".join((
+        b'{"success":', b"true" if success else b"false",
+        b',"message":', dumps(message),
+        b',"data":', data_bytes,
+        b',"error":', dumps(error_body),
+        b',"meta":', dumps(meta),
+        b"}"
+    ))
 
-    return JSONResponse(status_code=status, content=jsonable_encoder(body))
+    # meta changes on every call, so validators are derived from the data payload only,
+    # and are weak: equal tags mean the same data, not byte-identical bodies
+    response_headers = {"ETag": etag_for(data_bytes, weak=True)} if success else {}
+    response_headers.update(headers or {})
+    return Response(content=content, status_code=status, media_type="application/json", headers=response_headers)
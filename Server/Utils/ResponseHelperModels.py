@@ -11,6 +11,8 @@ class HTTPStatusCode(int, Enum):
     CONFLICT = HTTPStatus.CONFLICT.value
     TOO_MANY_REQUESTS = HTTPStatus.TOO_MANY_REQUESTS.value
     INTERNAL_SERVER_ERROR = HTTPStatus.INTERNAL_SERVER_ERROR.value
+    SERVICE_UNAVAILABLE = HTTPStatus.SERVICE_UNAVAILABLE.value
+    GATEWAY_TIMEOUT = HTTPStatus.GATEWAY_TIMEOUT.value
 
 class APICode(str, Enum):
     OK = "OK"
@@ -24,6 +26,8 @@ class APICode(str, Enum):
     CONFLICT = "CONFLICT"
     INTERNAL_SERVER_ERROR = "INTERNAL_SERVER_ERROR"
     TOO_MANY_REQUESTS = "TOO_MANY_REQUESTS"
+    TIMEOUT = "TIMEOUT"
+    UPSTREAM_UNAVAILABLE = "UPSTREAM_UNAVAILABLE"
     VALIDATION = "VALIDATION"
     ERROR = "ERROR"
     EMAIL_VERIFICATION = "EMAIL_VERIFICATION"
@@ -0,0 +1,126 @@
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, NamedTuple, Optional, Tuple, Type
+
+logger = logging.getLogger(__name__)
+
+
+class CacheResult(NamedTuple):
+    value: Any
+    age: float
+    state: str  # HIT (fresh), STALE (served while refreshing), MISS (loaded for this request)
+
+    def headers(self) -> Dict[str, str]:
+        return {"Age": str(int(self.age)), "X-Cache": self.state}
+
+
+class _Entry(NamedTuple):
+    value: Any
+    stored_at: float
+    degraded: bool
+
+
+class StaleWhileRevalidateCache:
+    """
+    In-process stale-while-revalidate cache. Entries younger than `soft_ttl` are
+    served as is; between `soft_ttl` and `hard_ttl` the stale value is served at
+    once and a single background refresh per key is started. Only a missing or
+    hard-expired entry makes the caller wait, and concurrent callers share that
+    one load. Least recently used entries beyond `max_entries` are evicted.
+    If that load fails with one of `serve_expired_on` (e.g. an open circuit),
+    the hard-expired value is served rather than an error. Degraded values
+    (see get) are kept for `degraded_ttl` only and never served stale.
+    """
+    def __init__(self, soft_ttl: float, hard_ttl: float, max_entries: int = 256,
+                 clock: Callable[[], float] = time.monotonic,
+                 serve_expired_on: Tuple[Type[BaseException], ...] = (),
+                 degraded_ttl: float = 0.0):
+        self.soft_ttl = soft_ttl
+        self.hard_ttl = max(hard_ttl, soft_ttl)
+        self.degraded_ttl = degraded_ttl
+        self.max_entries = max_entries
+        self.clock = clock
+        self.serve_expired_on = serve_expired_on
+        self.entries: "OrderedDict[Hashable, _Entry]" = OrderedDict()
+        self.pending: Dict[Hashable, asyncio.Future] = {}
+        # Stale complete values whose refresh came back degraded: no new refresh until then
+        self.retry_at: Dict[Hashable, float] = {}
+
+    async def get(
+        self,
+        key: Hashable,
+        loader: Callable[[], Awaitable[Any]],
+        cacheable: Optional[Callable[[Any], bool]] = None,
+        degraded: Optional[Callable[[Any], bool]] = None,
+    ) -> CacheResult:
+        """
+        Cached value for `key`, loading it with `loader()` when needed. Results
+        rejected by `cacheable` (e.g. not-found answers) are returned to the
+        caller but never replace a stored value. Results flagged by `degraded`
+        (e.g. a fallback answer during an outage) are cached for `degraded_ttl`
+        but never replace a complete value that is still servable. Load errors
+        propagate to waiting callers; a failed background refresh keeps serving
+        the stale value.
+        """
+        entry = self.entries.get(key)
+        if entry is not None:
+            age = self.clock() - entry.stored_at
+            soft_ttl, hard_ttl = self._ttls(entry)
+            if age < hard_ttl:
+                self.entries.move_to_end(key)
+                if age < soft_ttl:
+                    return CacheResult(entry.value, age, "HIT")
+                if self.clock() >= self.retry_at.get(key, 0.0):
+                    self._refresh(key, loader, cacheable, degraded)
+                return CacheResult(entry.value, age, "STALE")
+        try:
+            # Shielded: a caller that goes away does not cancel the load for the others
+            value = await asyncio.shield(self._refresh(key, loader, cacheable, degraded))
+        except self.serve_expired_on:
+            entry = self.entries.get(key)
+            if entry is None:
+                raise
+            return CacheResult(entry.value, self.clock() - entry.stored_at, "STALE")
+        return CacheResult(value, 0.0, "MISS")
+
+    def invalidate(self, key: Hashable):
+        self.entries.pop(key, None)
+        self.retry_at.pop(key, None)
+
+    def _ttls(self, entry: _Entry) -> Tuple[float, float]:
+        if entry.degraded:
+            return self.degraded_ttl, self.degraded_ttl
+        return self.soft_ttl, self.hard_ttl
+
+    def _refresh(self, key, loader, cacheable, degraded) -> asyncio.Future:
+        future = self.pending.get(key)
+        if future is None:
+            future = asyncio.ensure_future(self._load(key, loader, cacheable, degraded))
+            self.pending[key] = future
+            future.add_done_callback(lambda f: self._finished(key, f))
+        return future
+
+    async def _load(self, key, loader, cacheable, degraded):
+        value = await loader()
+        if cacheable is None or cacheable(value):
+            is_degraded = degraded is not None and degraded(value)
+            now = self.clock()
+            current = self.entries.get(key)
+            if is_degraded and current is not None and not current.degraded and now - current.stored_at < self.hard_ttl:
+                # Keep serving the last complete value (stale) rather than a fallback
+                self.retry_at[key] = now + self.degraded_ttl
+                return value
+            self.entries[key] = _Entry(value, now, is_degraded)
+            self.entries.move_to_end(key)
+            self.retry_at.pop(key, None)
+            while len(self.entries) > self.max_entries:
+                self.retry_at.pop(self.entries.popitem(last=False)[0], None)
+        return value
+
+    def _finished(self, key, future: asyncio.Future):
+        self.pending.pop(key, None)
+        # Retrieve the error so background refresh failures are logged, not warned about
+        if not future.cancelled() and future.exception() is not None:
+            logger.warning(f"Cache load failed for {key}: {future.exception()}")
@@ -0,0 +1,233 @@
+"""
+Bulk daily-history backfill into the local columnar dataset (HISTORY_DATASET_DIR).
+
+    python backfill.py universe.txt                    # full history, resumable
+    python backfill.py universe.txt --period 10y --workers 4 --rate 2
+    python backfill.py --incremental                   # nightly: latest bars for every stored symbol
+
+After downloading, the memory-mapped price matrix (PRICE_MATRIX_DIR) used by the
+analytics endpoints is brought up to date.
+
+The universe file lists one ticker per line (blank lines and # comments ignored;
+for CSV files the first column is used). Progress is checkpointed after every
+chunk, so an interrupted run picks up where it stopped unless --restart is given.
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+import pandas as pd
+import yfinance as yf
+from Config.SystemConfig import get_settings
+from Services.Analytics.PriceMatrix import build_price_matrix
+from Services.Market.HistoryDataset import (
+    frame_to_columns, list_tickers, merge_columns, read_history, split_download, write_history, last_bar_time
+)
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s | %(levelname)s | %(message)s")
+logger = logging.getLogger("backfill")
+settings = get_settings()
+
+CHECKPOINT_FILE = ".backfill_checkpoint.json"
+MAX_ATTEMPTS = 3
+# Incremental pass re-fetches a few days so late corrections overwrite stored bars
+INCREMENTAL_OVERLAP_DAYS = 5
+
+
+def read_universe(path: str) -> List[str]:
+    tickers = []
+    with open(path, "r") as f:
+        for line in f:
+            ticker = line.split("#", 1)[0].split(",", 1)[0].strip().upper()
+            if ticker and ticker not in ("TICKER", "SYMBOL"):
+                tickers.append(ticker)
+    return list(dict.fromkeys(tickers))
+
+
+class RateLimiter:
+    """Spaces out upstream requests across all download threads."""
+    def __init__(self, per_second: float):
+        self.interval = 1.0 / per_second if per_second > 0 else 0.0
+        self.next_slot = 0.0
+        self.lock = threading.Lock()
+
+    def wait(self):
+        with self.lock:
+            now = time.monotonic()
+            slot = max(now, self.next_slot)
+            self.next_slot = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+class Checkpoint:
+    def __init__(self, directory: str, job: dict, restart: bool):
+        self.path = os.path.join(directory, CHECKPOINT_FILE)
+        self.lock = threading.Lock()
+        state = None
+        if not restart and os.path.exists(self.path):
+            with open(self.path, "r") as f:
+                state = json.load(f)
+            if state.get("job") != job:
+                logger.warning("Checkpoint is for a different job, starting over")
+                state = None
+        self.state = state or {"job": job, "completed": [], "failed": {}}
+        self.completed = set(self.state["completed"])
+
+    def record(self, done: List[str], failed: Dict[str, str]):
+        with self.lock:
+            self.completed.update(done)
+            self.state["completed"] = sorted(self.completed)
+            for ticker in done:
+                self.state["failed"].pop(ticker, None)
+            self.state["failed"].update(failed)
+            tmp = self.path + ".tmp"
+            with open(tmp, "w") as f:
+                json.dump(self.state, f)
+            os.replace(tmp, self.path)
+
+    def clear(self):
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+
+
+def download(tickers: List[str], limiter: RateLimiter, **kwargs) -> Dict[str, pd.DataFrame]:
+    last_error = None
+    for attempt in range(MAX_ATTEMPTS):
+        limiter.wait()
+        try:
+            data = yf.download(tickers, group_by="ticker", auto_adjust=True, threads=False, progress=False, **kwargs)
+            return split_download(data, tickers)
+        except Exception as e:
+            last_error = e
+            if attempt < MAX_ATTEMPTS - 1:
+                time.sleep(2 ** attempt)
+    raise RuntimeError(f"download failed after {MAX_ATTEMPTS} attempts: {last_error}")
+
+
+def store_chunk(directory: str, frames: Dict[str, pd.DataFrame], tickers: List[str], merge: bool):
+    done, failed = [], {}
+    for ticker in tickers:
+        frame = frames.get(ticker)
+        columns = frame_to_columns(frame) if frame is not None else None
+        if columns is None or not len(columns["t"]):
+            failed[ticker] = "no data"
+            continue
+        if merge:
+            columns = merge_columns(read_history(directory, ticker), columns)
+        write_history(directory, ticker, columns)
+        done.append(ticker)
+    return done, failed
+
+
+def run_backfill(tickers: List[str], directory: str, period: str, chunk_size: int,
+                 workers: int, rate: float, restart: bool) -> int:
+    checkpoint = Checkpoint(directory, {"mode": "full", "period": period}, restart)
+    pending = [t for t in tickers if t not in checkpoint.completed]
+    logger.info(f"{len(tickers)} tickers, {len(tickers) - len(pending)} already done, {len(pending)} to fetch")
+    limiter = RateLimiter(rate)
+    chunks = [pending[i:i + chunk_size] for i in range(0, len(pending), chunk_size)]
+
+    def work(chunk):
+        frames = download(chunk, limiter, period=period, interval="1d")
+        return store_chunk(directory, frames, chunk, merge=True)
+
+    failures = 0
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(work, chunk): chunk for chunk in chunks}
+        for i, future in enumerate(as_completed(futures), 1):
+            chunk = futures[future]
+            try:
+                done, failed = future.result()
+            except Exception as e:
+                done, failed = [], {t: str(e) for t in chunk}
+            checkpoint.record(done, failed)
+            failures += len(failed)
+            logger.info(f"Chunk {i}/{len(chunks)}: {len(done)} stored, {len(failed)} failed")
+
+    if not checkpoint.state["failed"]:
+        checkpoint.clear()
+    else:
+        logger.warning(f"{len(checkpoint.state['failed'])} tickers failed; rerun to retry them")
+    return failures
+
+
+def incremental_starts(last: Dict[str, float]) -> Dict[str, List[str]]:
+    """
+    Stored tickers grouped by the date their sync starts from, so one stale symbol
+    gets its own long download instead of stretching everyone else's.
+    """
+    groups: Dict[str, List[str]] = {}
+    for ticker, ts in last.items():
+        start = datetime.fromtimestamp(ts, tz=timezone.utc) - timedelta(days=INCREMENTAL_OVERLAP_DAYS)
+        groups.setdefault(start.strftime("%Y-%m-%d"), []).append(ticker)
+    return dict(sorted(groups.items()))
+
+
+def run_incremental(tickers: List[str], directory: str, rate: float, chunk_size: int) -> int:
+    """Batched downloads from each group's last-bar date, merged into every file."""
+    last = {t: last_bar_time(directory, t) for t in tickers}
+    known = {t: ts for t, ts in last.items() if ts is not None}
+    if not known:
+        logger.error("Nothing stored yet; run a full backfill first")
+        return 1
+    missing = len(tickers) - len(known)
+    if missing:
+        logger.warning(f"{missing} tickers have no stored history and are skipped")
+    limiter = RateLimiter(rate)
+    status = 0
+    for start, group in incremental_starts(known).items():
+        logger.info(f"Syncing {len(group)} tickers from {start}")
+        for i in range(0, len(group), chunk_size):
+            chunk = group[i:i + chunk_size]
+            try:
+                frames = download(chunk, limiter, start=start, interval="1d")
+            except Exception as e:
+                logger.error(f"Sync from {start} failed for {len(chunk)} tickers: {e}")
+                status = 1
+                continue
+            done, failed = store_chunk(directory, frames, chunk, merge=True)
+            logger.info(f"{len(done)} updated, {len(failed)} without new data")
+    return status
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Backfill daily history into the local columnar dataset")
+    parser.add_argument("universe", nargs="?", help="File with one ticker per line")
+    parser.add_argument("--dir", default=settings.HISTORY_DATASET_DIR, help="Dataset directory")
+    parser.add_argument("--period", default="max", help="yfinance period for full backfills (max, 10y, ...)")
+    parser.add_argument("--chunk-size", type=int, default=20, help="Tickers per upstream request")
+    parser.add_argument("--workers", type=int, default=4, help="Parallel download threads")
+    parser.add_argument("--rate", type=float, default=2.0, help="Max upstream requests per second")
+    parser.add_argument("--restart", action="store_true", help="Ignore an existing checkpoint")
+    parser.add_argument("--incremental", action="store_true", help="Fetch only the latest bars for stored symbols")
+    parser.add_argument("--no-matrix", action="store_true", help="Skip updating the memory-mapped price matrix")
+    args = parser.parse_args(argv)
+
+    tickers = read_universe(args.universe) if args.universe else list_tickers(args.dir)
+    if not tickers:
+        parser.error("no tickers: pass a universe file (or run --incremental on a populated dataset)")
+    os.makedirs(args.dir, exist_ok=True)
+
+    started = time.time()
+    if args.incremental:
+        status = run_incremental(tickers, args.dir, args.rate, args.chunk_size)
+    else:
+        status = 1 if run_backfill(
+            tickers, args.dir, args.period, args.chunk_size, args.workers, args.rate, args.restart
+        ) else 0
+    if not args.no_matrix:
+        # Appends new dates in place; a changed ticker set rebuilds it
+        build_price_matrix(args.dir, settings.PRICE_MATRIX_DIR)
+    logger.info(f"Finished in {time.time() - started:.1f}s")
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,69 @@
+"""
+Offline fan-out benchmark: replays a recorded tick log through
+ConnectionManager.broadcast at max speed into in-memory sockets.
+
+    python bench_broadcast.py --ticks ./ticklog --clients 5000 --subs 5
+"""
+import argparse
+import asyncio
+import random
+import time
+
+from Controller.PriceStreamController import ConnectionManager, format_update
+from Services.Market.TickLog import replay_ticks, load_symbols
+
+
+class NullSocket:
+    def __init__(self):
+        self.frames = 0
+        self.bytes = 0
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, message):
+        self.frames += 1
+        self.bytes += len(message)
+
+    async def send_bytes(self, message):
+        self.frames += 1
+        self.bytes += len(message)
+
+
+async def run(args):
+    manager = ConnectionManager(max_queue=args.queue, policy=args.policy)
+    symbols = load_symbols(args.ticks)
+    sockets = [NullSocket() for _ in range(args.clients)]
+    for ws in sockets:
+        await manager.connect(ws, mode=args.mode, encoding=args.encoding)
+        await manager.subscribe(ws, random.sample(symbols, min(args.subs, len(symbols))))
+
+    broadcast_time = 0.0
+
+    async def on_quotes(quotes):
+        nonlocal broadcast_time
+        started = time.perf_counter()
+        await manager.broadcast([format_update(q) for q in quotes])
+        broadcast_time += time.perf_counter() - started
+        await asyncio.sleep(0)  # let writer tasks drain
+
+    cycles = await replay_ticks(args.ticks, on_quotes, "max")
+    await asyncio.sleep(0.1)
+    frames = sum(ws.frames for ws in sockets)
+    sent = sum(ws.bytes for ws in sockets)
+    print(f"clients={args.clients} cycles={cycles} frames={frames} bytes={sent}")
+    print(f"broadcast: {broadcast_time * 1000:.1f}ms total, {broadcast_time / max(cycles, 1) * 1000:.3f}ms/cycle")
+    for ws in list(manager.active_connections):
+        manager.disconnect(ws)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replay a tick log through the WebSocket fan-out")
+    parser.add_argument("--ticks", required=True, help="Tick log directory (TICK_LOG_DIR)")
+    parser.add_argument("--clients", type=int, default=1000)
+    parser.add_argument("--subs", type=int, default=5, help="Random subscriptions per client")
+    parser.add_argument("--mode", default="full", choices=["full", "delta"])
+    parser.add_argument("--encoding", default="json", choices=["json", "binary"])
+    parser.add_argument("--policy", default="drop_oldest", choices=["drop_oldest", "coalesce", "disconnect"])
+    parser.add_argument("--queue", type=int, default=32)
+    asyncio.run(run(parser.parse_args()))
@@ -23,6 +23,12 @@ def on_startup():
     init_db()
     from Controller.PriceStreamController import start_background_stream
     start_background_stream()
+    from Services.Market.FundamentalsRefresher import start_fundamentals_refresh
+    start_fundamentals_refresh()
+
+# Added before CORS so it runs inside it: 429s still carry CORS headers
+from Middleware.RateLimitMiddleware import RateLimitMiddleware
+app.add_middleware(RateLimitMiddleware)
 
 app.add_middleware(
     CORSMiddleware,
@@ -34,6 +40,9 @@ app.add_middleware(
 
 from fastapi import Request
 import time
+from Middleware.HttpCacheMiddleware import http_cache_middleware
+
+app.middleware("http")(http_cache_middleware)
 
 @app.middleware("http")
 async def log_requests(request: Request, call_next):
@@ -57,6 +66,9 @@ app.include_router(news_router, prefix="/api/news", tags=["News"])
 from Controller.ChatController import router as chat_router
 app.include_router(chat_router, prefix="/api/chat", tags=["Chat"])
 
+from Controller.AlertController import router as alert_router
+app.include_router(alert_router, prefix="/api/alerts", tags=["Alerts"])
+
 from Controller.PriceStreamController import router as ws_router, start_background_stream
 app.include_router(ws_router, prefix="/api", tags=["Real-time"])
 
@@ -64,6 +76,11 @@ app.include_router(ws_router, prefix="/api", tags=["Real-time"])
 
 @app.get("/")
 async def root():
-    return {"status": "active", "system": "MatrixAlphaForge Intelligence Core"}
+    import Utils.Resilience as upstreams
+    return {
+        "status": "active",
+        "system": "MatrixAlphaForge Intelligence Core",
+        "upstreams": [u.status() for u in (upstreams.yfinance, upstreams.huggingface, upstreams.news)]
+    }
 
 